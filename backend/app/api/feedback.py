@@ -1,11 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
 
-from app.db import get_session
+from app.db import get_async_read_session, get_session
 from app.models.feedback import Feedback
+from app.services.db_writer import run_write
 
 router = APIRouter(prefix="/feedback", tags=["feedback"])
 
@@ -17,7 +19,7 @@ class FeedbackCreate(BaseModel):
     description: str
 
 @router.post("/", response_model=Feedback)
-def create_feedback(feedback: FeedbackCreate, session: Session = Depends(get_session)):
+async def create_feedback(feedback: FeedbackCreate, session: Session = Depends(get_session)):
     """
     フィードバック情報を登録する
     """
@@ -32,18 +34,21 @@ def create_feedback(feedback: FeedbackCreate, session: Session = Depends(get_ses
             status="new"
         )
         
-        session.add(db_feedback)
-        session.commit()
-        session.refresh(db_feedback)
-        
-        return db_feedback
+        # 書き込みはDB書き込み用スレッド（db_writer）で行う
+        return await run_write(_save_feedback, session, db_feedback)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"フィードバック登録中にエラーが発生しました: {str(e)}")
 
 @router.get("/", response_model=list[Feedback])
-def get_all_feedback(session: Session = Depends(get_session)):
+async def get_all_feedback(session: AsyncSession = Depends(get_async_read_session)):
     """
     すべてのフィードバック情報を取得する (管理者向け)
     """
-    feedbacks = session.exec(select(Feedback).order_by(Feedback.created_at.desc())).all()
-    return feedbacks 
\ No newline at end of file
+    feedbacks = (await session.exec(select(Feedback).order_by(Feedback.created_at.desc()))).all()
+    return feedbacks 
+
+def _save_feedback(session: Session, feedback: Feedback) -> Feedback:
+    session.add(feedback)
+    session.commit()
+    session.refresh(feedback)
+    return feedback
@@ -1,17 +1,19 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
+from app.db import get_async_read_session, get_session
 from app.models import Comment, CommentCreate, CommentRead, CommentUpdate
+from app.services.db_writer import run_write
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
 
 @router.get("/", response_model=List[CommentRead])
-def get_comments(
-    session: Session = Depends(get_session),
+async def get_comments(
+    session: AsyncSession = Depends(get_async_read_session),
     race_id: Optional[int] = Query(None, description="レースID"),
     horse_id: Optional[int] = Query(None, description="馬ID"),
 ):
@@ -29,41 +31,37 @@ def get_comments(
     # 新しいコメント順にソート
     query = query.order_by(Comment.created_at.desc())
     
-    comments = session.exec(query).all()
+    comments = (await session.exec(query)).all()
     return comments
 
 
 @router.post("/", response_model=CommentRead)
-def create_comment(
+async def create_comment(
     comment: CommentCreate,
     session: Session = Depends(get_session),
 ):
     """
     新規コメントを作成
     """
-    db_comment = Comment.from_orm(comment)
-    session.add(db_comment)
-    session.commit()
-    session.refresh(db_comment)
-    return db_comment
+    return await run_write(_save_comment, session, Comment.from_orm(comment))
 
 
 @router.get("/{comment_id}", response_model=CommentRead)
-def get_comment(
+async def get_comment(
     comment_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_read_session),
 ):
     """
     指定IDのコメントを取得
     """
-    comment = session.get(Comment, comment_id)
+    comment = await session.get(Comment, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     return comment
 
 
 @router.put("/{comment_id}", response_model=CommentRead)
-def update_comment(
+async def update_comment(
     comment_id: int,
     comment_update: CommentUpdate,
     session: Session = Depends(get_session),
@@ -71,32 +69,51 @@ def update_comment(
     """
     指定IDのコメントを更新
     """
-    db_comment = session.get(Comment, comment_id)
+    db_comment = await run_write(
+        _update_comment, session, comment_id, comment_update.dict(exclude_unset=True)
+    )
     if not db_comment:
         raise HTTPException(status_code=404, detail="Comment not found")
-    
-    comment_data = comment_update.dict(exclude_unset=True)
-    for key, value in comment_data.items():
-        setattr(db_comment, key, value)
-    
-    session.add(db_comment)
-    session.commit()
-    session.refresh(db_comment)
     return db_comment
 
 
 @router.delete("/{comment_id}")
-def delete_comment(
+async def delete_comment(
     comment_id: int,
     session: Session = Depends(get_session),
 ):
     """
     指定IDのコメントを削除
     """
+    if not await run_write(_delete_comment, session, comment_id):
+        raise HTTPException(status_code=404, detail="Comment not found")
+    return {"status": "success", "message": "Comment deleted successfully"}
+
+
+# 書き込みはDB書き込み用スレッド（db_writer）で行う
+
+def _save_comment(session: Session, comment: Comment) -> Comment:
+    session.add(comment)
+    session.commit()
+    session.refresh(comment)
+    return comment
+
+
+def _update_comment(session: Session, comment_id: int, comment_data: Dict) -> Optional[Comment]:
     db_comment = session.get(Comment, comment_id)
     if not db_comment:
-        raise HTTPException(status_code=404, detail="Comment not found")
+        return None
+    
+    for key, value in comment_data.items():
+        setattr(db_comment, key, value)
+    return _save_comment(session, db_comment)
+
+
+def _delete_comment(session: Session, comment_id: int) -> bool:
+    db_comment = session.get(Comment, comment_id)
+    if not db_comment:
+        return False
     
     session.delete(db_comment)
     session.commit()
-    return {"status": "success", "message": "Comment deleted successfully"} 
\ No newline at end of file
+    return True 
\ No newline at end of file
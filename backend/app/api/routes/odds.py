@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlmodel import Session
+
+from app.db import get_read_session
+from app.models import Race
+from app.services.odds_history import load_odds_curve
+
+router = APIRouter(prefix="/races", tags=["odds"])
+
+
+def _to_list(values: np.ndarray) -> list:
+    """NaNをNoneに変換してJSONで返せる形にする"""
+    return [None if np.isnan(v) else round(float(v), 1) for v in values]
+
+
+@router.get("/{race_id}/odds", response_model=Dict)
+def get_odds_curve(
+    race_id: int,
+    session: Session = Depends(get_read_session),
+    start: Optional[datetime] = Query(None, description="取得開始日時"),
+    end: Optional[datetime] = Query(None, description="取得終了日時"),
+):
+    """
+    レースの単勝オッズ推移を取得
+    """
+    race = session.get(Race, race_id)
+    if not race:
+        raise HTTPException(status_code=404, detail="Race not found")
+    
+    timestamps, curve = load_odds_curve(session, race_id, start, end)
+    
+    return {
+        "race_id": race_id,
+        "horse_numbers": list(range(1, curve.shape[1] + 1)),
+        "snapshots": [
+            {"captured_at": ts.item().isoformat(), "odds": _to_list(row)}
+            for ts, row in zip(timestamps, curve)
+        ]
+    }
+
+
+@router.get("/{race_id}/odds/{horse_number}", response_model=Dict)
+def get_horse_odds_curve(
+    race_id: int,
+    horse_number: int,
+    session: Session = Depends(get_read_session),
+    start: Optional[datetime] = Query(None, description="取得開始日時"),
+    end: Optional[datetime] = Query(None, description="取得終了日時"),
+):
+    """
+    指定した馬番の単勝オッズ推移を取得
+    """
+    race = session.get(Race, race_id)
+    if not race:
+        raise HTTPException(status_code=404, detail="Race not found")
+    
+    timestamps, curve = load_odds_curve(session, race_id, start, end)
+    if horse_number < 1 or horse_number > curve.shape[1]:
+        raise HTTPException(status_code=404, detail="Horse not found")
+    
+    return {
+        "race_id": race_id,
+        "horse_number": horse_number,
+        "captured_at": [ts.item().isoformat() for ts in timestamps],
+        "odds": _to_list(curve[:, horse_number - 1])
+    }
@@ -2,9 +2,11 @@ from datetime import date
 from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends, Query
-from sqlmodel import Session, select, func
+from sqlalchemy import case
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import get_session
+from app.db import get_async_read_session
 from app.models import (
     Stats, StatsRead, Race, BettingResult
 )
@@ -13,8 +15,8 @@ router = APIRouter(tags=["stats"])
 
 
 @router.get("/stats", response_model=List[StatsRead])
-def get_stats(
-    session: Session = Depends(get_session),
+async def get_stats(
+    session: AsyncSession = Depends(get_async_read_session),
     category: Optional[str] = Query(None, description="カテゴリ（venue, course_type, race_class, etc）"),
     start_date: Optional[date] = Query(None, description="集計開始日"),
     end_date: Optional[date] = Query(None, description="集計終了日"),
@@ -36,13 +38,13 @@ def get_stats(
     # ROI降順でソート
     query = query.order_by(Stats.roi.desc())
     
-    stats = session.exec(query).all()
+    stats = (await session.exec(query)).all()
     return stats
 
 
 @router.get("/kpi", response_model=Dict)
-def get_kpi(
-    session: Session = Depends(get_session),
+async def get_kpi(
+    session: AsyncSession = Depends(get_async_read_session),
     start_date: Optional[date] = Query(None, description="集計開始日"),
     end_date: Optional[date] = Query(None, description="集計終了日"),
 ):
@@ -53,7 +55,8 @@ def get_kpi(
         func.sum(BettingResult.amount).label("total_bet"),
         func.sum(BettingResult.payout).label("total_payout"),
         func.count(BettingResult.id).label("bet_count"),
-        func.sum(func.cast(BettingResult.is_won, int)).label("win_count")
+        # 真偽値の集計はデータベースごとに異なるため、CASEで0/1に変換して合計する
+        func.sum(case((BettingResult.is_won, 1), else_=0)).label("win_count")
     )
     
     if start_date or end_date:
@@ -66,7 +69,7 @@ def get_kpi(
         if end_date:
             query = query.where(Race.race_date <= end_date)
     
-    result = session.exec(query).one()
+    result = (await session.exec(query)).one()
     
     total_bet = result.total_bet or 0
     total_payout = result.total_payout or 0
@@ -87,8 +90,8 @@ def get_kpi(
 
 
 @router.get("/recommendations", response_model=List[Dict])
-def get_recommendations(
-    session: Session = Depends(get_session),
+async def get_recommendations(
+    session: AsyncSession = Depends(get_async_read_session),
     target_date: date = Query(..., description="対象日（YYYY-MM-DD形式）"),
 ):
     """
@@ -101,7 +104,7 @@ def get_recommendations(
     
     # 平均ROIを取得
     avg_roi_query = select(func.avg(Stats.roi))
-    avg_roi = session.exec(avg_roi_query).one() or 100  # デフォルト100%
+    avg_roi = (await session.exec(avg_roi_query)).one() or 100  # デフォルト100%
     
     # 良好な条件を取得
     good_conditions_query = select(Stats).where(
@@ -109,11 +112,11 @@ def get_recommendations(
         Stats.bet_count >= min_bet_count
     ).order_by(Stats.roi.desc())
     
-    good_conditions = session.exec(good_conditions_query).all()
+    good_conditions = (await session.exec(good_conditions_query)).all()
     
     # 2. 当日のレースを取得
     today_races_query = select(Race).where(Race.race_date == target_date)
-    today_races = session.exec(today_races_query).all()
+    today_races = (await session.exec(today_races_query)).all()
     
     recommendations = []
     
@@ -4,8 +4,14 @@ from typing import Dict, Optional
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from sqlmodel import Session
 
-from app.db import get_session
+from app.db import engine, get_read_session, get_session
+from app.models import SyncJobRead
+from app.services.backfill import BackfillRunner
+from app.services.db_writer import run_write
+from app.services.odds_poller import OddsPoller
 from app.services.scraper import JRAScraper
+from app.services.settlement import settle_tickets
+from app.services.sync_jobs import SyncJobManager, get_sync_job_manager
 
 router = APIRouter(tags=["sync"])
 
@@ -13,24 +19,153 @@ router = APIRouter(tags=["sync"])
 @router.post("/sync", response_model=Dict)
 async def sync_race_data(
     background_tasks: BackgroundTasks,
-    session: Session = Depends(get_session),
+    manager: SyncJobManager = Depends(get_sync_job_manager),
     target_date: date = Query(..., description="同期対象日（YYYY-MM-DD形式）"),
     force: bool = Query(False, description="強制的に再同期する"),
 ):
     """
     指定した日付のレースデータをJRAから同期
+    
+    同じ日付の同期が実行中の場合は新たに開始せず、実行中のジョブを返す。
     """
     try:
+        job, created = await manager.submit(target_date, force)
+        if not created:
+            return {
+                "status": "success",
+                "message": f"同じ日付の同期処理が実行中です（日付: {target_date}）",
+                "job": SyncJobRead.from_orm(job)
+            }
+        
         # バックグラウンドタスクとして実行する
-        scraper = JRAScraper(session)
-        background_tasks.add_task(scraper.sync_race_data, target_date, force)
+        background_tasks.add_task(manager.run, job.id)
         
         return {
             "status": "success",
-            "message": f"同期処理を開始しました（日付: {target_date}, 強制モード: {force}）"
+            "message": f"同期処理を開始しました（日付: {target_date}, 強制モード: {force}）",
+            "job": SyncJobRead.from_orm(job)
         }
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"同期処理の開始に失敗しました: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+
+@router.get("/sync/jobs/{job_id}", response_model=SyncJobRead)
+def get_sync_job(
+    job_id: int,
+    manager: SyncJobManager = Depends(get_sync_job_manager),
+):
+    """
+    同期ジョブの状態・進捗・処理時間を取得
+    """
+    job = manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="同期ジョブが見つかりません")
+    return job
+
+
+async def _run_backfill(start_date: date, end_date: date, force: bool):
+    """バックフィルを専用セッションで実行する"""
+    with Session(engine) as session:
+        await BackfillRunner(session).run(start_date, end_date, force)
+
+
+@router.post("/sync/backfill", response_model=Dict)
+async def backfill_race_data(
+    background_tasks: BackgroundTasks,
+    start_date: date = Query(..., description="同期開始日（YYYY-MM-DD形式）"),
+    end_date: date = Query(..., description="同期終了日（YYYY-MM-DD形式）"),
+    force: bool = Query(False, description="チェックポイントを破棄して再同期する"),
+):
+    """
+    指定した期間のレースデータをJRAから同期（中断した場合は続きから再開）
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="終了日は開始日以降を指定してください")
+    
+    background_tasks.add_task(_run_backfill, start_date, end_date, force)
+    
+    return {
+        "status": "success",
+        "message": f"バックフィルを開始しました（期間: {start_date} - {end_date}, 強制モード: {force}）"
+    }
+
+
+@router.get("/sync/backfill", response_model=Dict)
+def get_backfill_progress(
+    session: Session = Depends(get_read_session),
+    start_date: date = Query(..., description="同期開始日（YYYY-MM-DD形式）"),
+    end_date: date = Query(..., description="同期終了日（YYYY-MM-DD形式）"),
+):
+    """
+    指定した期間のバックフィル進捗を取得
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="終了日は開始日以降を指定してください")
+    
+    return BackfillRunner(session).progress(start_date, end_date)
+
+
+async def _refresh_odds(target_date: date):
+    """発走前レースのオッズ更新を専用セッションで実行する"""
+    with Session(engine) as session:
+        await OddsPoller(session).poll_once(target_date)
+
+
+@router.post("/sync/odds", response_model=Dict)
+async def refresh_odds(
+    background_tasks: BackgroundTasks,
+    target_date: date = Query(..., description="対象日（YYYY-MM-DD形式）"),
+):
+    """
+    指定した日付の発走前レースのオッズのみを更新（変化した馬のみ書き込み）
+    """
+    background_tasks.add_task(_refresh_odds, target_date)
+    
+    return {
+        "status": "success",
+        "message": f"オッズの更新を開始しました（日付: {target_date}）"
+    }
+
+
+async def _refresh_results(target_date: date):
+    """発走済みレースの結果更新を専用セッションで実行する"""
+    with Session(engine) as session:
+        scraper = JRAScraper(session)
+        races = scraper.finished_races(target_date)
+        if races:
+            await scraper.refresh_results(races)
+        else:
+            await scraper.close()
+
+
+@router.post("/sync/results", response_model=Dict)
+async def refresh_results(
+    background_tasks: BackgroundTasks,
+    target_date: date = Query(..., description="対象日（YYYY-MM-DD形式）"),
+):
+    """
+    指定した日付の発走済みで結果が未登録のレースについて、結果ページのみを再取得して着順等を更新
+    """
+    background_tasks.add_task(_refresh_results, target_date)
+    
+    return {
+        "status": "success",
+        "message": f"結果の更新を開始しました（日付: {target_date}）"
+    }
+
+
+@router.post("/sync/settlement", response_model=Dict)
+async def settle_betting_results(
+    session: Session = Depends(get_session),
+    target_date: date = Query(..., description="対象日（YYYY-MM-DD形式）"),
+    resettle: bool = Query(False, description="精算済みの馬券も再計算する"),
+):
+    """
+    指定した日付の未精算の馬券を、取得済みの払戻金と照合してまとめて精算
+    
+    精算はDB書き込み用スレッド（db_writer）で行う。
+    """
+    return await run_write(settle_tickets, session, target_date, resettle=resettle)
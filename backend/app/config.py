@@ -6,11 +6,73 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 
 # データベース設定
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{BASE_DIR}/horse_racing.db")
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"  # 発行したSQLをログに出力する
+DB_PROFILE = os.getenv("DB_PROFILE", "wal")  # SQLiteの設定: wal（WAL・調整済みのPRAGMA） / default（SQLiteの既定値）
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "8"))  # 読み取り専用接続の数
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))  # PostgreSQLで保持する接続数
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))  # PostgreSQLで接続が不足した場合に追加で開く接続数
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # WALではNORMALでもコミット済みのデータは壊れない
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", str(-64 * 1024)))  # ページキャッシュ（負の値はKiB単位）
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # メモリマップするサイズ（バイト）
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000"))  # ロック解除を待つ時間（ミリ秒）
 
 # JRAスクレイピング関連
-JRA_BASE_URL = "https://www.jra.go.jp"
+JRA_BASE_URL = os.getenv("JRA_BASE_URL", "https://www.jra.go.jp")  # 検証用のスタンドインサーバーを指定可能
+JRA_TIMEZONE = "Asia/Tokyo"  # 発走時刻（タイムゾーンなしで保存）のタイムゾーン
 MAX_RETRY_COUNT = 3
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))  # バックオフの基準秒数
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))  # バックオフの上限秒数
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))  # ブレーカー作動までの連続失敗数
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))  # ブレーカー作動後の停止秒数
 REQUEST_TIMEOUT = 10  # 秒
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))  # 接続プールの最大接続数
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))  # 維持するアイドル接続数
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))  # アイドル接続の維持秒数
+SYNC_CONCURRENCY = int(os.getenv("SYNC_CONCURRENCY", "8"))  # 同時に取得するレース数の上限
+SYNC_QUEUE_SIZE = int(os.getenv("SYNC_QUEUE_SIZE", "16"))  # 同期パイプラインの段間で保持するレース数の上限
+PAST_RACES_ENABLED = os.getenv("PAST_RACES_ENABLED", "true").lower() == "true"  # 同期時に戦績を取得する
+HTML_PARSER = os.getenv("HTML_PARSER", "lxml")  # lxml / bs4-lxml / html.parser
+PARSE_EXECUTOR = os.getenv("PARSE_EXECUTOR", "process")  # HTMLパースの実行方式: process / thread / inline
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))  # パース用プールのワーカー数
+SYNC_WORKERS = int(os.getenv("SYNC_WORKERS", str(os.cpu_count() or 1)))  # 並列バックフィルの取得・パース用プロセス数
+SYNC_WRITE_BATCH_SIZE = int(os.getenv("SYNC_WRITE_BATCH_SIZE", "50"))  # 並列バックフィルで1回のコミットにまとめるレース数
+
+# オッズのポーリング間隔（発走までの残り秒数がしきい値以下になると間隔を短くする）
+ODDS_POLL_SCHEDULE = [  # (発走までの残り秒数, ポーリング間隔秒)
+    (5 * 60, 15),
+    (15 * 60, 30),
+    (60 * 60, 60),
+    (3 * 60 * 60, 5 * 60),
+]
+ODDS_POLL_MAX_INTERVAL = 15 * 60  # 発走まで3時間以上ある場合の間隔（秒）
+
+# JRAへのリクエスト流量制御（プロセス全体で共有）
+JRA_RATE_LIMIT = float(os.getenv("JRA_RATE_LIMIT", "5"))  # 初期レート（リクエスト/秒）
+JRA_MIN_RATE = float(os.getenv("JRA_MIN_RATE", "0.5"))
+JRA_MAX_RATE = float(os.getenv("JRA_MAX_RATE", "20"))
+JRA_RATE_BURST = int(os.getenv("JRA_RATE_BURST", "10"))
+JRA_MIN_CONCURRENCY = int(os.getenv("JRA_MIN_CONCURRENCY", "1"))
+JRA_MAX_CONCURRENCY = int(os.getenv("JRA_MAX_CONCURRENCY", "16"))
+JRA_LATENCY_THRESHOLD = float(os.getenv("JRA_LATENCY_THRESHOLD", "3.0"))  # 応答時間の上限（秒）
+
+# HTTPキャッシュ設定
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_DIR = Path(os.getenv("HTTP_CACHE_DIR", f"{BASE_DIR}/cache"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+HTTP_CACHE_TTL = {  # ページ種別ごとの有効期間（秒）
+    "race_list": 6 * 60 * 60,
+    "result": 24 * 60 * 60,
+    "odds": 60,
+    "horse": 24 * 60 * 60,
+}
+
+# 取得したページのアーカイブ設定（パーサー修正時にJRAへ再アクセスせず再パースするため）
+PAGE_ARCHIVE_ENABLED = os.getenv("PAGE_ARCHIVE_ENABLED", "true").lower() == "true"
+PAGE_ARCHIVE_PATH = Path(os.getenv("PAGE_ARCHIVE_PATH", f"{BASE_DIR}/archive/pages.db"))
+PAGE_ARCHIVE_LEVEL = int(os.getenv("PAGE_ARCHIVE_LEVEL", "9"))  # zstdの圧縮レベル
+PAGE_ARCHIVE_DICT_SIZE = int(os.getenv("PAGE_ARCHIVE_DICT_SIZE", str(112 * 1024)))  # 辞書のサイズ（バイト）
+PAGE_ARCHIVE_TRAIN_SAMPLES = int(os.getenv("PAGE_ARCHIVE_TRAIN_SAMPLES", "500"))  # 辞書を学習するページ数
 
 # APIドキュメント設定
 API_TITLE = "Horse Racing Analyzer API"
@@ -1,18 +1,200 @@
-from sqlmodel import Session, SQLModel, create_engine
+import threading
+from typing import Dict, Optional
 
-from app.config import DATABASE_URL
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import (
+    DATABASE_URL, DB_ECHO, DB_MAX_OVERFLOW, DB_POOL_SIZE, DB_PROFILE, DB_READ_POOL_SIZE,
+    SQLITE_BUSY_TIMEOUT, SQLITE_CACHE_SIZE, SQLITE_MMAP_SIZE, SQLITE_SYNCHRONOUS
+)
+from app.migrations import run_migrations
 from app.models import *  # noqa
 
-# エンジンを作成
-engine = create_engine(DATABASE_URL, echo=True)
+DB_PROFILES = ("wal", "default")
+
+# 非同期エンジンで使用するドライバー
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def is_sqlite_file(url: str) -> bool:
+    """ファイル上のSQLiteデータベースか（インメモリは接続ごとに別のデータベースになる）"""
+    return url.startswith("sqlite") and ":memory:" not in url and url.rstrip("/") != "sqlite:"
+
+
+def normalize_url(url: str) -> str:
+    """postgres:// で始まるURL（ホスティングサービスが発行する形式）を SQLAlchemy の形式に変換"""
+    return f"postgresql://{url[len('postgres://'):]}" if url.startswith("postgres://") else url
+
+
+def sqlite_pragmas(profile: str, readonly: bool = False) -> list:
+    """接続ごとに実行するPRAGMA"""
+    if profile not in DB_PROFILES:
+        raise ValueError(f"未対応のDBプロファイルです: {profile}")
+    if profile == "default":
+        return []
+
+    pragmas = [
+        f"PRAGMA synchronous = {SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size = {SQLITE_CACHE_SIZE}",
+        f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}",
+        f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT}",
+    ]
+    if readonly:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        # WALはデータベースファイルに記録されるため書き込み用の接続でのみ設定する
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")
+    return pragmas
+
+
+def create_db_engine(
+    url: str = DATABASE_URL,
+    profile: str = DB_PROFILE,
+    readonly: bool = False,
+    echo: bool = DB_ECHO,
+) -> Engine:
+    """
+    設定に応じたエンジンを作成
+
+    ファイル上のSQLiteでは、書き込み用（接続は1本のみ）と読み取り専用（DB_READ_POOL_SIZE 本の
+    接続を保持）に分けて作成する。書き込みはDB書き込み用スレッド（db_writer）で1件ずつ行うため、
+    SQLiteの書き込みロックを取り合わない。WALでは読み取りが書き込みのコミットを待たないため、
+    同期中もGETリクエストの応答が遅れない。
+    """
+    url = normalize_url(url)
+    if not url.startswith("sqlite"):
+        # PostgreSQLは読み取りと書き込みを同じ接続プールで扱う（MVCCのため読み取りは書き込みを待たない）
+        return create_engine(url, echo=echo, **_server_pool_options())
+
+    # 同期処理ではセッションをイベントループと書き込み用スレッド（db_writer）で交互に使用するため、
+    # SQLiteの接続を作成したスレッド以外からも使用できるようにする
+    connect_args = {"check_same_thread": False}
+    if not is_sqlite_file(url):
+        return create_engine(url, echo=echo, connect_args=connect_args)
+
+    engine = create_engine(
+        url, echo=echo, connect_args=connect_args, poolclass=QueuePool, **_pool_sizes(readonly)
+    )
+    _apply_pragmas(engine, sqlite_pragmas(profile, readonly))
+    return engine
+
+
+def async_url(url: str) -> str:
+    """同期用のURLを非同期ドライバーのURLに変換する（psycopg2 などの同期ドライバーの指定は置き換える）"""
+    scheme, _, rest = url.partition("://")
+    driver = ASYNC_DRIVERS.get(scheme.split("+", 1)[0])
+    return f"{driver}://{rest}" if driver else url
+
+
+def create_async_db_engine(
+    url: str = DATABASE_URL,
+    profile: str = DB_PROFILE,
+    readonly: bool = False,
+    echo: bool = DB_ECHO,
+) -> AsyncEngine:
+    """
+    設定に応じた非同期エンジンを作成（SQLiteは aiosqlite、PostgreSQLは asyncpg）
+
+    接続プールとPRAGMAの設定は create_db_engine と同じ。アプリケーションでは読み取りにのみ使用する。
+    """
+    if not url.startswith("sqlite"):
+        return create_async_engine(async_url(url), echo=echo, **_server_pool_options())
+    if not is_sqlite_file(url):
+        return create_async_engine(async_url(url), echo=echo)
 
+    engine = create_async_engine(
+        async_url(url), echo=echo, poolclass=AsyncAdaptedQueuePool, **_pool_sizes(readonly)
+    )
+    _apply_pragmas(engine.sync_engine, sqlite_pragmas(profile, readonly))
+    return engine
 
-def create_db_and_tables():
-    """データベースとテーブルを作成する"""
-    SQLModel.metadata.create_all(engine)
+
+def _server_pool_options() -> Dict:
+    # 再起動やアイドル切断で閉じられた接続を使用前に検出する
+    return {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_pre_ping": True}
+
+
+def _pool_sizes(readonly: bool) -> Dict[str, int]:
+    if readonly:
+        return {"pool_size": DB_READ_POOL_SIZE, "max_overflow": DB_READ_POOL_SIZE}
+    # 書き込み用の接続は1本のみ（使用中の場合は解放を待つ）
+    return {"pool_size": 1, "max_overflow": 0}
+
+
+def _apply_pragmas(engine: Engine, pragmas: list):
+    """接続を開くたびにPRAGMAを実行する"""
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+
+# 書き込み用エンジン（コミットと同期処理に使用）
+engine = create_db_engine(DATABASE_URL)
+# 読み取り専用エンジン（GETリクエストに使用。インメモリのSQLiteやSQLite以外では書き込み用と共有）
+read_engine = (
+    create_db_engine(DATABASE_URL, readonly=True)
+    if is_sqlite_file(DATABASE_URL) else engine
+)
+
+
+def migrate_db():
+    """データベースを最新のスキーマに移行する（未作成のテーブルの作成を含む）"""
+    return run_migrations(engine)
 
 
 def get_session():
     """DBセッションを取得する"""
     with Session(engine) as session:
-        yield session 
\ No newline at end of file
+        yield session
+
+
+def get_read_session():
+    """読み取り専用のDBセッションを取得する（書き込みを行うとエラーになる）"""
+    with Session(read_engine) as session:
+        yield session
+
+
+# 非同期エンジン（async def のルートの読み取りに使用。初回の使用時に作成する）
+# 書き込みは async def のルートからも db_writer のスレッドで書き込み用エンジンを使用して行う
+_async_engine: Optional[AsyncEngine] = None
+_async_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEngine:
+    """プロセス共有の非同期エンジンを取得（ファイル上のSQLiteでは読み取り専用）"""
+    global _async_engine
+    with _async_lock:
+        if _async_engine is None:
+            _async_engine = create_async_db_engine(
+                DATABASE_URL, readonly=is_sqlite_file(DATABASE_URL)
+            )
+        return _async_engine
+
+
+async def dispose_async_engine():
+    """非同期エンジンの接続をすべて閉じる"""
+    global _async_engine
+    with _async_lock:
+        async_engine, _async_engine = _async_engine, None
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+async def get_async_read_session():
+    """非同期の読み取り専用のDBセッションを取得する"""
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
@@ -1,11 +1,17 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import os
 import sentry_sdk
 
 from app.config import API_TITLE, API_DESCRIPTION, API_VERSION, CORS_ORIGINS
-from app.db import create_db_and_tables
-from app.api.routes import races, comments, stats, sync
+from app.db import dispose_async_engine, migrate_db
+from app.services.db_writer import shutdown_db_writer
+from app.services.http_client import close_http_client, open_http_client
+from app.services.parse_pool import shutdown_parse_executor
+from app.services.sync_jobs import get_sync_job_manager
+from app.api.routes import races, comments, stats, sync, odds
 from app.api import feedback
 
 # Sentryの初期化（本番環境のみ）
@@ -19,10 +25,28 @@ if os.environ.get('ENV') == 'production':
         enable_tracing=True,
     )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    migrate_db()
+    # 前回の停止時に実行中だった同期ジョブを中断として記録
+    get_sync_job_manager().fail_interrupted()
+    # スクレイパーが共有するHTTP接続プール
+    await open_http_client()
+    try:
+        yield
+    finally:
+        await close_http_client()
+        shutdown_parse_executor()
+        shutdown_db_writer()
+        await dispose_async_engine()
+
+
 app = FastAPI(
     title=API_TITLE,
     description=API_DESCRIPTION,
     version=API_VERSION,
+    lifespan=lifespan,
 )
 
 # CORS設定
@@ -35,17 +59,13 @@ app.add_middleware(
 )
 
 
-@app.on_event("startup")
-def on_startup():
-    create_db_and_tables()
-
-
 @app.get("/")
 async def root():
     return {"message": "Horse Racing Analyzer API", "version": API_VERSION}
 
 # APIルーターを登録
 app.include_router(races.router)
+app.include_router(odds.router)
 app.include_router(comments.router)
 app.include_router(stats.router)
 app.include_router(sync.router)
@@ -0,0 +1,165 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+
+from app.models import *  # noqa
+from app.models.sync_job import ACTIVE_CONDITION
+
+logger = logging.getLogger(__name__)
+
+# 適用済みのマイグレーションを記録するテーブル
+VERSION_TABLE = "schema_migrations"
+
+
+class MigrationError(Exception):
+    """マイグレーションを適用できない状態（一意インデックスを作成できない重複など）"""
+
+
+@dataclass
+class Migration:
+    """スキーマの変更（version の昇順に1回だけ適用する）"""
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _create_tables(conn: Connection):
+    # 未作成のテーブルを作成する（新規のデータベースではモデルに定義したインデックスもここで作成される）
+    SQLModel.metadata.create_all(conn)
+
+
+def _check_duplicates(conn: Connection, table: str, columns: List[str]):
+    """一意インデックスを作成する前に重複行がないことを確認する"""
+    keys = ", ".join(columns)
+    duplicates = conn.execute(text(
+        f"SELECT {keys}, COUNT(*) FROM {table} GROUP BY {keys} HAVING COUNT(*) > 1 LIMIT 10"
+    )).all()
+    if duplicates:
+        samples = ", ".join(str(tuple(row[:-1])) for row in duplicates)
+        raise MigrationError(
+            f"{table} の ({keys}) に重複した行があるため一意インデックスを作成できません: {samples}"
+        )
+
+
+def _add_hot_lookup_indexes(conn: Connection):
+    # 既存のデータベースに、レース・出走馬・コメントの検索用の複合インデックスと一意インデックスを追加する
+    _check_duplicates(conn, "race", ["race_id"])
+    _check_duplicates(conn, "horse", ["race_id", "horse_id"])
+
+    # race_id の単一列インデックスは一意インデックスに作り直す
+    unique_race_id = any(
+        index["name"] == "ix_race_race_id" and index["unique"]
+        for index in inspect(conn).get_indexes("race")
+    )
+    if not unique_race_id:
+        conn.execute(text("DROP INDEX IF EXISTS ix_race_race_id"))
+        conn.execute(text("CREATE UNIQUE INDEX ix_race_race_id ON race (race_id)"))
+
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_race_race_date_venue_race_number "
+        "ON race (race_date, venue, race_number)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_horse_race_id_horse_id ON horse (race_id, horse_id)",
+        "CREATE INDEX IF NOT EXISTS ix_horse_race_id_horse_number ON horse (race_id, horse_number)",
+        "CREATE INDEX IF NOT EXISTS ix_comment_race_id_created_at ON comment (race_id, created_at)",
+    ):
+        conn.execute(text(statement))
+
+
+def _drop_checkpoint_completed_at(conn: Connection):
+    # 完了日時は created_at と同じ値のため、チェックポイントの completed_at 列を削除する
+    columns = {column["name"] for column in inspect(conn).get_columns("backfillcheckpoint")}
+    if "completed_at" in columns:
+        conn.execute(text("ALTER TABLE backfillcheckpoint DROP COLUMN completed_at"))
+
+
+def _add_sync_job_active_index(conn: Connection):
+    # 同じ日付の実行中のジョブを1件に制限する（複数のプロセスから同時に登録しても重複させない）
+    # 既存の重複は最新のジョブ以外を中断として記録する
+    conn.execute(
+        text(
+            f"UPDATE syncjob SET status = 'failed', message = :message WHERE {ACTIVE_CONDITION} "
+            f"AND id NOT IN (SELECT MAX(id) FROM syncjob WHERE {ACTIVE_CONDITION} GROUP BY target_date)"
+        ),
+        {"message": "同じ日付のジョブが重複していたため中断しました"},
+    )
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_syncjob_active_target_date "
+        f"ON syncjob (target_date) WHERE {ACTIVE_CONDITION}"
+    ))
+
+
+def _make_page_hash_index_unique(conn: Connection):
+    # ページのハッシュを (race_id, page_type) ごとに1行とする（登録/更新を一括で行うため一意インデックスにする）
+    # 既存の重複は最新の行だけを残す
+    conn.execute(text(
+        "DELETE FROM racepagehash WHERE id NOT IN "
+        "(SELECT MAX(id) FROM racepagehash GROUP BY race_id, page_type)"
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS ix_racepagehash_race_id_page_type"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX ix_racepagehash_race_id_page_type ON racepagehash (race_id, page_type)"
+    ))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "テーブルを作成", _create_tables),
+    Migration(2, "レース・出走馬・コメントの複合インデックスと一意インデックスを追加", _add_hot_lookup_indexes),
+    Migration(3, "チェックポイントの completed_at 列を削除", _drop_checkpoint_completed_at),
+    Migration(4, "同じ日付の実行中の同期ジョブを1件に制限する部分一意インデックスを追加", _add_sync_job_active_index),
+    Migration(5, "ページのハッシュの (race_id, page_type) インデックスを一意インデックスに変更", _make_page_hash_index_unique),
+]
+
+
+def _ensure_version_table(conn: Connection):
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+        "version INTEGER PRIMARY KEY, description TEXT NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+
+
+def current_version(engine: Engine) -> int:
+    """適用済みの最新のバージョン（未適用の場合は0）"""
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        return conn.execute(text(f"SELECT MAX(version) FROM {VERSION_TABLE}")).scalar() or 0
+
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    """未適用のマイグレーション"""
+    version = current_version(engine)
+    return [migration for migration in MIGRATIONS if migration.version > version]
+
+
+def run_migrations(engine: Engine, target: Optional[int] = None) -> List[int]:
+    """
+    未適用のマイグレーションを順に適用し、適用したバージョンを返す
+
+    マイグレーションごとに1つのトランザクションで適用し、失敗した場合は例外を送出する
+    （適用済みのものは残る）。SQLiteではDDLがトランザクション外で確定する場合があるため、
+    各マイグレーションは途中で失敗しても再実行できるように書く。
+    """
+    applied = []
+    for migration in pending_migrations(engine):
+        if target is not None and migration.version > target:
+            break
+        with engine.begin() as conn:
+            migration.upgrade(conn)
+            conn.execute(
+                text(
+                    f"INSERT INTO {VERSION_TABLE} (version, description, applied_at) "
+                    "VALUES (:version, :description, :applied_at)"
+                ),
+                {
+                    "version": migration.version,
+                    "description": migration.description,
+                    "applied_at": datetime.now(),
+                },
+            )
+        logger.info(f"マイグレーション {migration.version} を適用しました: {migration.description}")
+        applied.append(migration.version)
+    return applied
@@ -9,4 +9,9 @@ from app.models.betting import (
     BettingResult, BettingResultBase, BettingResultCreate,
     BettingResultRead, BettingResultUpdate
 )
-from app.models.stats import Stats, StatsBase, StatsCreate, StatsRead, StatsUpdate 
\ No newline at end of file
+from app.models.stats import Stats, StatsBase, StatsCreate, StatsRead, StatsUpdate
+from app.models.backfill import BackfillCheckpoint, BackfillCheckpointBase, BackfillCheckpointRead
+from app.models.odds import OddsSnapshot, OddsSnapshotBase
+from app.models.sync_job import SyncJob, SyncJobBase, SyncJobRead
+from app.models.page_hash import RacePageHash, RacePageHashBase
+from app.models.payout import RacePayout, RacePayoutBase, RacePayoutRead
@@ -0,0 +1,24 @@
+from datetime import date
+from typing import Optional
+
+from sqlmodel import Field, SQLModel
+
+from app.models.base import Base, TimeStampMixin
+
+
+class BackfillCheckpointBase(SQLModel):
+    """バックフィルのチェックポイント基本属性"""
+    target_date: date = Field(index=True, description="同期対象日")
+    race_id: Optional[str] = Field(
+        default=None, index=True, description="JRA レースID（日付単位の完了記録ではNone）"
+    )
+
+
+class BackfillCheckpoint(BackfillCheckpointBase, Base, TimeStampMixin, table=True):
+    """バックフィルのチェックポイントモデル（完了日時は created_at）"""
+    pass
+
+
+class BackfillCheckpointRead(BackfillCheckpointBase):
+    """チェックポイント読み取り用レスポンスモデル"""
+    id: int
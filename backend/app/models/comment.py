@@ -1,4 +1,5 @@
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.base import Base, TimeStampMixin
@@ -14,6 +15,10 @@ class CommentBase(SQLModel):
 
 class Comment(CommentBase, Base, TimeStampMixin, table=True):
     """コメントモデル"""
+    __table_args__ = (
+        Index("ix_comment_race_id_created_at", "race_id", "created_at"),
+    )
+
     race: "Race" = Relationship(back_populates="comments")
     horse: "Horse" = Relationship(back_populates="comments")
 
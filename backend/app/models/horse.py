@@ -1,4 +1,5 @@
 from typing import List, Optional
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.base import Base, TimeStampMixin
@@ -21,7 +22,12 @@ class HorseBase(SQLModel):
 
 
 class Horse(HorseBase, Base, TimeStampMixin, table=True):
-    """馬モデル"""
+    """馬モデル（1レース・1頭あたり1行）"""
+    __table_args__ = (
+        Index("ix_horse_race_id_horse_id", "race_id", "horse_id", unique=True),
+        Index("ix_horse_race_id_horse_number", "race_id", "horse_number"),
+    )
+
     race: "Race" = Relationship(back_populates="horses")
     past_races: List["HorsePastRace"] = Relationship(back_populates="horse")
     comments: List["Comment"] = Relationship(back_populates="horse")
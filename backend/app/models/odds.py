@@ -0,0 +1,20 @@
+from datetime import datetime
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+from app.models.base import Base
+
+
+class OddsSnapshotBase(SQLModel):
+    """オッズスナップショットの基本属性"""
+    race_id: int = Field(foreign_key="race.id", description="レースID")
+    captured_at: datetime = Field(default_factory=datetime.now, description="取得日時")
+    odds: bytes = Field(description="馬番順の単勝オッズ（float32リトルエンディアン、欠損はNaN）")
+
+
+class OddsSnapshot(OddsSnapshotBase, Base, table=True):
+    """オッズスナップショットモデル（1レース・1時点あたり1行）"""
+    __table_args__ = (
+        Index("ix_oddssnapshot_race_id_captured_at", "race_id", "captured_at"),
+    )
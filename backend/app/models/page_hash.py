@@ -0,0 +1,18 @@
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+from app.models.base import Base, TimeStampMixin
+
+
+class RacePageHashBase(SQLModel):
+    """取得済みページの内容ハッシュ基本属性"""
+    race_id: str = Field(description="JRA レースID")
+    page_type: str = Field(description="ページ種別（result / odds）")
+    digest: str = Field(description="ページ本文のSHA-1")
+
+
+class RacePageHash(RacePageHashBase, Base, TimeStampMixin, table=True):
+    """取得済みページの内容ハッシュモデル（1レース・1ページ種別あたり1行）"""
+    __table_args__ = (
+        Index("ix_racepagehash_race_id_page_type", "race_id", "page_type", unique=True),
+    )
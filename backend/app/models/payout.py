@@ -0,0 +1,27 @@
+from typing import Optional
+
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+from app.models.base import Base, TimeStampMixin
+
+
+class RacePayoutBase(SQLModel):
+    """レースの払戻金基本属性"""
+    race_id: int = Field(foreign_key="race.id", description="レースID")
+    bet_type: str = Field(description="馬券種類（単勝 / 複勝 / 馬連 / ワイド / 馬単 / 三連複 / 三連単 / 返還）")
+    bet_numbers: str = Field(description="的中の馬番組み合わせ（'-'区切り、順不同の券種は昇順）")
+    payout: int = Field(description="100円あたりの払戻金")
+    popularity: Optional[int] = Field(default=None, description="人気")
+
+
+class RacePayout(RacePayoutBase, Base, TimeStampMixin, table=True):
+    """レースの払戻金モデル（1レース・1券種・1組み合わせあたり1行）"""
+    __table_args__ = (
+        Index("ix_racepayout_race_id_bet_type", "race_id", "bet_type"),
+    )
+
+
+class RacePayoutRead(RacePayoutBase):
+    """払戻金読み取り用レスポンスモデル"""
+    id: int
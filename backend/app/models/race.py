@@ -1,6 +1,7 @@
 from datetime import date, datetime
 from typing import List, Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 from app.models.base import Base, TimeStampMixin
@@ -8,7 +9,7 @@ from app.models.base import Base, TimeStampMixin
 
 class RaceBase(SQLModel):
     """レースの基本属性"""
-    race_id: str = Field(index=True, description="JRA レースID")
+    race_id: str = Field(index=True, unique=True, description="JRA レースID")
     race_date: date = Field(index=True, description="開催日")
     venue: str = Field(index=True, description="開催場")
     race_number: int = Field(index=True, description="レース番号")
@@ -23,6 +24,10 @@ class RaceBase(SQLModel):
 
 class Race(RaceBase, Base, TimeStampMixin, table=True):
     """レースモデル"""
+    __table_args__ = (
+        Index("ix_race_race_date_venue_race_number", "race_date", "venue", "race_number"),
+    )
+
     horses: List["Horse"] = Relationship(back_populates="race")
     comments: List["Comment"] = Relationship(back_populates="race")
     betting_results: List["BettingResult"] = Relationship(back_populates="race")
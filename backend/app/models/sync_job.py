@@ -0,0 +1,49 @@
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import Index, text
+from sqlmodel import Field, SQLModel
+
+from app.models.base import Base, TimeStampMixin
+
+# 実行中とみなすジョブの状態
+ACTIVE_STATUSES = ("pending", "running")
+# 実行中のジョブの条件（日付ごとに1件に制限する部分一意インデックスの条件）
+ACTIVE_CONDITION = "status IN ({})".format(", ".join(f"'{status}'" for status in ACTIVE_STATUSES))
+
+
+class SyncJobBase(SQLModel):
+    """同期ジョブの基本属性"""
+    target_date: date = Field(index=True, description="同期対象日")
+    force: bool = Field(default=False, description="強制モード")
+    status: str = Field(
+        default="pending", index=True,
+        description="pending / running / success / partial_failure / no_data / skipped / failed"
+    )
+    message: Optional[str] = Field(default=None, description="結果メッセージ")
+    races_total: int = Field(default=0, description="対象レース数")
+    races_done: int = Field(default=0, description="保存したレース数")
+    races_failed: int = Field(default=0, description="失敗したレース数")
+    races_unchanged: int = Field(default=0, description="前回から変化のなかったレース数")
+    started_at: Optional[datetime] = Field(default=None, description="開始日時")
+    finished_at: Optional[datetime] = Field(default=None, description="終了日時")
+    elapsed_seconds: Optional[float] = Field(default=None, description="所要時間（秒）")
+    fetch_seconds: float = Field(default=0.0, description="取得段の処理時間の合計（秒）")
+    parse_seconds: float = Field(default=0.0, description="パース段の処理時間の合計（秒）")
+    write_seconds: float = Field(default=0.0, description="保存段の処理時間の合計（秒）")
+    races_per_second: Optional[float] = Field(default=None, description="処理速度（レース/秒）")
+
+
+class SyncJob(SyncJobBase, Base, TimeStampMixin, table=True):
+    """同期ジョブモデル（同じ日付の実行中のジョブは1件のみ）"""
+    __table_args__ = (
+        Index(
+            "ix_syncjob_active_target_date", "target_date", unique=True,
+            sqlite_where=text(ACTIVE_CONDITION), postgresql_where=text(ACTIVE_CONDITION)
+        ),
+    )
+
+
+class SyncJobRead(SyncJobBase):
+    """同期ジョブ読み取り用レスポンスモデル"""
+    id: int
@@ -0,0 +1,199 @@
+import logging
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from app.models import BackfillCheckpoint, Race
+from app.services.db_writer import read_all, run_write
+from app.services.scraper import JRAScraper, jra_now
+
+logger = logging.getLogger(__name__)
+
+
+def iter_dates(start_date: date, end_date: date) -> Iterator[date]:
+    """開始日から終了日まで（両端を含む）の日付を順に返す"""
+    current = start_date
+    while current <= end_date:
+        yield current
+        current += timedelta(days=1)
+
+
+def no_data_is_final(target_date: date, today: Optional[date] = None) -> bool:
+    """
+    レースが見つからなかった日付を完了として記録してよいか
+
+    当日以降の日付はレース一覧が未公開の場合があるため、過去の日付のみ記録する。
+    """
+    return target_date < (today or jra_now().date())
+
+
+def summarize(results: List[Dict]) -> Dict:
+    """日付ごとの結果をバックフィル全体の結果にまとめる"""
+    error_count = sum(1 for r in results if r["status"] in ("error", "partial_failure"))
+
+    return {
+        "status": "success" if error_count == 0 else "partial_failure",
+        "message": f"{len(results) - error_count}/{len(results)}日分のデータを同期しました",
+        "details": results
+    }
+
+
+class BackfillRunner:
+    """期間指定でレースデータを同期するバックフィル処理
+
+    日付ごとの作業単位で JRAScraper を実行し、完了した日付とレースを
+    BackfillCheckpoint に記録する。中断後に再実行すると記録済みの作業は
+    スキップされ、途中から再開する。
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        scraper_factory: Callable[[Session], JRAScraper] = JRAScraper,
+    ):
+        self.session = session
+        self.scraper_factory = scraper_factory
+
+    def completed_dates(self, start_date: date, end_date: date) -> Set[date]:
+        """期間内で同期が完了している日付を取得"""
+        rows = read_all(
+            self.session,
+            select(BackfillCheckpoint.target_date).where(
+                BackfillCheckpoint.target_date >= start_date,
+                BackfillCheckpoint.target_date <= end_date,
+                BackfillCheckpoint.race_id.is_(None),
+            )
+        )
+        return set(rows)
+
+    def completed_race_ids(self, target_date: date) -> Set[str]:
+        """指定日付で保存が完了しているレースIDを取得"""
+        rows = read_all(
+            self.session,
+            select(BackfillCheckpoint.race_id).where(
+                BackfillCheckpoint.target_date == target_date,
+                BackfillCheckpoint.race_id.is_not(None),
+            )
+        )
+        return set(rows)
+
+    def reset(self, start_date: date, end_date: date):
+        """期間内のチェックポイントを削除（書き込み用スレッドで呼び出す）"""
+        checkpoints = self.session.exec(
+            select(BackfillCheckpoint).where(
+                BackfillCheckpoint.target_date >= start_date,
+                BackfillCheckpoint.target_date <= end_date,
+            )
+        ).all()
+        for checkpoint in checkpoints:
+            self.session.delete(checkpoint)
+        self.session.commit()
+
+    def _record(self, target_date: date, race_id: Optional[str] = None):
+        """チェックポイントを記録（書き込み用スレッドで呼び出す）"""
+        self.session.add(BackfillCheckpoint(target_date=target_date, race_id=race_id))
+        self.session.commit()
+
+    def pending_work(
+        self, start_date: date, end_date: date, force: bool = False
+    ) -> List[Tuple[date, Optional[Set[str]]]]:
+        """
+        期間内の日付ごとに、保存済みのレースIDを返す（同期不要な日付は None）
+
+        チェックポイントがなく既にデータがある日付は同期済みとして記録する（書き込み用スレッドで呼び出す）。
+        """
+        done_dates = self.completed_dates(start_date, end_date)
+        work = []
+
+        for target_date in iter_dates(start_date, end_date):
+            if target_date in done_dates:
+                work.append((target_date, None))
+                continue
+
+            done_race_ids = self.completed_race_ids(target_date)
+
+            # チェックポイントがなく既にデータがある日付は同期済みとみなす
+            if not force and not done_race_ids:
+                existing_races = read_all(
+                    self.session, select(Race.id).where(Race.race_date == target_date).limit(1)
+                )
+                if existing_races:
+                    self._record(target_date)
+                    work.append((target_date, None))
+                    continue
+
+            work.append((target_date, done_race_ids))
+
+        return work
+
+    async def run(self, start_date: date, end_date: date, force: bool = False) -> Dict:
+        """期間内のレースデータを同期する"""
+        if end_date < start_date:
+            raise ValueError("終了日は開始日以降を指定してください")
+
+        logger.info(f"バックフィル開始: {start_date} - {end_date}, 強制モード: {force}")
+
+        if force:
+            await run_write(self.reset, start_date, end_date)
+
+        results = []
+
+        work = await run_write(self.pending_work, start_date, end_date, force)
+        for target_date, done_race_ids in work:
+            if done_race_ids is None:
+                results.append({"date": target_date.isoformat(), "status": "skipped"})
+                continue
+
+            scraper = self.scraper_factory(self.session)
+            try:
+                result = await scraper.sync_race_data(
+                    target_date,
+                    force=True,
+                    skip_race_ids=done_race_ids,
+                    on_race_saved=lambda race_id, d=target_date: self._record(d, race_id),
+                )
+            except Exception as e:
+                logger.error(f"バックフィル {target_date} 同期エラー: {str(e)}", exc_info=True)
+                results.append({
+                    "date": target_date.isoformat(),
+                    "status": "error",
+                    "message": str(e)
+                })
+                continue
+
+            details = result.get("details", [])
+            if result["status"] == "no_data":
+                if no_data_is_final(target_date):
+                    await run_write(self._record, target_date)
+                status = "no_data"
+            elif result["status"] == "skipped" or all(d["status"] == "success" for d in details):
+                await run_write(self._record, target_date)
+                status = "success" if result["status"] == "success" else result["status"]
+            else:
+                status = "partial_failure"
+
+            results.append({
+                "date": target_date.isoformat(),
+                "status": status,
+                "message": result.get("message", "")
+            })
+
+        return summarize(results)
+
+    def progress(self, start_date: date, end_date: date) -> Dict:
+        """期間内のバックフィル進捗を取得"""
+        total_dates = (end_date - start_date).days + 1
+        completed_races = self.session.exec(
+            select(BackfillCheckpoint.id).where(
+                BackfillCheckpoint.target_date >= start_date,
+                BackfillCheckpoint.target_date <= end_date,
+                BackfillCheckpoint.race_id.is_not(None),
+            )
+        ).all()
+
+        return {
+            "total_dates": total_dates,
+            "completed_dates": len(self.completed_dates(start_date, end_date)),
+            "completed_races": len(completed_races)
+        }
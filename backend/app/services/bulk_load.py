@@ -0,0 +1,251 @@
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy import delete, insert, text
+from sqlmodel import Session, select
+
+from app.models import Horse, HorsePastRace, OddsSnapshot, Race, RacePayout
+from app.services.odds_history import encode_odds
+
+logger = logging.getLogger(__name__)
+
+# ステージングテーブルに投入する列（出走馬と過去レースはJRAのIDで紐付ける）
+RACE_COLUMNS = (
+    "race_id", "race_date", "venue", "race_number", "race_name", "race_class", "course_type",
+    "distance", "weather", "track_condition", "start_time"
+)
+HORSE_COLUMNS = (
+    "horse_id", "horse_name", "horse_number", "jockey", "trainer", "weight", "odds",
+    "result_order", "result_time", "result_margin", "result_corner_position"
+)
+PAST_RACE_COLUMNS = (
+    "race_date", "venue", "race_name", "result_order", "horse_count", "jockey", "weight",
+    "course_condition", "memo"
+)
+
+
+def supports_copy(session: Session) -> bool:
+    """COPYによる一括投入に対応したデータベースか（PostgreSQLのみ）"""
+    return session.get_bind().dialect.name == "postgresql"
+
+
+# COPYでNULLとして読み込む値（空文字列と区別するため）
+COPY_NULL = "\\N"
+
+
+def encode_csv(rows: Iterable[Sequence]) -> io.StringIO:
+    """
+    COPY ... WITH (FORMAT csv, NULL '\\N') で読み込めるCSVに変換（日付・日時はISO形式）
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in rows:
+        writer.writerow([_copy_value(value) for value in row])
+    buffer.seek(0)
+    return buffer
+
+
+def _copy_value(value):
+    if value is None:
+        return COPY_NULL
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def bulk_load_races(session: Session, races: List[Tuple[Dict, Dict]]) -> Dict[str, int]:
+    """
+    複数のレースをCOPYでステージングテーブルに投入し、本テーブルにまとめて反映する
+
+    レースと出走馬は一意インデックスを競合対象として登録/更新し（JRAScraper._save_race_data と
+    同じく、オッズがない馬は既存のオッズを残す）、過去レース・オッズの推移・払戻金も
+    レース数によらず一定回数のクエリで書き込む。コミットは呼び出し側で行う。
+    JRAのレースID→レースの主キーの辞書を返す。
+    """
+    if not races:
+        return {}
+
+    # 同じレースが複数含まれる場合は後のものを使う
+    latest = {race_detail["race_id"]: (race_detail, odds_data) for race_detail, odds_data in races}
+    now = datetime.now()
+
+    race_rows = []
+    horse_rows = {}
+    past_race_rows = []
+    horse_keys = set()
+    for race_id, (race_detail, odds_data) in latest.items():
+        race_rows.append([race_detail.get(column) for column in RACE_COLUMNS])
+        win_odds = odds_data.get("win_odds", {})
+        for horse_data in race_detail.get("horses", []):
+            horse_keys.update(horse_data)
+            values = {**horse_data, "odds": win_odds.get(horse_data["horse_number"]) or None}
+            # ON CONFLICT は1文の中で同じ行を2回更新できないため、同じ馬は後のものを使う
+            horse_rows[(race_id, horse_data["horse_id"])] = [race_id] + [
+                values.get(column) for column in HORSE_COLUMNS
+            ]
+            for past_race in horse_data.get("past_races", []):
+                past_race_rows.append([race_id, horse_data["horse_id"]] + [
+                    past_race.get(column) for column in PAST_RACE_COLUMNS
+                ])
+
+    connection = session.connection()
+    dialect = connection.dialect
+    cursor = connection.connection.cursor()
+    try:
+        _create_staging(cursor, dialect, "staging_race", Race, [], RACE_COLUMNS)
+        _create_staging(cursor, dialect, "staging_horse", Horse, ["race_key"], HORSE_COLUMNS)
+        _create_staging(
+            cursor, dialect, "staging_past_race", HorsePastRace, ["race_key", "horse_key"],
+            PAST_RACE_COLUMNS
+        )
+        _copy(cursor, "staging_race", RACE_COLUMNS, race_rows)
+        _copy(cursor, "staging_horse", ("race_key",) + HORSE_COLUMNS, list(horse_rows.values()))
+        _copy(
+            cursor, "staging_past_race", ("race_key", "horse_key") + PAST_RACE_COLUMNS, past_race_rows
+        )
+    finally:
+        cursor.close()
+
+    race_ids = _merge_races(session, now)
+    # 入力に含まれない列は既存の値を残す（レース前のページには結果の列がない）
+    horse_columns = [c for c in HORSE_COLUMNS if c in horse_keys or c == "odds"]
+    _merge_horses(session, horse_columns, now)
+    if past_race_rows:
+        _merge_past_races(session, now)
+
+    _store_snapshots(
+        session, {race_ids[race_id]: odds for race_id, (_, odds) in latest.items()}, now
+    )
+    _store_payouts(session, {
+        race_ids[race_id]: race_detail.get("payouts", [])
+        for race_id, (race_detail, _) in latest.items()
+    })
+    return race_ids
+
+
+def _create_staging(cursor, dialect, name: str, model, keys: List[str], columns: Sequence[str]):
+    """トランザクション内でのみ使用する一時テーブルを作成（既にある場合は空にする）"""
+    table = model.__table__
+    definitions = [f"{key} VARCHAR NOT NULL" for key in keys] + [
+        f"{column} {table.c[column].type.compile(dialect=dialect)}" for column in columns
+    ]
+    cursor.execute(
+        f"CREATE TEMPORARY TABLE IF NOT EXISTS {name} ({', '.join(definitions)}) "
+        "ON COMMIT DELETE ROWS"
+    )
+    cursor.execute(f"TRUNCATE {name}")
+
+
+def _copy(cursor, name: str, columns: Sequence[str], rows: List[List]):
+    if rows:
+        cursor.copy_expert(
+            f"COPY {name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            encode_csv(rows)
+        )
+
+
+def _merge_races(session: Session, now: datetime) -> Dict[str, int]:
+    columns = ", ".join(RACE_COLUMNS)
+    updates = ", ".join(
+        f"{column} = EXCLUDED.{column}" for column in RACE_COLUMNS if column != "race_id"
+    )
+    rows = session.execute(
+        text(
+            f"INSERT INTO race ({columns}, created_at, updated_at) "
+            f"SELECT {columns}, :now, :now FROM staging_race "
+            f"ON CONFLICT (race_id) DO UPDATE SET {updates}, updated_at = EXCLUDED.updated_at "
+            "RETURNING race_id, id"
+        ),
+        {"now": now},
+    ).all()
+    return dict(rows)
+
+
+def _merge_horses(session: Session, columns: List[str], now: datetime):
+    selected = ", ".join(f"s.{column}" for column in columns)
+    updates = ", ".join(
+        "odds = COALESCE(EXCLUDED.odds, horse.odds)" if column == "odds"
+        else f"{column} = EXCLUDED.{column}"
+        for column in columns
+        if column != "horse_id"
+    )
+    session.execute(
+        text(
+            f"INSERT INTO horse (race_id, {', '.join(columns)}, created_at, updated_at) "
+            f"SELECT r.id, {selected}, :now, :now FROM staging_horse s "
+            "JOIN race r ON r.race_id = s.race_key "
+            f"ON CONFLICT (race_id, horse_id) DO UPDATE SET {updates}, "
+            "updated_at = EXCLUDED.updated_at"
+        ),
+        {"now": now},
+    )
+
+
+def _merge_past_races(session: Session, now: datetime):
+    columns = ", ".join(PAST_RACE_COLUMNS)
+    selected = ", ".join(f"s.{column}" for column in PAST_RACE_COLUMNS)
+    session.execute(
+        text(
+            f"INSERT INTO horsepastrace (horse_id, {columns}, created_at, updated_at) "
+            f"SELECT h.id, {selected}, :now, :now FROM staging_past_race s "
+            "JOIN race r ON r.race_id = s.race_key "
+            "JOIN horse h ON h.race_id = r.id AND h.horse_id = s.horse_key"
+        ),
+        {"now": now},
+    )
+
+
+def _store_snapshots(session: Session, win_odds_by_race: Dict[int, Dict], now: datetime):
+    """直前のスナップショットと内容が異なるレースのみオッズの推移を追加（record_snapshot と同じ）"""
+    blobs = {race_id: encode_odds(odds["win_odds"]) for race_id, odds in win_odds_by_race.items()
+             if odds.get("win_odds")}
+    if not blobs:
+        return
+
+    latest = dict(session.execute(
+        select(OddsSnapshot.race_id, OddsSnapshot.odds)
+        .where(OddsSnapshot.race_id.in_(list(blobs)))
+        .distinct(OddsSnapshot.race_id)
+        .order_by(OddsSnapshot.race_id, OddsSnapshot.captured_at.desc())
+    ).all())
+    rows = [
+        {"race_id": race_id, "odds": blob, "captured_at": now}
+        for race_id, blob in blobs.items()
+        if latest.get(race_id) != blob
+    ]
+    if rows:
+        session.execute(insert(OddsSnapshot.__table__), rows)
+
+
+def _store_payouts(session: Session, payouts_by_race: Dict[int, List[Dict]]):
+    """登録済みの内容と異なるレースのみ払戻金を入れ替える（store_payouts と同じ）"""
+    payouts_by_race = {race_id: payouts for race_id, payouts in payouts_by_race.items() if payouts}
+    if not payouts_by_race:
+        return
+
+    existing: Dict[int, set] = {race_id: set() for race_id in payouts_by_race}
+    for race_id, bet_type, bet_numbers, payout, popularity in session.execute(
+        select(
+            RacePayout.race_id, RacePayout.bet_type, RacePayout.bet_numbers,
+            RacePayout.payout, RacePayout.popularity
+        ).where(RacePayout.race_id.in_(list(payouts_by_race)))
+    ).all():
+        existing[race_id].add((bet_type, bet_numbers, payout, popularity))
+
+    changed = [
+        race_id for race_id, payouts in payouts_by_race.items()
+        if existing[race_id] != {
+            (p["bet_type"], p["bet_numbers"], p["payout"], p.get("popularity")) for p in payouts
+        }
+    ]
+    if not changed:
+        return
+
+    now = datetime.now()
+    session.execute(delete(RacePayout).where(RacePayout.race_id.in_(changed)))
+    session.execute(insert(RacePayout.__table__), [
+        {**{"popularity": None}, **payout, "race_id": race_id, "created_at": now, "updated_at": now}
+        for race_id in changed
+        for payout in payouts_by_race[race_id]
+    ])
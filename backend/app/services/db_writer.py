@@ -0,0 +1,63 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from sqlmodel import Session
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def get_db_writer() -> ThreadPoolExecutor:
+    """
+    プロセス共有のDB書き込み用スレッドを取得
+
+    ワーカーは1スレッドのみのため、同時に実行される同期ジョブやバックフィルの書き込みも
+    投入順に1件ずつ実行される（SQLiteの書き込みロックを取り合わない）。
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        return _executor
+
+
+def shutdown_db_writer():
+    """書き込み用スレッドを停止（投入済みの書き込みは完了を待つ）"""
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+async def run_write(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    書き込み処理を書き込み用スレッドで実行し、完了を待つ
+
+    コミットやディスクへの同期の間もイベントループは他のリクエストや通信を処理できる。
+    func が使用するセッションは、完了を待つ間に他から使用しないこと。
+    """
+    future = asyncio.get_running_loop().run_in_executor(
+        get_db_writer(), functools.partial(func, *args, **kwargs)
+    )
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # 書き込み中のセッションを呼び出し側がロールバック等で使用しないよう、完了を待ってから中断する
+        await asyncio.wait([future])
+        raise
+
+
+def read_all(session: Session, statement) -> List:
+    """
+    session と同じデータベースを、読み取りの間だけ使用するセッションで読み取る
+
+    書き込み用の接続は1本のみのため、イベントループ側の読み取りで session が接続を保持したまま
+    通信を待つと、書き込み用スレッドでの他の書き込みが接続の解放を待ち続ける。
+    ORMのオブジェクトはセッションから切り離された状態で返す。
+    """
+    with Session(session.get_bind()) as reader:
+        return reader.exec(statement).all()
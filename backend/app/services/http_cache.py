@@ -0,0 +1,298 @@
+import asyncio
+import copy
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+from app.config import (
+    HTTP_CACHE_DIR, HTTP_CACHE_ENABLED, HTTP_CACHE_MAX_BYTES, HTTP_CACHE_TTL
+)
+
+logger = logging.getLogger(__name__)
+
+# パース済み結果をメモリ上に保持する件数の上限
+PARSED_CACHE_SIZE = 1024
+
+# 他のプロセス（APIと並列バックフィル等）の書き込みによるロックの解除を待つ秒数
+BUSY_TIMEOUT = 30
+
+
+@dataclass
+class CacheEntry:
+    """キャッシュ済みレスポンス"""
+    url: str
+    page_type: str
+    body: str
+    digest: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+class HTTPCache:
+    """URLをキーにレスポンス本文を保存するディスクキャッシュ
+
+    ページ種別ごとのTTL内であればキャッシュをそのまま返し、期限切れの場合は
+    ETag / Last-Modified による条件付きリクエストで再検証する。合計サイズが
+    上限を超えると最終アクセスが古い順に削除する（LRU）。
+    キャッシュヒット時の最終アクセス日時はメモリ上に記録し、次の保存時にまとめて書き込む。
+    参照は書き込みとは別の接続・ロックで行うため、キャッシュ用スレッドでの保存（コミット）を待たない。
+    データベースのエラーはキャッシュミスとして扱い、取得処理は続行する。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES,
+        ttls: Optional[Dict[str, int]] = None,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttls = ttls if ttls is not None else HTTP_CACHE_TTL
+        # 書き込み用の接続、参照用の接続、メモリ上の記録（パース結果・最終アクセス日時）のロック
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._memory_lock = threading.Lock()
+        self._parsed: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._accessed: Dict[str, float] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="http-cache")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=BUSY_TIMEOUT)
+        # 書き込み中も読み込み（イベントループ上のキャッシュ参照）を待たせないようWALで開く
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                page_type TEXT NOT NULL,
+                body TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_http_cache_last_access ON http_cache (last_access)"
+        )
+        self._conn.commit()
+        self._reader = sqlite3.connect(
+            str(self.path), check_same_thread=False, timeout=BUSY_TIMEOUT
+        )
+        self._reader.execute("PRAGMA query_only = ON")
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            try:
+                self._flush_access()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"HTTPキャッシュの最終アクセス日時の保存に失敗: {str(e)}")
+            self._conn.close()
+        with self._read_lock:
+            self._reader.close()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """キャッシュを取得し、最終アクセス日時を記録（書き込みは次の保存時に行う）"""
+        with self._read_lock:
+            try:
+                row = self._reader.execute(
+                    "SELECT url, page_type, body, digest, etag, last_modified, fetched_at "
+                    "FROM http_cache WHERE url = ?",
+                    (url,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"HTTPキャッシュの読み込みに失敗: {url}: {str(e)}")
+                return None
+        if row is None:
+            return None
+        with self._memory_lock:
+            self._accessed[url] = time.time()
+        return CacheEntry(*row)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """TTL内のキャッシュかどうか"""
+        ttl = self.ttls.get(entry.page_type, 0)
+        return time.time() - entry.fetched_at < ttl
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """再検証用の条件付きリクエストヘッダー"""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, url: str, page_type: str, response: httpx.Response) -> CacheEntry:
+        """レスポンスを保存"""
+        body = response.text
+        entry = CacheEntry(
+            url=url,
+            page_type=page_type,
+            body=body,
+            digest=hashlib.sha1(body.encode("utf-8")).hexdigest(),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            fetched_at=time.time(),
+        )
+        size = len(body.encode("utf-8"))
+
+        with self._memory_lock:
+            self._accessed.pop(url, None)
+        with self._lock:
+            try:
+                self._flush_access()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO http_cache "
+                    "(url, page_type, body, digest, etag, last_modified, fetched_at, last_access, size) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        entry.url, entry.page_type, entry.body, entry.digest, entry.etag,
+                        entry.last_modified, entry.fetched_at, entry.fetched_at, size
+                    )
+                )
+                self._evict()
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                logger.warning(f"HTTPキャッシュへの保存に失敗: {url}: {str(e)}")
+
+        return entry
+
+    async def store_async(self, url: str, page_type: str, response: httpx.Response) -> CacheEntry:
+        """store をキャッシュ用スレッドで実行（イベントループ上で書き込まない）"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.store, url, page_type, response
+        )
+
+    def revalidated(self, entry: CacheEntry, response: httpx.Response) -> CacheEntry:
+        """304応答を受けたキャッシュの取得日時と検証子を更新"""
+        entry.fetched_at = time.time()
+        entry.etag = response.headers.get("ETag") or entry.etag
+        entry.last_modified = response.headers.get("Last-Modified") or entry.last_modified
+
+        with self._memory_lock:
+            self._accessed.pop(entry.url, None)
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "UPDATE http_cache SET fetched_at = ?, last_access = ?, etag = ?, last_modified = ? "
+                    "WHERE url = ?",
+                    (entry.fetched_at, entry.fetched_at, entry.etag, entry.last_modified, entry.url)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                logger.warning(f"HTTPキャッシュの更新に失敗: {entry.url}: {str(e)}")
+
+        return entry
+
+    async def revalidated_async(self, entry: CacheEntry, response: httpx.Response) -> CacheEntry:
+        """revalidated をキャッシュ用スレッドで実行（イベントループ上で書き込まない）"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.revalidated, entry, response
+        )
+
+    def parsed(self, entry: CacheEntry) -> Optional[Any]:
+        """同一本文のパース結果があれば返す（なければNone）"""
+        key = (entry.url, entry.digest)
+        with self._memory_lock:
+            if key in self._parsed:
+                self._parsed.move_to_end(key)
+                return copy.deepcopy(self._parsed[key])
+        return None
+
+    def remember(self, entry: CacheEntry, parsed: Any) -> Any:
+        """パース結果を記録する（呼び出し側には複製を返す）"""
+        with self._memory_lock:
+            self._parsed[(entry.url, entry.digest)] = parsed
+            while len(self._parsed) > PARSED_CACHE_SIZE:
+                self._parsed.popitem(last=False)
+
+        return copy.deepcopy(parsed)
+
+    def parse(self, entry: CacheEntry, parser: Callable[[str], Any]) -> Any:
+        """キャッシュ本文をパースする（同一本文のパース結果は再利用）"""
+        parsed = self.parsed(entry)
+        if parsed is not None:
+            return parsed
+        return self.remember(entry, parser(entry.body))
+
+    def _flush_access(self):
+        """記録しておいた最終アクセス日時を書き込む（コミットは呼び出し側で行う）"""
+        with self._memory_lock:
+            accessed, self._accessed = self._accessed, {}
+        if not accessed:
+            return
+        self._conn.executemany(
+            "UPDATE http_cache SET last_access = ? WHERE url = ?",
+            [(accessed_at, url) for url, accessed_at in accessed.items()]
+        )
+
+    def _evict(self):
+        """合計サイズが上限を超えた分を最終アクセスの古い順に削除"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT url, size FROM http_cache ORDER BY last_access"
+        ).fetchall()
+        evicted = []
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((url,))
+            total -= size
+
+        self._conn.executemany("DELETE FROM http_cache WHERE url = ?", evicted)
+        logger.debug(f"HTTPキャッシュから{len(evicted)}件を削除しました")
+
+    def clear(self):
+        """すべてのキャッシュを削除"""
+        with self._lock:
+            self._conn.execute("DELETE FROM http_cache")
+            self._conn.commit()
+        with self._memory_lock:
+            self._parsed.clear()
+            self._accessed.clear()
+
+
+_shared_cache: Optional[HTTPCache] = None
+_cache_enabled: bool = HTTP_CACHE_ENABLED
+
+
+def disable_http_cache():
+    """このプロセスでは共有のHTTPキャッシュを使用しない（開いている場合は閉じる）"""
+    global _shared_cache, _cache_enabled
+    _cache_enabled = False
+    if _shared_cache is not None:
+        _shared_cache.close()
+        _shared_cache = None
+
+
+def get_http_cache() -> Optional[HTTPCache]:
+    """プロセス共有のHTTPキャッシュを取得（無効化されている場合はNone）"""
+    global _shared_cache
+    if not _cache_enabled:
+        return None
+    if _shared_cache is None:
+        _shared_cache = HTTPCache(HTTP_CACHE_DIR / "http_cache.db")
+    return _shared_cache
@@ -0,0 +1,59 @@
+import logging
+from typing import Optional
+
+import httpx
+
+from app.config import (
+    HTTP2_ENABLED, HTTP_KEEPALIVE_EXPIRY, HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE,
+    REQUEST_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """接続プール設定を適用したHTTPクライアントを作成"""
+    http2 = HTTP2_ENABLED and _http2_available()
+    if HTTP2_ENABLED and not http2:
+        logger.warning("h2 がインストールされていないため HTTP/1.1 で接続します")
+
+    return httpx.AsyncClient(
+        timeout=REQUEST_TIMEOUT,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+async def open_http_client() -> httpx.AsyncClient:
+    """アプリケーション共有のHTTPクライアントを開く"""
+    global _client
+    if _client is None:
+        _client = create_http_client()
+    return _client
+
+
+async def close_http_client():
+    """アプリケーション共有のHTTPクライアントを閉じる"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client() -> Optional[httpx.AsyncClient]:
+    """共有HTTPクライアントを取得（開かれていない場合はNone）"""
+    return _client
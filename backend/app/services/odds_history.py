@@ -0,0 +1,88 @@
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.models import OddsSnapshot
+
+logger = logging.getLogger(__name__)
+
+# スナップショットのエンコード形式（馬番1始まりの位置に格納する）
+ODDS_DTYPE = np.dtype("<f4")
+
+
+def encode_odds(win_odds: Dict[int, float]) -> bytes:
+    """馬番→オッズの辞書を馬番順のfloat32配列にパック（欠損はNaN）"""
+    size = max(win_odds, default=0)
+    values = np.full(size, np.nan, dtype=ODDS_DTYPE)
+    for horse_number, odds in win_odds.items():
+        if horse_number >= 1:
+            values[horse_number - 1] = odds
+    return values.tobytes()
+
+
+def decode_odds(blob: bytes) -> np.ndarray:
+    """パックされたオッズをNumPy配列に展開（index 0 が馬番1）"""
+    return np.frombuffer(blob, dtype=ODDS_DTYPE)
+
+
+def record_snapshot(
+    session: Session,
+    race_id: int,
+    win_odds: Dict[int, float],
+    captured_at: Optional[datetime] = None,
+) -> Optional[OddsSnapshot]:
+    """
+    オッズのスナップショットを追加する（コミットは呼び出し側で行う）
+
+    直前のスナップショットと同じ内容の場合は追加しない。
+    """
+    if not win_odds:
+        return None
+
+    blob = encode_odds(win_odds)
+    latest = session.exec(
+        select(OddsSnapshot.odds)
+        .where(OddsSnapshot.race_id == race_id)
+        .order_by(OddsSnapshot.captured_at.desc())
+        .limit(1)
+    ).first()
+    if latest == blob:
+        return None
+
+    snapshot = OddsSnapshot(race_id=race_id, odds=blob, captured_at=captured_at or datetime.now())
+    session.add(snapshot)
+    return snapshot
+
+
+def load_odds_curve(
+    session: Session,
+    race_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    レースのオッズ推移を取得
+
+    (取得日時の datetime64 配列, 形状が (スナップショット数, 最大馬番) のオッズ行列) を返す。
+    """
+    query = select(OddsSnapshot.captured_at, OddsSnapshot.odds).where(
+        OddsSnapshot.race_id == race_id
+    )
+    if start:
+        query = query.where(OddsSnapshot.captured_at >= start)
+    if end:
+        query = query.where(OddsSnapshot.captured_at <= end)
+
+    rows = session.exec(query.order_by(OddsSnapshot.captured_at)).all()
+
+    timestamps = np.array([captured_at for captured_at, _ in rows], dtype="datetime64[s]")
+    arrays = [decode_odds(blob) for _, blob in rows]
+    width = max((len(a) for a in arrays), default=0)
+    curve = np.full((len(arrays), width), np.nan, dtype=ODDS_DTYPE)
+    for i, values in enumerate(arrays):
+        curve[i, :len(values)] = values
+
+    return timestamps, curve
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlmodel import Session, select
+
+from app.config import ODDS_POLL_MAX_INTERVAL, ODDS_POLL_SCHEDULE
+from app.models import Race
+from app.services.db_writer import read_all
+from app.services.scraper import JRAScraper, jra_now
+
+logger = logging.getLogger(__name__)
+
+
+def poll_interval(seconds_to_post: float) -> float:
+    """発走までの残り秒数に応じたポーリング間隔（秒）"""
+    for threshold, interval in ODDS_POLL_SCHEDULE:
+        if seconds_to_post <= threshold:
+            return interval
+    return ODDS_POLL_MAX_INTERVAL
+
+
+class OddsPoller:
+    """発走前のレースのオッズを定期的に更新する
+
+    オッズページのみを取得し、発走時刻が近いレースほど短い間隔で再取得する。
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        scraper_factory: Callable[[Session], JRAScraper] = JRAScraper,
+    ):
+        self.session = session
+        self.scraper_factory = scraper_factory
+        self.next_poll_at: Dict[int, datetime] = {}
+
+    def upcoming_races(self, target_date: date, now: datetime) -> List[Race]:
+        """指定日付の発走前のレース"""
+        return read_all(
+            self.session,
+            select(Race).where(
+                Race.race_date == target_date,
+                Race.start_time > now,
+            ).order_by(Race.start_time)
+        )
+
+    async def poll_once(self, target_date: date, now: Optional[datetime] = None) -> Dict:
+        """ポーリング時刻に達したレースのオッズを更新（now は日本時間）"""
+        now = now or jra_now()
+        races = self.upcoming_races(target_date, now)
+        due = [race for race in races if self.next_poll_at.get(race.id, now) <= now]
+
+        updated = 0
+        if due:
+            result = await self.scraper_factory(self.session).refresh_odds(due)
+            updated = result.get("updated", 0)
+            logger.info(f"オッズ更新: {len(due)}レース, {updated}頭")
+
+        for race in due:
+            seconds_to_post = (race.start_time - now).total_seconds()
+            self.next_poll_at[race.id] = now + timedelta(seconds=poll_interval(seconds_to_post))
+
+        next_poll_at = min(
+            (self.next_poll_at.get(race.id, now) for race in races), default=None
+        )
+
+        return {
+            "status": "success",
+            "upcoming": len(races),
+            "polled": len(due),
+            "updated": updated,
+            "next_poll_at": next_poll_at
+        }
+
+    async def run(self, target_date: date, stop_event: Optional[asyncio.Event] = None):
+        """発走前のレースがなくなるまでオッズを更新し続ける"""
+        logger.info(f"オッズのポーリング開始: {target_date}")
+
+        while True:
+            try:
+                result = await self.poll_once(target_date)
+            except Exception as e:
+                logger.error(f"オッズ更新エラー: {str(e)}", exc_info=True)
+                result = {"upcoming": 1, "next_poll_at": None}
+
+            if not result["upcoming"]:
+                break
+
+            now = jra_now()
+            next_poll_at = result["next_poll_at"] or now + timedelta(seconds=60)
+            wait = max(1.0, (next_poll_at - now).total_seconds())
+
+            if stop_event is None:
+                await asyncio.sleep(wait)
+                continue
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=wait)
+                break
+            except asyncio.TimeoutError:
+                pass
+
+        logger.info(f"オッズのポーリング終了: {target_date}")
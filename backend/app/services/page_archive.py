@@ -0,0 +1,315 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import (
+    PAGE_ARCHIVE_DICT_SIZE, PAGE_ARCHIVE_ENABLED, PAGE_ARCHIVE_LEVEL, PAGE_ARCHIVE_PATH,
+    PAGE_ARCHIVE_TRAIN_SAMPLES
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstandard未インストール環境
+    zstandard = None
+
+# アーカイブするページ種別（レースIDをキーに持つページ）
+ARCHIVED_PAGE_TYPES = ("result", "odds")
+
+
+@dataclass
+class ArchivedPage:
+    """アーカイブ済みのページ"""
+    race_id: str
+    page_type: str
+    fetched_at: float
+    url: str
+    body: str
+
+
+class PageArchive:
+    """取得したページ本文を圧縮して保存するアーカイブ
+
+    レースID・ページ種別・取得日時をキーに保存し、直前と同じ本文は保存しない。
+    ページ種別ごとに PAGE_ARCHIVE_TRAIN_SAMPLES 件たまった時点でzstdの辞書を別スレッドで学習し、
+    以降のページは辞書を使って圧縮する（同じ構造のHTMLが多いため圧縮率が大きく上がる）。
+    zstandard がない環境ではzlibで圧縮する。
+    同期中は store_async でアーカイブ用スレッドから保存し、圧縮と書き込みでイベントループを占有しない。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        level: int = PAGE_ARCHIVE_LEVEL,
+        dict_size: int = PAGE_ARCHIVE_DICT_SIZE,
+        train_samples: int = PAGE_ARCHIVE_TRAIN_SAMPLES,
+    ):
+        self.path = Path(path)
+        self.level = level
+        self.dict_size = dict_size
+        self.train_samples = train_samples
+        self._lock = threading.Lock()
+        self._dictionaries: Dict[int, "zstandard.ZstdCompressionDict"] = {}
+        self._latest_dict: Dict[str, int] = {}
+        self._compressors: Dict[Optional[int], "zstandard.ZstdCompressor"] = {}
+        self._decompressors: Dict[Optional[int], "zstandard.ZstdDecompressor"] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="page-archive")
+        self._trainer: Optional[threading.Thread] = None
+
+        if zstandard is None:
+            logger.warning("zstandard がインストールされていないため、ページアーカイブはzlibで圧縮します")
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # 並列バックフィルでは複数プロセスから書き込むため、ロック解除を長めに待つ
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                race_id TEXT NOT NULL,
+                page_type TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                url TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                dict_id INTEGER,
+                body BLOB NOT NULL,
+                PRIMARY KEY (race_id, page_type, fetched_at)
+            );
+            CREATE TABLE IF NOT EXISTS dictionaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                page_type TEXT NOT NULL,
+                data BLOB NOT NULL,
+                created_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.wait_for_training()
+        with self._lock:
+            self._conn.close()
+
+    async def store_async(self, race_id: str, page_type: str, url: str, body: str) -> bool:
+        """store をアーカイブ用スレッドで実行"""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.store, race_id, page_type, url, body
+        )
+
+    def store(self, race_id: str, page_type: str, url: str, body: str) -> bool:
+        """
+        ページを保存する（直前に保存した本文と同じ場合は保存せず False を返す）
+        """
+        digest = hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+        with self._lock:
+            latest = self._conn.execute(
+                "SELECT digest FROM pages WHERE race_id = ? AND page_type = ? "
+                "ORDER BY fetched_at DESC LIMIT 1",
+                (race_id, page_type)
+            ).fetchone()
+            if latest and latest[0] == digest:
+                return False
+
+            codec, dict_id, blob = self._compress(page_type, body.encode("utf-8"))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(race_id, page_type, fetched_at, url, digest, codec, dict_id, body) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (race_id, page_type, time.time(), url, digest, codec, dict_id, blob)
+            )
+            self._conn.commit()
+
+            if codec == "zstd" and dict_id is None:
+                self._train_if_ready(page_type)
+
+        return True
+
+    def wait_for_training(self):
+        """学習中の辞書があれば学習の完了まで待つ"""
+        trainer = self._trainer
+        if trainer is not None:
+            trainer.join()
+
+    def latest(
+        self, page_type: str, race_ids: Optional[Iterable[str]] = None
+    ) -> Iterator[ArchivedPage]:
+        """レースごとに最後に保存したページを返す（race_ids を省略するとすべてのレース）"""
+        query = (
+            "SELECT p.race_id, p.page_type, p.fetched_at, p.url, p.codec, p.dict_id, p.body "
+            "FROM pages p JOIN ("
+            "  SELECT race_id, MAX(fetched_at) AS fetched_at FROM pages WHERE page_type = ? "
+            "  GROUP BY race_id"
+            ") l ON p.race_id = l.race_id AND p.fetched_at = l.fetched_at "
+            "WHERE p.page_type = ?"
+        )
+        params: List = [page_type, page_type]
+        if race_ids is not None:
+            race_ids = list(race_ids)
+            if not race_ids:
+                return
+            query += f" AND p.race_id IN ({', '.join('?' * len(race_ids))})"
+            params.extend(race_ids)
+
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY p.race_id", params).fetchall()
+
+        for race_id, page_type, fetched_at, url, codec, dict_id, blob in rows:
+            with self._lock:
+                body = self._decompress(codec, dict_id, blob)
+            yield ArchivedPage(race_id, page_type, fetched_at, url, body)
+
+    def stats(self) -> Dict[str, Dict]:
+        """ページ種別ごとの件数と圧縮後のサイズ"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_type, COUNT(*), SUM(LENGTH(body)), COUNT(dict_id) "
+                "FROM pages GROUP BY page_type"
+            ).fetchall()
+        return {
+            page_type: {"pages": count, "bytes": size, "with_dictionary": with_dict}
+            for page_type, count, size, with_dict in rows
+        }
+
+    def train_dictionary(self, page_type: str) -> Optional[int]:
+        """
+        保存済みのページからzstdの辞書を学習し、辞書IDを返す
+
+        学習中はロックを解放するため、その間も他のページを保存できる。
+        """
+        if zstandard is None:
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT codec, dict_id, body FROM pages WHERE page_type = ? "
+                "ORDER BY fetched_at DESC LIMIT ?",
+                (page_type, self.train_samples)
+            ).fetchall()
+            samples = [
+                self._decompress(codec, dict_id, blob).encode("utf-8") for codec, dict_id, blob in rows
+            ]
+        try:
+            dictionary = zstandard.train_dictionary(self.dict_size, samples)
+        except zstandard.ZstdError as e:
+            logger.warning(f"{page_type}ページの辞書の学習に失敗しました: {str(e)}")
+            return None
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO dictionaries (page_type, data, created_at) VALUES (?, ?, ?)",
+                (page_type, dictionary.as_bytes(), time.time())
+            )
+            self._conn.commit()
+            dict_id = cursor.lastrowid
+            self._dictionaries[dict_id] = dictionary
+            self._latest_dict[page_type] = dict_id
+        logger.info(f"{page_type}ページの辞書を{len(samples)}件から学習しました（ID: {dict_id}）")
+        return dict_id
+
+    def _train_if_ready(self, page_type: str):
+        """
+        辞書なしで圧縮したページが一定数たまったら辞書の学習を別スレッドで開始
+        （ロック取得済みで呼び出す。同時に学習するのは1種別のみ）
+        """
+        if self._trainer is not None and self._trainer.is_alive():
+            return
+        if self._dictionary_for(page_type) is not None:
+            return
+        count = self._conn.execute(
+            "SELECT COUNT(*) FROM pages WHERE page_type = ? AND dict_id IS NULL", (page_type,)
+        ).fetchone()[0]
+        if count >= self.train_samples:
+            self._trainer = threading.Thread(
+                target=self._train_in_background, args=(page_type,),
+                name="page-archive-trainer", daemon=True
+            )
+            self._trainer.start()
+
+    def _train_in_background(self, page_type: str):
+        try:
+            self.train_dictionary(page_type)
+        except Exception as e:
+            logger.warning(f"{page_type}ページの辞書の学習に失敗しました: {str(e)}")
+
+    def _dictionary_for(self, page_type: str) -> Optional[int]:
+        """ページ種別の最新の辞書ID（他のプロセスが学習した辞書も参照する）"""
+        if page_type not in self._latest_dict:
+            row = self._conn.execute(
+                "SELECT MAX(id) FROM dictionaries WHERE page_type = ?", (page_type,)
+            ).fetchone()
+            if row[0] is None:
+                return None
+            self._latest_dict[page_type] = row[0]
+        return self._latest_dict[page_type]
+
+    def _load_dictionary(self, dict_id: int) -> "zstandard.ZstdCompressionDict":
+        if dict_id not in self._dictionaries:
+            data = self._conn.execute(
+                "SELECT data FROM dictionaries WHERE id = ?", (dict_id,)
+            ).fetchone()[0]
+            self._dictionaries[dict_id] = zstandard.ZstdCompressionDict(data)
+        return self._dictionaries[dict_id]
+
+    def _compress(self, page_type: str, data: bytes) -> Tuple[str, Optional[int], bytes]:
+        if zstandard is None:
+            return "zlib", None, zlib.compress(data, self.level)
+
+        dict_id = self._dictionary_for(page_type)
+        compressor = self._compressors.get(dict_id)
+        if compressor is None:
+            if dict_id is None:
+                compressor = zstandard.ZstdCompressor(level=self.level)
+            else:
+                compressor = zstandard.ZstdCompressor(
+                    level=self.level, dict_data=self._load_dictionary(dict_id)
+                )
+            self._compressors[dict_id] = compressor
+        return "zstd", dict_id, compressor.compress(data)
+
+    def _decompress(self, codec: str, dict_id: Optional[int], blob: bytes) -> str:
+        if codec == "zlib":
+            return zlib.decompress(blob).decode("utf-8")
+        if zstandard is None:
+            raise RuntimeError("zstdで圧縮されたページの展開には zstandard が必要です")
+
+        decompressor = self._decompressors.get(dict_id)
+        if decompressor is None:
+            if dict_id is None:
+                decompressor = zstandard.ZstdDecompressor()
+            else:
+                decompressor = zstandard.ZstdDecompressor(dict_data=self._load_dictionary(dict_id))
+            self._decompressors[dict_id] = decompressor
+        return decompressor.decompress(blob).decode("utf-8")
+
+
+_shared_archive: Optional[PageArchive] = None
+_archive_enabled: bool = PAGE_ARCHIVE_ENABLED
+
+
+def disable_page_archive():
+    """このプロセスでは共有のページアーカイブを使用しない（開いている場合は閉じる）"""
+    global _shared_archive, _archive_enabled
+    _archive_enabled = False
+    if _shared_archive is not None:
+        _shared_archive.close()
+        _shared_archive = None
+
+
+def get_page_archive() -> Optional[PageArchive]:
+    """プロセス共有のページアーカイブを取得（無効化されている場合はNone）"""
+    global _shared_archive
+    if not _archive_enabled:
+        return None
+    if _shared_archive is None:
+        _shared_archive = PageArchive(PAGE_ARCHIVE_PATH)
+    return _shared_archive
@@ -0,0 +1,332 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlmodel import Session
+
+from app.config import (
+    HTML_PARSER, JRA_BASE_URL, JRA_MAX_RATE, JRA_MIN_RATE, JRA_RATE_LIMIT, SYNC_CONCURRENCY,
+    SYNC_QUEUE_SIZE, SYNC_WORKERS, SYNC_WRITE_BATCH_SIZE
+)
+from app.models import BackfillCheckpoint
+from app.services import parsers
+from app.services.backfill import BackfillRunner, no_data_is_final, summarize
+from app.services.db_writer import run_write
+from app.services.http_cache import disable_http_cache
+from app.services.http_client import close_http_client, open_http_client
+from app.services.page_archive import disable_page_archive
+from app.services.parse_pool import configure_parse_executor
+from app.services.rate_limit import AdaptiveLimiter
+from app.services.scraper import JRAScraper
+
+logger = logging.getLogger(__name__)
+
+# 取得・パース用プロセスからの応答を待つ間隔（秒、プロセスの異常終了の検知に使用）
+POLL_INTERVAL = 1.0
+
+
+@dataclass
+class WorkerOptions:
+    """取得・パース用プロセスの設定（流量はプロセス数で等分した値）"""
+    base_url: str = JRA_BASE_URL
+    rate: float = JRA_RATE_LIMIT
+    min_rate: float = JRA_MIN_RATE
+    max_rate: float = JRA_MAX_RATE
+    concurrency: int = SYNC_CONCURRENCY
+    parser_backend: str = HTML_PARSER
+
+
+def partition(work: List[Tuple[date, Set[str]]], workers: int) -> List[List[Tuple[date, Set[str]]]]:
+    """日付を順に各プロセスへ振り分ける（開催日と非開催日が偏らないよう交互に割り当てる）"""
+    return [part for part in (work[i::workers] for i in range(workers)) if part]
+
+
+def run_worker(worker_id: int, work: List[Tuple[date, Set[str]]], options: WorkerOptions, results):
+    """取得・パース用プロセスのエントリポイント"""
+    # デーモンプロセスは子プロセスを持てないため、レース一覧もプロセス内でパースする
+    configure_parse_executor("inline")
+    # HTTPキャッシュとページアーカイブのSQLiteファイルに複数プロセスから書き込まないよう使用しない
+    disable_http_cache()
+    disable_page_archive()
+    asyncio.run(_sync_dates(worker_id, work, options, results))
+
+
+async def _sync_dates(worker_id: int, work: List[Tuple[date, Set[str]]], options: WorkerOptions, results):
+    """
+    割り当てられた日付のレースを取得・パースし、結果をキューで書き込み側に送る
+
+    データベース・HTTPキャッシュ・ページアーカイブには接続しない。
+    HTTPクライアントとリミッターはプロセスごとに持つ。
+    """
+    loop = asyncio.get_running_loop()
+    stats = Counter()
+
+    async def send(message: Tuple):
+        # キューが満杯の場合は書き込み側が追いつくまで待つ
+        await loop.run_in_executor(None, results.put, message)
+
+    await open_http_client()
+    limiter = AdaptiveLimiter(
+        rate=options.rate, min_rate=options.min_rate, max_rate=options.max_rate,
+        concurrency=options.concurrency
+    )
+    scraper = JRAScraper(
+        None, concurrency=options.concurrency, parser_backend=options.parser_backend,
+        limiter=limiter, fetch_past_races=False, base_url=options.base_url
+    )
+    semaphore = asyncio.Semaphore(scraper.concurrency)
+
+    async def sync_race(race_info: Dict, target_date: date):
+        race_id = race_info["race_id"]
+        try:
+            async with semaphore:
+                started = time.perf_counter()
+                detail_page, odds_page = await scraper._fetch_race(race_info, target_date)
+                stats["fetch_seconds"] += time.perf_counter() - started
+
+            # このプロセス自体が並列化の単位のため、パースはプロセス内で直接行う
+            started = time.perf_counter()
+            race_detail = parsers.parse_race_detail(
+                detail_page.text, race_id, race_info["venue"], race_info["race_number"],
+                target_date, scraper.parser_backend
+            )
+            odds_data = (
+                parsers.parse_odds(odds_page.text, scraper.parser_backend)
+                if odds_page else {"win_odds": {}}
+            )
+            stats["parse_seconds"] += time.perf_counter() - started
+        except Exception as e:
+            logger.error(f"レース {race_id} 同期エラー: {str(e)}")
+            await send(("race_error", target_date, race_id, str(e)))
+            return
+        await send(("race", target_date, race_id, race_detail, odds_data))
+
+    try:
+        for target_date, done_race_ids in work:
+            try:
+                races_list = await scraper._fetch_races_list(target_date)
+            except Exception as e:
+                await send(("date", target_date, "error", str(e)))
+                continue
+
+            if not races_list:
+                await send(("date", target_date, "no_data", f"{target_date}のレースは見つかりませんでした"))
+                continue
+
+            pending = [r for r in races_list if r["race_id"] not in done_race_ids]
+            await asyncio.gather(*(sync_race(race_info, target_date) for race_info in pending))
+            await send(("date", target_date, "done", f"{len(pending)}レースを取得しました"))
+    finally:
+        await scraper.close()
+        await close_http_client()
+        await send(("worker_done", worker_id, dict(stats)))
+
+
+class ParallelBackfillRunner:
+    """複数プロセスで取得・パースするバックフィル処理
+
+    日付をプロセスに振り分け、各プロセスが独自のHTTPクライアントでレースを取得・パースする。
+    パース済みのレースはキューで本プロセスに集め、本プロセスのみがデータベースに書き込む
+    （batch_size 件ごとに1回のコミット）。チェックポイントの扱いは BackfillRunner と同じ。
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        workers: int = SYNC_WORKERS,
+        batch_size: int = SYNC_WRITE_BATCH_SIZE,
+        options: Optional[WorkerOptions] = None,
+    ):
+        self.session = session
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.options = options or WorkerOptions()
+        self.backfill = BackfillRunner(session)
+        self.throughput: Dict = {}
+
+    def worker_options(self, workers: int) -> WorkerOptions:
+        """全体の流量が設定値を超えないよう、レートをプロセス数で等分する"""
+        return WorkerOptions(
+            base_url=self.options.base_url,
+            rate=self.options.rate / workers,
+            min_rate=self.options.min_rate / workers,
+            max_rate=self.options.max_rate / workers,
+            concurrency=self.options.concurrency,
+            parser_backend=self.options.parser_backend,
+        )
+
+    async def run(self, start_date: date, end_date: date, force: bool = False) -> Dict:
+        """期間内のレースデータを並列に同期する"""
+        if end_date < start_date:
+            raise ValueError("終了日は開始日以降を指定してください")
+
+        if force:
+            await run_write(self.backfill.reset, start_date, end_date)
+
+        plan = await run_write(self.backfill.pending_work, start_date, end_date, force)
+        work = [(target_date, done) for target_date, done in plan if done is not None]
+        parts = partition(work, self.workers)
+
+        logger.info(
+            f"並列バックフィル開始: {start_date} - {end_date}, 強制モード: {force}, "
+            f"対象: {len(work)}日, プロセス数: {len(parts)}"
+        )
+
+        self.throughput = {
+            "workers": len(parts), "races_saved": 0, "races_failed": 0,
+            "fetch_seconds": 0.0, "parse_seconds": 0.0, "write_seconds": 0.0,
+        }
+        started = time.perf_counter()
+        date_results = await self._run_workers(parts) if parts else {}
+        elapsed = time.perf_counter() - started
+
+        results = []
+        for target_date, done in plan:
+            if done is None:
+                results.append({"date": target_date.isoformat(), "status": "skipped"})
+            else:
+                results.append(date_results.get(target_date) or {
+                    "date": target_date.isoformat(),
+                    "status": "error",
+                    "message": "取得プロセスが異常終了しました"
+                })
+
+        result = summarize(results)
+        self.throughput["elapsed_seconds"] = round(elapsed, 3)
+        self.throughput["races_per_second"] = (
+            round(self.throughput["races_saved"] / elapsed, 2) if elapsed > 0 else None
+        )
+        result["throughput"] = self.throughput
+        logger.info(f"並列バックフィル終了: {result['message']}, {self.throughput}")
+        return result
+
+    async def _run_workers(self, parts: List[List[Tuple[date, Set[str]]]]) -> Dict[date, Dict]:
+        """取得・パース用プロセスを起動し、送られてきたレースをまとめて保存する"""
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue(maxsize=SYNC_QUEUE_SIZE * len(parts))
+        options = self.worker_options(len(parts))
+        processes = [
+            context.Process(
+                target=run_worker, args=(worker_id, part, options, results),
+                name=f"sync-worker-{worker_id}", daemon=True
+            )
+            for worker_id, part in enumerate(parts)
+        ]
+        for process in processes:
+            process.start()
+
+        loop = asyncio.get_running_loop()
+        scraper = JRAScraper(self.session, fetch_past_races=False)
+        batch: List[Tuple[date, str, Dict, Dict]] = []
+        failures: Counter = Counter()
+        date_results: Dict[date, Dict] = {}
+        finished = 0
+
+        async def flush():
+            if batch:
+                started = time.perf_counter()
+                await run_write(self._save_batch, scraper, list(batch), failures)
+                self.throughput["write_seconds"] += time.perf_counter() - started
+                batch.clear()
+
+        try:
+            while finished < len(processes):
+                try:
+                    message = await loop.run_in_executor(None, results.get, True, POLL_INTERVAL)
+                except queue.Empty:
+                    await flush()
+                    if not any(process.is_alive() for process in processes) and results.empty():
+                        logger.error("取得プロセスが応答なく終了しました")
+                        break
+                    continue
+
+                kind = message[0]
+                if kind == "race":
+                    batch.append(message[1:])
+                    if len(batch) >= self.batch_size:
+                        await flush()
+                elif kind == "race_error":
+                    failures[message[1]] += 1
+                elif kind == "date":
+                    # 同じプロセスから届いたその日のレースを先に保存してから完了を判定する
+                    await flush()
+                    _, target_date, status, text = message
+                    date_results[target_date] = await run_write(
+                        self._finish_date, target_date, status, text, failures[target_date]
+                    )
+                elif kind == "worker_done":
+                    finished += 1
+                    for key, value in message[2].items():
+                        self.throughput[key] = self.throughput.get(key, 0.0) + value
+
+            await flush()
+        finally:
+            for process in processes:
+                process.join(timeout=POLL_INTERVAL)
+                if process.is_alive():
+                    process.terminate()
+            await scraper.close()
+
+        for key in ("fetch_seconds", "parse_seconds", "write_seconds"):
+            self.throughput[key] = round(self.throughput[key], 3)
+        self.throughput["races_failed"] = sum(failures.values())
+        return date_results
+
+    def _save_batch(
+        self, scraper: JRAScraper, batch: List[Tuple[date, str, Dict, Dict]], failures: Counter
+    ):
+        """
+        レースとチェックポイントを1回のコミットで保存（失敗時は1件ずつ保存し直す）
+
+        PostgreSQLではレースをCOPYでまとめて投入する。
+        """
+        try:
+            scraper._save_races(
+                [(race_detail, odds_data) for _, _, race_detail, odds_data in batch], commit=False
+            )
+            self.session.add_all([
+                BackfillCheckpoint(target_date=target_date, race_id=race_id)
+                for target_date, race_id, _, _ in batch
+            ])
+            self.session.commit()
+            self.throughput["races_saved"] += len(batch)
+            return
+        except Exception as e:
+            self.session.rollback()
+            logger.warning(f"{len(batch)}レースの一括保存に失敗したため1件ずつ保存します: {str(e)}")
+
+        for target_date, race_id, race_detail, odds_data in batch:
+            try:
+                scraper._save_race_data(race_detail, odds_data, commit=False)
+                self.session.add(BackfillCheckpoint(target_date=target_date, race_id=race_id))
+                self.session.commit()
+                self.throughput["races_saved"] += 1
+            except Exception as e:
+                self.session.rollback()
+                logger.error(f"レース {race_id} 保存エラー: {str(e)}", exc_info=True)
+                failures[target_date] += 1
+
+    def _finish_date(self, target_date: date, status: str, message: str, failed: int) -> Dict:
+        """日付の処理結果を判定し、すべて保存できていれば完了を記録（当日以降のレースなしは記録しない）"""
+        if status == "error":
+            return {"date": target_date.isoformat(), "status": "error", "message": message}
+        if failed:
+            return {
+                "date": target_date.isoformat(),
+                "status": "partial_failure",
+                "message": f"{message}（失敗: {failed}レース）"
+            }
+
+        if status != "no_data" or no_data_is_final(target_date):
+            self.backfill._record(target_date)
+        return {
+            "date": target_date.isoformat(),
+            "status": "success" if status == "done" else status,
+            "message": message
+        }
@@ -0,0 +1,92 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+from app.config import PARSE_EXECUTOR, PARSE_WORKERS
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[Executor] = None
+# このプロセスで使用するパース実行方式（configure_parse_executor で変更できる）
+_kind: str = PARSE_EXECUTOR
+
+
+def create_parse_executor(kind: str = PARSE_EXECUTOR, workers: int = PARSE_WORKERS) -> Optional[Executor]:
+    """
+    HTMLパース用の実行プールを作成
+
+    process: プロセスプール（コア数に応じて並列化）、thread: スレッドプール、
+    inline: プールを使用せずイベントループ上で実行（None を返す）
+    """
+    workers = max(1, workers)
+    if kind == "process":
+        # 親プロセスのスレッド（接続プール等）を引き継がないよう spawn で起動する
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="html-parser")
+    if kind == "inline":
+        return None
+    raise ValueError(f"不明なパース実行方式です: {kind}（process / thread / inline）")
+
+
+def configure_parse_executor(kind: str):
+    """
+    このプロセスで使用するパース実行方式を設定（作成済みのプールは停止する）
+
+    並列バックフィルの取得・パース用プロセスのように子プロセスを持てないプロセスでは
+    inline を指定する。
+    """
+    global _kind
+    if kind not in ("process", "thread", "inline"):
+        raise ValueError(f"不明なパース実行方式です: {kind}（process / thread / inline）")
+    shutdown_parse_executor()
+    _kind = kind
+
+
+def get_parse_executor() -> Optional[Executor]:
+    """プロセス共有のパース用プールを取得（inline の場合は None）"""
+    global _executor
+    if _executor is None:
+        _executor = create_parse_executor(_kind)
+    return _executor
+
+
+def parse_concurrency() -> int:
+    """同時にパースするページ数の上限"""
+    return 1 if _kind == "inline" else max(1, PARSE_WORKERS)
+
+
+def shutdown_parse_executor():
+    """パース用プールを停止"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def run_parser(func: Callable[..., Any], *args) -> Any:
+    """
+    パース関数をパース用プールで実行
+
+    func はHTMLと引数のみから結果を返すモジュールレベルの関数（プロセス間で受け渡すため）。
+    プロセスプールが異常終了した場合は作り直し、このページはイベントループ上でパースする。
+    """
+    global _executor
+    executor = get_parse_executor()
+    if executor is None:
+        return func(*args)
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, functools.partial(func, *args)
+        )
+    except BrokenProcessPool:
+        logger.warning("パース用プロセスプールが停止したため作り直します")
+        if _executor is executor:
+            _executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        return func(*args)
@@ -0,0 +1,464 @@
+import logging
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from bs4 import BeautifulSoup
+
+from app.config import HTML_PARSER
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+except ImportError:  # pragma: no cover - lxml未インストール環境
+    lxml = None
+
+
+class LxmlNode:
+    """lxml要素をBeautifulSoupと同じインターフェースで扱うラッパー"""
+
+    __slots__ = ("element",)
+
+    def __init__(self, element):
+        self.element = element
+
+    def select(self, selector: str) -> List["LxmlNode"]:
+        return [LxmlNode(e) for e in _compile_selector(selector)(self.element)]
+
+    def select_one(self, selector: str) -> Optional["LxmlNode"]:
+        matches = _compile_selector(selector)(self.element)
+        return LxmlNode(matches[0]) if matches else None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.element.get(key, default)
+
+    @property
+    def text(self) -> str:
+        return self.element.text_content()
+
+
+@lru_cache(maxsize=None)
+def _compile_selector(selector: str) -> "CSSSelector":
+    """CSSセレクタをXPathにコンパイル（セレクタ文字列ごとに1回のみ）"""
+    return CSSSelector(selector)
+
+
+def _parse_lxml(html: str) -> Any:
+    return LxmlNode(lxml.html.document_fromstring(html))
+
+
+def _parse_bs4_lxml(html: str) -> Any:
+    return BeautifulSoup(html, "lxml")
+
+
+def _parse_html_parser(html: str) -> Any:
+    return BeautifulSoup(html, "html.parser")
+
+
+# パーサーバックエンド（高速な順）
+PARSER_BACKENDS: Dict[str, Callable[[str], Any]] = {
+    "lxml": _parse_lxml,
+    "bs4-lxml": _parse_bs4_lxml,
+    "html.parser": _parse_html_parser,
+}
+
+
+def available_backends() -> List[str]:
+    """利用可能なパーサーバックエンド名"""
+    if lxml is None:
+        return ["html.parser"]
+    return list(PARSER_BACKENDS)
+
+
+def parse_document(html: str, backend: Optional[str] = None) -> Any:
+    """
+    HTMLを解析してselect / select_one / text / getで操作できるツリーを返す
+
+    lxmlが利用できない場合や解析に失敗した場合は html.parser にフォールバックする。
+    """
+    backend = backend or HTML_PARSER
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"不明なパーサーバックエンドです: {backend}")
+
+    if backend != "html.parser" and lxml is not None:
+        try:
+            return PARSER_BACKENDS[backend](html)
+        except (etree.ParserError, ValueError) as e:
+            logger.debug(f"{backend}での解析に失敗したため html.parser を使用します: {str(e)}")
+
+    return _parse_html_parser(html)
+
+
+def parse_races_list(html: str, backend: Optional[str] = None) -> List[Dict]:
+    """レース一覧ページをパース"""
+    soup = parse_document(html, backend)
+    races = []
+
+    # レース一覧テーブルからデータ抽出
+    race_tables = soup.select(".race_table")
+    for table in race_tables:
+        venue_elem = table.select_one(".race_place")
+        if not venue_elem:
+            continue
+
+        venue = venue_elem.text.strip()
+
+        race_rows = table.select("tr.race_data")
+        for row in race_rows:
+            race_link = row.select_one("a")
+            if not race_link:
+                continue
+
+            href = race_link.get("href", "")
+            race_id_match = re.search(r"race_id=([0-9]+)", href)
+            if not race_id_match:
+                continue
+
+            race_id = race_id_match.group(1)
+            race_number_text = row.select_one(".race_num").text.strip()
+            race_number_match = re.search(r"(\d+)R", race_number_text)
+            race_number = int(race_number_match.group(1)) if race_number_match else 0
+
+            races.append({
+                "race_id": race_id,
+                "venue": venue,
+                "race_number": race_number
+            })
+
+    return races
+
+
+def parse_race_detail(
+    html: str,
+    race_id: str,
+    venue: str,
+    race_number: int,
+    race_date: date,
+    backend: Optional[str] = None,
+) -> Dict:
+    """レース結果ページをパース"""
+    soup = parse_document(html, backend)
+
+    # レース情報抽出
+    race_name_elem = soup.select_one(".race_name")
+    race_name = race_name_elem.text.strip() if race_name_elem else f"{venue}{race_number}レース"
+
+    # レース条件抽出
+    race_info_elem = soup.select_one(".race_condition")
+    race_info_text = race_info_elem.text.strip() if race_info_elem else ""
+
+    # コース情報抽出
+    course_match = re.search(r"(芝|ダート)(\d+)m", race_info_text)
+    course_type = course_match.group(1) if course_match else "不明"
+    distance = int(course_match.group(2)) if course_match else 0
+
+    # クラス情報抽出
+    class_match = re.search(r"(G\d|新馬|未勝利|\d勝クラス|オープン|\d+万下)", race_info_text)
+    race_class = class_match.group(1) if class_match else "一般"
+
+    # 天候・馬場状態抽出
+    weather_match = re.search(r"天候:(\w+)", race_info_text)
+    weather = weather_match.group(1) if weather_match else "不明"
+
+    track_match = re.search(r"馬場:(\w+)", race_info_text)
+    track_condition = track_match.group(1) if track_match else "不明"
+
+    # 発走時刻抽出
+    time_elem = soup.select_one(".race_time")
+    time_text = time_elem.text.strip() if time_elem else ""
+    time_match = re.search(r"(\d+):(\d+)", time_text)
+
+    start_time = None
+    if time_match:
+        hour = int(time_match.group(1))
+        minute = int(time_match.group(2))
+        start_time = datetime.combine(race_date, datetime.strptime(f"{hour}:{minute}", "%H:%M").time())
+
+    # 出走馬情報抽出
+    horses = []
+    scratched = []
+    horse_table = soup.select_one(".race_table_01")
+    if horse_table:
+        result_columns = _result_columns(horse_table)
+        horse_rows = horse_table.select("tr")[1:]  # ヘッダー行をスキップ
+        for row in horse_rows:
+            cols = row.select("td")
+            if len(cols) < 4:
+                continue
+
+            horse_number = int(cols[1].text.strip()) if cols[1].text.strip().isdigit() else 0
+            horse_name_elem = cols[3].select_one("a")
+            horse_name = horse_name_elem.text.strip() if horse_name_elem else ""
+            horse_id_match = re.search(r"horse_id=([0-9]+)", horse_name_elem.get("href", "")) if horse_name_elem else None
+            horse_id = horse_id_match.group(1) if horse_id_match else ""
+
+            jockey_elem = cols[6].select_one("a")
+            jockey = jockey_elem.text.strip() if jockey_elem else ""
+
+            weight_text = cols[8].text.strip() if len(cols) > 8 else ""
+            weight_match = re.search(r"(\d+)", weight_text)
+            weight = int(weight_match.group(1)) if weight_match else 0
+
+            trainer_elem = cols[10].select_one("a") if len(cols) > 10 else None
+            trainer = trainer_elem.text.strip() if trainer_elem else ""
+
+            # 過去レースは馬ごとの戦績ページから PastRaceCrawler で別途取得する
+            past_races = []
+
+            horse = {
+                "horse_id": horse_id,
+                "horse_name": horse_name,
+                "horse_number": horse_number,
+                "jockey": jockey,
+                "trainer": trainer,
+                "weight": weight,
+                "past_races": past_races
+            }
+            horse.update(_parse_result_columns(cols, result_columns))
+            horses.append(horse)
+            if _is_refunded(cols, result_columns) and horse_number:
+                scratched.append(horse_number)
+
+    return {
+        "race_id": race_id,
+        "race_date": race_date,
+        "venue": venue,
+        "race_number": race_number,
+        "race_name": race_name,
+        "race_class": race_class,
+        "course_type": course_type,
+        "distance": distance,
+        "weather": weather,
+        "track_condition": track_condition,
+        "start_time": start_time,
+        "horses": horses,
+        "payouts": _with_scratched_refunds(_parse_payout_table(soup), scratched)
+    }
+
+
+# 結果列の見出しと出走馬の項目名の対応（発走前のページには存在しない）
+RESULT_HEADERS = {
+    "着順": "result_order",
+    "タイム": "result_time",
+    "着差": "result_margin",
+    "通過": "result_corner_position",
+}
+
+
+def _result_columns(table: Any) -> Dict[str, int]:
+    """結果テーブルの見出し行から、結果の各項目の列位置を取得"""
+    header = table.select_one("tr")
+    if not header:
+        return {}
+    columns = {}
+    for index, cell in enumerate(header.select("th")):
+        key = RESULT_HEADERS.get(cell.text.strip())
+        if key:
+            columns[key] = index
+    return columns
+
+
+def _parse_result_columns(cols: List[Any], columns: Dict[str, int]) -> Dict:
+    """出走馬の行から着順・タイム・着差・通過順を抽出（取消・除外などは None）"""
+    values = {
+        key: cols[index].text.strip() if index < len(cols) else ""
+        for key, index in columns.items()
+    }
+
+    order_text = values.get("result_order", "")
+    return {
+        "result_order": int(order_text) if order_text.isdigit() else None,
+        "result_time": parse_result_time(values.get("result_time", "")),
+        "result_margin": values.get("result_margin") or None,
+        "result_corner_position": values.get("result_corner_position") or None,
+    }
+
+
+def _is_refunded(cols: List[Any], columns: Dict[str, int]) -> bool:
+    """着順の列が取消・除外の馬か（馬券は返還の対象となる）"""
+    index = columns.get("result_order")
+    if index is None or index >= len(cols):
+        return False
+    return cols[index].text.strip() in REFUNDED_RESULTS
+
+
+def parse_result_time(text: str) -> Optional[float]:
+    """「1:32.5」「58.9」形式の走破タイムを秒に変換"""
+    time_match = re.fullmatch(r"(?:(\d+):)?(\d+(?:\.\d+)?)", text.strip())
+    if not time_match:
+        return None
+    minutes = int(time_match.group(1) or 0)
+    return round(minutes * 60 + float(time_match.group(2)), 1)
+
+
+# 払戻金を取得する券種（順序を区別する券種は馬番を着順のまま保持する）
+PAYOUT_BET_TYPES = ("単勝", "複勝", "馬連", "ワイド", "馬単", "三連複", "三連単")
+ORDERED_BET_TYPES = ("馬単", "三連単")
+
+# 返還（取消・除外の馬を含む馬券は購入額を返還する）は馬番ごとに 100円あたり100円の払戻金として扱う
+REFUND_BET_TYPE = "返還"
+REFUND_PAYOUT = 100
+REFUNDED_RESULTS = ("取消", "除外")
+
+
+def normalize_bet_numbers(bet_type: str, text: str) -> str:
+    """
+    馬番の組み合わせを「3-7」形式に正規化
+
+    「3 - 7」「3→7」「03,07」などの表記を区別せず、順不同の券種は昇順に並べる。
+    """
+    numbers = [int(n) for n in re.findall(r"\d+", text)]
+    if bet_type not in ORDERED_BET_TYPES:
+        numbers.sort()
+    return "-".join(str(n) for n in numbers)
+
+
+def _parse_payout_table(soup: Any) -> List[Dict]:
+    """
+    結果ページの払戻金テーブルを抽出
+
+    1行に1つの組み合わせ（券種 / 組み合わせ / 払戻金 / 人気）が並び、同じ券種の2行目以降は
+    券種の見出しが省略される（rowspan）。返還の行は馬番ごとに返還として抽出する。
+    """
+    payouts = []
+    for table in soup.select(".pay_table_01"):
+        # 券種の見出しは表をまたいで引き継がない
+        bet_type = None
+        for row in table.select("tr"):
+            header = row.select_one("th")
+            if header:
+                bet_type = header.text.strip()
+            cols = row.select("td")
+            if bet_type == REFUND_BET_TYPE:
+                # 1列目に返還の対象の馬番が並ぶ
+                payouts.extend(_refunds(int(n) for n in re.findall(r"\d+", cols[0].text)) if cols else [])
+                continue
+            if bet_type not in PAYOUT_BET_TYPES or len(cols) < 2:
+                continue
+
+            bet_numbers = normalize_bet_numbers(bet_type, cols[0].text)
+            payout_match = re.search(r"\d[\d,]*", cols[1].text)
+            if not bet_numbers or not payout_match:
+                continue
+
+            popularity_match = re.search(r"(\d+)", cols[2].text) if len(cols) > 2 else None
+            payouts.append({
+                "bet_type": bet_type,
+                "bet_numbers": bet_numbers,
+                "payout": int(payout_match.group(0).replace(",", "")),
+                "popularity": int(popularity_match.group(1)) if popularity_match else None
+            })
+
+    return payouts
+
+
+def _refunds(horse_numbers: Iterable[int]) -> List[Dict]:
+    """返還の対象となる馬番を払戻金の形式に変換"""
+    return [
+        {"bet_type": REFUND_BET_TYPE, "bet_numbers": str(number), "payout": REFUND_PAYOUT, "popularity": None}
+        for number in horse_numbers
+    ]
+
+
+def _with_scratched_refunds(payouts: List[Dict], scratched: List[int]) -> List[Dict]:
+    """
+    取消・除外の馬の返還を払戻金に追加（払戻金が確定している場合のみ）
+
+    払戻金の確定前に返還のみを登録すると、精算で未確定のレースの馬券が不的中になるため追加しない。
+    """
+    if not payouts:
+        return payouts
+    listed = {p["bet_numbers"] for p in payouts if p["bet_type"] == REFUND_BET_TYPE}
+    return payouts + _refunds(n for n in dict.fromkeys(scratched) if str(n) not in listed)
+
+
+def parse_payouts(html: str, backend: Optional[str] = None) -> List[Dict]:
+    """レース結果ページから払戻金を抽出"""
+    return _parse_payout_table(parse_document(html, backend))
+
+
+def parse_odds(html: str, backend: Optional[str] = None) -> Dict:
+    """オッズページをパース"""
+    soup = parse_document(html, backend)
+
+    # 単勝オッズの抽出
+    win_odds = {}
+    odds_table = soup.select_one(".odds_table_01")
+    if odds_table:
+        odds_rows = odds_table.select("tr")[1:]  # ヘッダー行をスキップ
+        for row in odds_rows:
+            cols = row.select("td")
+            if len(cols) < 3:
+                continue
+
+            horse_number_text = cols[0].text.strip()
+            if not horse_number_text.isdigit():
+                continue
+
+            horse_number = int(horse_number_text)
+            odds_text = cols[2].text.strip().replace(",", "")
+
+            try:
+                odds_value = float(odds_text)
+                win_odds[horse_number] = odds_value
+            except ValueError:
+                pass
+
+    return {"win_odds": win_odds}
+
+
+def parse_horse_history(html: str, backend: Optional[str] = None) -> List[Dict]:
+    """馬の戦績ページをパース（新しい順）"""
+    soup = parse_document(html, backend)
+
+    # 戦績テーブルの抽出
+    past_races = []
+    history_table = soup.select_one(".horse_race_history")
+    if history_table:
+        history_rows = history_table.select("tr")[1:]  # ヘッダー行をスキップ
+        for row in history_rows:
+            cols = row.select("td")
+            if len(cols) < 9:
+                continue
+
+            date_match = re.search(r"(\d{4})[/.-](\d{1,2})[/.-](\d{1,2})", cols[0].text)
+            if not date_match:
+                continue
+            race_date = "{}-{:02d}-{:02d}".format(*(int(g) for g in date_match.groups()))
+
+            # 「2回東京4日」形式から開催場名を抽出
+            venue_match = re.search(r"^(?:\d+回)?(\D+?)(?:\d+日)?$", cols[1].text.strip())
+            venue = venue_match.group(1) if venue_match else cols[1].text.strip()
+
+            race_name = cols[2].text.strip()
+
+            horse_count_text = cols[3].text.strip()
+            horse_count = int(horse_count_text) if horse_count_text.isdigit() else None
+
+            result_order_text = cols[4].text.strip()
+            result_order = int(result_order_text) if result_order_text.isdigit() else None
+
+            jockey_elem = cols[5].select_one("a")
+            jockey = (jockey_elem or cols[5]).text.strip()
+
+            course_condition = cols[7].text.strip() or None
+
+            weight_match = re.search(r"(\d+)", cols[8].text)
+            weight = int(weight_match.group(1)) if weight_match else None
+
+            past_races.append({
+                "race_date": race_date,
+                "venue": venue,
+                "race_name": race_name,
+                "result_order": result_order,
+                "horse_count": horse_count,
+                "jockey": jockey,
+                "weight": weight,
+                "course_condition": course_condition
+            })
+
+    return past_races
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import threading
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from sqlmodel import func, select
+
+from app.models import Horse, HorsePastRace, Race
+from app.services.db_writer import read_all, run_write
+
+if TYPE_CHECKING:
+    from app.services.scraper import JRAScraper
+
+logger = logging.getLogger(__name__)
+
+# 戦績を取得済みの JRA 馬IDと取得日・パース済みの戦績（プロセス内で共有）
+_fetched: Dict[str, Tuple[date, List[Dict]]] = {}
+_fetched_lock = threading.Lock()
+
+
+class PastRaceCrawler:
+    """出走馬の戦績を取得して HorsePastRace に追記する
+
+    同じ JRA 馬IDの戦績ページは1日1回のみ取得し、複数のレースや同期日に
+    出走する馬でも再取得しない。取得済みの馬は記録しておいた戦績を保存に使うため、
+    取得後に登録された出走にも戦績が追加される。保存済みの最新の出走より新しい戦績のみを追加する。
+    """
+
+    def __init__(self, scraper: "JRAScraper"):
+        self.scraper = scraper
+        self.session = scraper.session
+
+    def pending_horse_ids(self, horse_ids: Iterable[str], today: date) -> List[str]:
+        """本日まだ取得していない馬ID（重複を除く）"""
+        with _fetched_lock:
+            return [
+                horse_id for horse_id in dict.fromkeys(horse_ids)
+                if horse_id and _fetched.get(horse_id, (None, None))[0] != today
+            ]
+
+    def fetched_histories(self, horse_ids: Iterable[str], today: date) -> Dict[str, List[Dict]]:
+        """本日取得済みの馬の戦績"""
+        with _fetched_lock:
+            return {
+                horse_id: _fetched[horse_id][1] for horse_id in horse_ids
+                if horse_id in _fetched and _fetched[horse_id][0] == today
+            }
+
+    async def crawl_races(self, race_ids: Iterable[str], today: Optional[date] = None) -> Dict:
+        """指定レースの出走馬の戦績を取得"""
+        horse_ids = read_all(
+            self.session,
+            select(Horse.horse_id)
+            .join(Race, Horse.race_id == Race.id)
+            .where(Race.race_id.in_(list(race_ids)))
+        )
+        return await self.crawl(horse_ids, today)
+
+    async def crawl(self, horse_ids: Iterable[str], today: Optional[date] = None) -> Dict:
+        """馬IDごとに戦績を並行取得し、まとめて保存"""
+        today = today or date.today()
+        horse_ids = list(dict.fromkeys(h for h in horse_ids if h))
+        pending = self.pending_horse_ids(horse_ids, today)
+        # 取得済みの馬も、取得後に登録された出走があれば記録しておいた戦績を保存する
+        histories = self.fetched_histories(horse_ids, today)
+        if not pending:
+            added = await run_write(self.save_histories, histories) if histories else 0
+            return {"fetched": 0, "added": added, "errors": 0}
+
+        semaphore = asyncio.Semaphore(self.scraper.concurrency)
+
+        async def fetch(horse_id: str) -> List[Dict]:
+            async with semaphore:
+                return await self.scraper._fetch_horse_history(horse_id)
+
+        results = await asyncio.gather(*(fetch(h) for h in pending), return_exceptions=True)
+
+        fetched = {}
+        errors = 0
+        for horse_id, result in zip(pending, results):
+            if isinstance(result, Exception):
+                logger.error(f"馬 {horse_id} の戦績取得エラー: {str(result)}")
+                errors += 1
+                continue
+            fetched[horse_id] = result
+
+        added = await run_write(self.save_histories, {**histories, **fetched})
+
+        with _fetched_lock:
+            # 前日までに取得した戦績は再取得の対象となるため破棄する
+            for horse_id in [h for h, (fetched_on, _) in _fetched.items() if fetched_on != today]:
+                del _fetched[horse_id]
+            for horse_id, history in fetched.items():
+                _fetched[horse_id] = (today, history)
+
+        return {"fetched": len(fetched), "added": added, "errors": errors}
+
+    def save_histories(self, histories: Dict[str, List[Dict]]) -> int:
+        """
+        戦績を出走馬ごとに保存
+
+        各出走の開催日より前で、保存済みの最新の出走より新しいものだけを1回のコミットで追加する。
+        """
+        if not histories:
+            return 0
+
+        entries = self.session.exec(
+            select(Horse.id, Horse.horse_id, Race.race_date)
+            .join(Race, Horse.race_id == Race.id)
+            .where(Horse.horse_id.in_(list(histories)))
+        ).all()
+        if not entries:
+            # 読み取りのトランザクションを終了し、書き込み用の接続を返す
+            self.session.rollback()
+            return 0
+
+        latest = dict(self.session.exec(
+            select(HorsePastRace.horse_id, func.max(HorsePastRace.race_date))
+            .where(HorsePastRace.horse_id.in_([entry_id for entry_id, _, _ in entries]))
+            .group_by(HorsePastRace.horse_id)
+        ).all())
+
+        rows = []
+        for entry_id, horse_id, race_date in entries:
+            stored = latest.get(entry_id) or ""
+            cutoff = race_date.isoformat()
+            rows.extend(
+                HorsePastRace(horse_id=entry_id, **past_race)
+                for past_race in histories[horse_id]
+                if stored < past_race["race_date"] < cutoff
+            )
+
+        if rows:
+            self.session.add_all(rows)
+            self.session.commit()
+        else:
+            self.session.rollback()
+
+        return len(rows)
+
+
+def reset_fetched():
+    """取得済みの記録を消去（テスト用）"""
+    with _fetched_lock:
+        _fetched.clear()
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional
+
+from app.config import (
+    JRA_LATENCY_THRESHOLD, JRA_MAX_CONCURRENCY, JRA_MAX_RATE, JRA_MIN_CONCURRENCY,
+    JRA_MIN_RATE, JRA_RATE_BURST, JRA_RATE_LIMIT, SYNC_CONCURRENCY
+)
+from app.services.retry import is_retryable_status
+
+logger = logging.getLogger(__name__)
+
+# 空きを待つ間のポーリング間隔（秒）
+WAIT_INTERVAL = 0.01
+
+
+@dataclass
+class RequestOutcome:
+    """リクエスト結果（limiter.request() のブロック内で設定する）"""
+    status_code: Optional[int] = None
+
+
+class AdaptiveLimiter:
+    """トークンバケットによる流量制限とAIMDによる同時実行数制御
+
+    429/5xx応答、通信エラー、応答時間の悪化を検知すると同時実行数とレートを
+    乗算的に減らし、正常な応答が続くと加算的に増やす。プロセス内の
+    すべてのスクレイパーで1つのインスタンスを共有し、合計の負荷を制御する。
+    """
+
+    def __init__(
+        self,
+        rate: float = JRA_RATE_LIMIT,
+        burst: int = JRA_RATE_BURST,
+        min_rate: float = JRA_MIN_RATE,
+        max_rate: float = JRA_MAX_RATE,
+        concurrency: int = SYNC_CONCURRENCY,
+        min_concurrency: int = JRA_MIN_CONCURRENCY,
+        max_concurrency: int = JRA_MAX_CONCURRENCY,
+        latency_threshold: float = JRA_LATENCY_THRESHOLD,
+        decrease_factor: float = 0.5,
+        cooldown: float = 1.0,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.concurrency_limit = float(min(max(concurrency, min_concurrency), max_concurrency))
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.latency_threshold = latency_threshold
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+
+        self.in_flight = 0
+        self.throttled_seconds = 0.0
+        self.latency_ewma: Optional[float] = None
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._decreased_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _try_acquire(self) -> float:
+        """枠を確保できれば0、できなければ待機すべき秒数を返す"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self.in_flight >= int(self.concurrency_limit):
+                return WAIT_INTERVAL
+            if self._tokens < 1:
+                return max((1 - self._tokens) / self.rate, WAIT_INTERVAL)
+            self._tokens -= 1
+            self.in_flight += 1
+            return 0
+
+    async def acquire(self):
+        """送信枠を確保するまで待機"""
+        waited = 0.0
+        while True:
+            wait = self._try_acquire()
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+
+        if waited:
+            with self._lock:
+                self.throttled_seconds += waited
+
+    def release(self, status_code: Optional[int], latency: float, failed: bool = False):
+        """送信枠を解放し、結果に応じて同時実行数とレートを調整"""
+        with self._lock:
+            self.in_flight -= 1
+            self.latency_ewma = latency if self.latency_ewma is None else (
+                0.8 * self.latency_ewma + 0.2 * latency
+            )
+
+            overloaded = failed or (status_code is not None and is_retryable_status(status_code))
+            slow = self.latency_ewma > self.latency_threshold
+
+            if overloaded or slow:
+                self._decrease()
+            else:
+                # 1ラウンドトリップあたり同時実行数を1増やす
+                self.concurrency_limit = min(
+                    self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit
+                )
+                self.rate = min(self.max_rate, self.rate + 0.1)
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._decreased_at < self.cooldown:
+            return
+        self._decreased_at = now
+        self.concurrency_limit = max(
+            self.min_concurrency, self.concurrency_limit * self.decrease_factor
+        )
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        logger.info(
+            f"JRAへのリクエストを抑制します: 同時実行数 {int(self.concurrency_limit)}, "
+            f"レート {self.rate:.1f}/秒"
+        )
+
+    @asynccontextmanager
+    async def request(self) -> AsyncIterator[RequestOutcome]:
+        """送信枠を確保してリクエストを実行するコンテキスト"""
+        await self.acquire()
+        outcome = RequestOutcome()
+        started = time.monotonic()
+        try:
+            yield outcome
+        except BaseException:
+            self.release(outcome.status_code, time.monotonic() - started, failed=True)
+            raise
+        else:
+            self.release(outcome.status_code, time.monotonic() - started)
+
+    def snapshot(self) -> Dict:
+        """現在の状態"""
+        with self._lock:
+            return {
+                "rate": round(self.rate, 2),
+                "concurrency_limit": int(self.concurrency_limit),
+                "in_flight": self.in_flight,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "latency_ewma": round(self.latency_ewma, 3) if self.latency_ewma is not None else None
+            }
+
+
+_shared_limiter: Optional[AdaptiveLimiter] = None
+
+
+def get_rate_limiter() -> AdaptiveLimiter:
+    """プロセス共有のリミッターを取得"""
+    global _shared_limiter
+    if _shared_limiter is None:
+        _shared_limiter = AdaptiveLimiter()
+    return _shared_limiter
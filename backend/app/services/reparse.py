@@ -0,0 +1,158 @@
+import logging
+import time
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Session, select
+
+from app.config import HTML_PARSER, PARSE_WORKERS
+from app.models import Horse, Race
+from app.services import parsers
+from app.services.page_archive import PageArchive
+from app.services.parse_pool import create_parse_executor
+from app.services.settlement import store_payouts
+
+logger = logging.getLogger(__name__)
+
+# 1回のコミットで更新するレース数
+REPARSE_BATCH_SIZE = 200
+
+# 再パースで更新する項目（レースID・開催日・開催場・レース番号はアーカイブのキーと保存済みの値を使う）
+RACE_FIELDS = (
+    "race_name", "race_class", "course_type", "distance", "weather", "track_condition", "start_time"
+)
+HORSE_FIELDS = (
+    "horse_name", "horse_number", "jockey", "trainer", "weight",
+    "result_order", "result_time", "result_margin", "result_corner_position"
+)
+
+
+def parse_archived_result(args: Tuple[str, str, str, int, date, str]) -> Dict:
+    """アーカイブの結果ページをパース（プロセスプールで実行するためモジュールレベルに置く）"""
+    html, race_id, venue, race_number, race_date, backend = args
+    return parsers.parse_race_detail(html, race_id, venue, race_number, race_date, backend)
+
+
+class Reparser:
+    """アーカイブ済みの結果ページを現在のパーサーで再パースし、レースと出走馬を更新する
+
+    JRAには接続しない。パースはプロセスプールで並列に行い、更新は REPARSE_BATCH_SIZE
+    レースごとに一括で書き込む（変化した行のみ）。
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        archive: PageArchive,
+        workers: int = PARSE_WORKERS,
+        executor_kind: str = "process",
+        parser_backend: str = HTML_PARSER,
+        batch_size: int = REPARSE_BATCH_SIZE,
+    ):
+        self.session = session
+        self.archive = archive
+        self.workers = workers
+        self.executor_kind = executor_kind
+        self.parser_backend = parser_backend
+        self.batch_size = max(1, batch_size)
+
+    def run(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> Dict:
+        """期間内（省略時はすべて）の保存済みレースを再パースする"""
+        query = select(Race)
+        if start_date:
+            query = query.where(Race.race_date >= start_date)
+        if end_date:
+            query = query.where(Race.race_date <= end_date)
+        # コミットのたびに行が期限切れになり再読み込みされないよう、比較に使う値を先に取り出す
+        races = {
+            race.race_id: {
+                key: getattr(race, key) for key in ("id", "venue", "race_number", "race_date", *RACE_FIELDS)
+            }
+            for race in self.session.exec(query.order_by(Race.race_id)).all()
+        }
+
+        started = time.perf_counter()
+        totals = {"races": 0, "updated_races": 0, "updated_horses": 0, "missing": 0}
+        executor = create_parse_executor(self.executor_kind, self.workers)
+        try:
+            race_ids = list(races)
+            for offset in range(0, len(race_ids), self.batch_size):
+                chunk = race_ids[offset:offset + self.batch_size]
+                pages = list(self.archive.latest("result", chunk))
+                totals["missing"] += len(chunk) - len(pages)
+
+                jobs = [
+                    (page.body, page.race_id, races[page.race_id]["venue"],
+                     races[page.race_id]["race_number"], races[page.race_id]["race_date"],
+                     self.parser_backend)
+                    for page in pages
+                ]
+                if executor is None:
+                    details = [parse_archived_result(job) for job in jobs]
+                else:
+                    details = list(executor.map(
+                        parse_archived_result, jobs, chunksize=max(1, len(jobs) // (self.workers * 4))
+                    ))
+
+                updated_races, updated_horses = self._apply(races, details)
+                totals["races"] += len(details)
+                totals["updated_races"] += updated_races
+                totals["updated_horses"] += updated_horses
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        elapsed = time.perf_counter() - started
+        totals["seconds"] = round(elapsed, 3)
+        totals["races_per_second"] = round(totals["races"] / elapsed, 2) if elapsed > 0 else None
+        logger.info(f"再パース完了: {totals}")
+        return {
+            "status": "success",
+            "message": f"{totals['races']}レースを再パースし、{totals['updated_races']}レース・"
+                       f"{totals['updated_horses']}頭を更新しました",
+            **totals
+        }
+
+    def _apply(self, races: Dict[str, Dict], details: List[Dict]) -> Tuple[int, int]:
+        """再パースの結果を既存の行と比較し、変化した行のみを1回のコミットで更新"""
+        if not details:
+            return 0, 0
+
+        race_pks = [races[detail["race_id"]]["id"] for detail in details]
+        horses = {
+            (horse.race_id, horse.horse_id): horse
+            for horse in self.session.exec(select(Horse).where(Horse.race_id.in_(race_pks))).all()
+        }
+
+        race_updates = []
+        horse_updates = []
+        new_horses = []
+        for detail in details:
+            race = races[detail["race_id"]]
+            values = {key: detail[key] for key in RACE_FIELDS}
+            if any(race[key] != value for key, value in values.items()):
+                race_updates.append({"id": race["id"], **values})
+                race.update(values)
+
+            for horse_data in detail["horses"]:
+                horse_values = {key: horse_data.get(key) for key in HORSE_FIELDS}
+                horse = horses.get((race["id"], horse_data["horse_id"]))
+                if horse is None:
+                    new_horses.append(
+                        Horse(race_id=race["id"], horse_id=horse_data["horse_id"], **horse_values)
+                    )
+                elif any(getattr(horse, key) != value for key, value in horse_values.items()):
+                    horse_updates.append({"id": horse.id, **horse_values})
+
+            store_payouts(self.session, race["id"], detail.get("payouts", []))
+
+        try:
+            self.session.bulk_update_mappings(Race, race_updates)
+            self.session.bulk_update_mappings(Horse, horse_updates)
+            self.session.add_all(new_horses)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+
+        return len(race_updates), len(horse_updates) + len(new_horses)
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import (
+    CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT, MAX_RETRY_COUNT,
+    RETRY_BASE_DELAY, RETRY_MAX_DELAY
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """サーキットブレーカーが開いているため送信しなかった"""
+    pass
+
+
+def is_retryable_status(status_code: int) -> bool:
+    """再試行の対象となるステータスコードか（429/5xx）"""
+    return status_code == 429 or status_code // 100 == 5
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-Afterヘッダー（秒数またはHTTP日付）を秒数に変換"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """ホスト単位のサーキットブレーカー
+
+    連続で failure_threshold 回失敗すると開き、reset_timeout 秒の間は送信せずに
+    即座に失敗させる。経過後は1件だけ試行（半開）し、成功すれば閉じる。
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def check(self, host: str):
+        """送信可否を確認（開いている場合は CircuitOpenError）"""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            # 試行中のリクエストが応答しないまま期限を過ぎた場合も次の試行を許可する
+            now = time.monotonic()
+            if state == "half_open" and (
+                self._probe_started is None or now - self._probe_started >= self.reset_timeout
+            ):
+                self._probe_started = now
+                return
+        raise CircuitOpenError(f"{host} への接続を一時停止しています（サーキットブレーカー作動中）")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probe_started = None
+
+    def record_failure(self, host: str):
+        with self._lock:
+            self.failures += 1
+            probing = self._probe_started is not None
+            if probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(f"{host} への連続失敗が{self.failures}回に達したため送信を停止します")
+                self.opened_at = time.monotonic()
+                self._probe_started = None
+
+
+class RetryPolicy:
+    """指数バックオフ（フルジッター）とサーキットブレーカーによる再試行ポリシー"""
+
+    def __init__(
+        self,
+        max_attempts: int = MAX_RETRY_COUNT,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        """ホストのサーキットブレーカーを取得"""
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self._breakers[host]
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """attempt回目（0始まり）の失敗後に待機する秒数"""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def call(
+        self, url: str, send: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """
+        リクエストを実行し、429/5xxと通信エラーの場合は再試行する
+
+        4xx（429を除く）は再試行せずに HTTPStatusError を送出する。
+        """
+        host = urlsplit(url).netloc
+        breaker = self.breaker(host)
+
+        for attempt in range(self.max_attempts):
+            breaker.check(host)
+            retry_after = None
+
+            try:
+                response = await send()
+                if response.status_code == 304:
+                    breaker.record_success()
+                    return response
+                if is_retryable_status(response.status_code):
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    response.raise_for_status()
+            except httpx.HTTPError as e:
+                breaker.record_failure(host)
+                if attempt == self.max_attempts - 1:
+                    raise
+                delay = self.backoff(attempt, retry_after)
+                logger.debug(f"{url} の取得に失敗しました（{str(e)}）。{delay:.2f}秒後に再試行します")
+                await asyncio.sleep(delay)
+                continue
+
+            breaker.record_success()
+            response.raise_for_status()
+            return response
+
+
+_shared_policy: Optional[RetryPolicy] = None
+
+
+def get_retry_policy() -> RetryPolicy:
+    """プロセス共有の再試行ポリシーを取得"""
+    global _shared_policy
+    if _shared_policy is None:
+        _shared_policy = RetryPolicy()
+    return _shared_policy
@@ -1,39 +1,156 @@
 import asyncio
+import hashlib
 import logging
-from datetime import date, datetime
-from typing import Dict, List, Optional, Tuple
 import re
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
 
 import httpx
-from bs4 import BeautifulSoup
 from sqlmodel import Session, select
 
-from app.config import JRA_BASE_URL, MAX_RETRY_COUNT, REQUEST_TIMEOUT
-from app.models import Race, Horse, HorsePastRace
+from app.config import (
+    HTML_PARSER, JRA_BASE_URL, JRA_TIMEZONE, PAST_RACES_ENABLED, REQUEST_TIMEOUT,
+    SYNC_CONCURRENCY, SYNC_QUEUE_SIZE
+)
+from app.models import Race, Horse, HorsePastRace, RacePageHash
+from app.services import parsers
+from app.services.bulk_load import bulk_load_races, supports_copy
+from app.services.db_writer import read_all, run_write
+from app.services.http_cache import CacheEntry, HTTPCache, get_http_cache
+from app.services.http_client import get_http_client
+from app.services.odds_history import record_snapshot
+from app.services.page_archive import ARCHIVED_PAGE_TYPES, PageArchive, get_page_archive
+from app.services.parse_pool import parse_concurrency, run_parser
+from app.services.past_races import PastRaceCrawler
+from app.services.rate_limit import AdaptiveLimiter, get_rate_limiter
+from app.services.retry import RetryPolicy, get_retry_policy
+from app.services.settlement import store_payouts
+from app.services.upsert import upsert
 
 logger = logging.getLogger(__name__)
 
+# パイプラインの各段の終了を後段に伝える目印
+_DONE = object()
+
+# 結果ページから更新する出走馬の項目
+RESULT_FIELDS = ("result_order", "result_time", "result_margin", "result_corner_position")
+
+
+def jra_now() -> datetime:
+    """
+    発走時刻と比較するための現在時刻（日本時間、タイムゾーンなし）
+
+    発走時刻は日本時間のままタイムゾーンなしで保存しているため、サーバーのタイムゾーンに
+    よらず日本時間で比較する。
+    """
+    return datetime.now(ZoneInfo(JRA_TIMEZONE)).replace(tzinfo=None)
+
+
+@dataclass
+class FetchedPage:
+    """取得済み（未パース）のページ"""
+    url: str
+    text: str
+    entry: Optional[CacheEntry] = None
+
+    @property
+    def digest(self) -> str:
+        """本文のSHA-1（HTTPキャッシュと同じ方式）"""
+        if self.entry:
+            return self.entry.digest
+        return hashlib.sha1(self.text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ParsedRace:
+    """パース段の出力（前回の同期から変化のないページはパースしない）"""
+    race_detail: Optional[Dict] = None  # None: 結果ページに変化なし
+    odds_data: Optional[Dict] = None  # None: オッズページに変化なし
+    digests: Dict[str, str] = field(default_factory=dict)  # 保存するページのハッシュ
+
+    @property
+    def unchanged(self) -> bool:
+        return self.race_detail is None and self.odds_data is None
+
+
+@dataclass
+class SyncStats:
+    """同期の処理件数と段ごとの処理時間（秒、並行処理分は合計）"""
+    races_total: int = 0
+    races_done: int = 0
+    races_failed: int = 0
+    races_unchanged: int = 0
+    fetch_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    write_seconds: float = 0.0
+
 
 class JRAScraper:
     """JRAデータスクレイピングサービス"""
     
-    def __init__(self, db_session: Session):
+    def __init__(
+        self,
+        db_session: Session,
+        concurrency: int = SYNC_CONCURRENCY,
+        cache: Optional[HTTPCache] = None,
+        parser_backend: str = HTML_PARSER,
+        limiter: Optional[AdaptiveLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        fetch_past_races: bool = PAST_RACES_ENABLED,
+        queue_size: int = SYNC_QUEUE_SIZE,
+        base_url: str = JRA_BASE_URL,
+        archive: Optional[PageArchive] = None,
+    ):
         self.session = db_session
-        self.client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT)
+        # アプリケーション共有の接続プールがあれば借用し、なければ同期ごとに作成する
+        shared_client = get_http_client()
+        self._owns_client = shared_client is None
+        self.client = shared_client or httpx.AsyncClient(timeout=REQUEST_TIMEOUT)
+        self.concurrency = max(1, concurrency)
+        self.cache = cache if cache is not None else get_http_cache()
+        self.parser_backend = parser_backend
+        self.limiter = limiter or get_rate_limiter()
+        self.retry_policy = retry_policy or get_retry_policy()
+        self.fetch_past_races = fetch_past_races
+        self.queue_size = max(1, queue_size)
+        self.base_url = base_url.rstrip("/")
+        self.archive = archive if archive is not None else get_page_archive()
+        self.stats = SyncStats()
     
     async def close(self):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
     
-    async def sync_race_data(self, target_date: date, force: bool = False) -> Dict:
-        """指定日付のレースデータを同期する"""
+    async def sync_race_data(
+        self,
+        target_date: date,
+        force: bool = False,
+        skip_race_ids: Optional[Iterable[str]] = None,
+        on_race_saved: Optional[Callable[[str], None]] = None,
+        on_result: Optional[Callable[[Dict], None]] = None,
+    ) -> Dict:
+        """
+        指定日付のレースデータを同期する
+        
+        skip_race_ids に含まれるレースは取得しない。on_race_saved は各レースの保存直後に
+        レースIDを引数として呼び出される（バックフィルのチェックポイント記録用）。
+        on_result は失敗を含む各レースの結果を引数として呼び出される（進捗の記録用）。
+        いずれもDB書き込み用スレッドで呼び出される。
+        details にはレース一覧の順に結果が並ぶ（保存もこの順に行う）。
+        """
+        self.stats = SyncStats()
         try:
             logger.info(f"同期開始: {target_date}, 強制モード: {force}")
+            throttled_at_start = self.limiter.snapshot()["throttled_seconds"]
             
             # 同期済みかチェック (強制モードでない場合)
             if not force:
-                existing_races = self.session.exec(
-                    select(Race).where(Race.race_date == target_date)
-                ).all()
+                existing_races = read_all(
+                    self.session, select(Race.id).where(Race.race_date == target_date)
+                )
                 
                 if existing_races:
                     logger.info(f"同期スキップ - すでに{len(existing_races)}レースのデータが存在します")
@@ -45,42 +162,54 @@ class JRAScraper:
             if not races_list:
                 return {"status": "no_data", "message": f"{target_date}のレースは見つかりませんでした"}
             
+            if skip_race_ids:
+                skip_race_ids = set(skip_race_ids)
+                races_list = [r for r in races_list if r["race_id"] not in skip_race_ids]
+                if not races_list:
+                    return {"status": "skipped", "message": "すべてのレースが同期済みです"}
+            
+            # 取得 → パース → 保存 のパイプラインで処理し、保存が完了したレースから結果を受け取る
+            self.stats.races_total = len(races_list)
             results = []
-            # それぞれのレースの詳細を取得して保存
-            for race_info in races_list:
-                race_id = race_info["race_id"]
-                venue = race_info["venue"]
-                race_number = race_info["race_number"]
-                
+            async for result in self.stream_race_data(target_date, races_list, on_race_saved):
+                results.append(result)
+                if on_result:
+                    await run_write(on_result, result)
+            
+            success_count = sum(1 for r in results if r["status"] == "success")
+            unchanged_count = sum(1 for r in results if r["status"] == "unchanged")
+            
+            # 出走馬の戦績を取得（失敗してもレースの同期結果には影響させない）
+            past_races = None
+            if self.fetch_past_races and success_count:
                 try:
-                    # レース詳細取得
-                    race_detail = await self._fetch_race_detail(race_id, venue, race_number, target_date)
-                    
-                    # オッズ情報取得
-                    odds_data = await self._fetch_odds(race_id, venue, race_number)
-                    
-                    # データを保存
-                    self._save_race_data(race_detail, odds_data)
-                    
-                    results.append({
-                        "race_id": race_id,
-                        "status": "success"
-                    })
+                    saved_race_ids = [r["race_id"] for r in results if r["status"] == "success"]
+                    past_races = await PastRaceCrawler(self).crawl_races(saved_race_ids)
                 except Exception as e:
-                    logger.error(f"レース {race_id} 同期エラー: {str(e)}", exc_info=True)
-                    results.append({
-                        "race_id": race_id,
-                        "status": "error",
-                        "message": str(e)
-                    })
+                    logger.error(f"戦績の同期エラー: {str(e)}", exc_info=True)
+                    past_races = {"status": "error", "message": str(e)}
             
-            success_count = sum(1 for r in results if r["status"] == "success")
+            # 流量制御の状態（待機時間はこの同期中に増えた分）
+            rate_limit = self.limiter.snapshot()
+            rate_limit["throttled_seconds"] = round(
+                rate_limit["throttled_seconds"] - throttled_at_start, 3
+            )
             
-            return {
-                "status": "success" if success_count > 0 else "partial_failure",
-                "message": f"{success_count}/{len(races_list)}レースのデータを同期しました",
-                "details": results
+            message = f"{success_count}/{len(races_list)}レースのデータを同期しました"
+            if unchanged_count:
+                message += f"（変更なし: {unchanged_count}レース）"
+            
+            result = {
+                "status": "success" if success_count + unchanged_count > 0 else "partial_failure",
+                "message": message,
+                "details": results,
+                "unchanged": unchanged_count,
+                "rate_limit": rate_limit
             }
+            if past_races is not None:
+                result["past_races"] = past_races
+            
+            return result
             
         except Exception as e:
             logger.error(f"同期エラー: {str(e)}", exc_info=True)
@@ -88,280 +217,606 @@ class JRAScraper:
         finally:
             await self.close()
     
+    async def refresh_odds(self, races: List[Race]) -> Dict:
+        """
+        指定レースのオッズのみを再取得し、変化した馬だけを更新する
+        
+        レース詳細ページは取得しない。オッズの取得に失敗した馬は更新しない。
+        """
+        try:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            
+            async def fetch(race: Race) -> Dict:
+                async with semaphore:
+                    return await self._fetch_odds(
+                        race.race_id, race.venue, race.race_number, revalidate=True
+                    )
+            
+            odds_list = await asyncio.gather(*(fetch(race) for race in races))
+            updated = await run_write(self._apply_odds, {
+                race.id: odds_data.get("win_odds", {}) for race, odds_data in zip(races, odds_list)
+            })
+            
+            return {
+                "status": "success",
+                "message": f"{len(races)}レースのオッズを確認し、{updated}頭のオッズを更新しました",
+                "updated": updated
+            }
+        finally:
+            await self.close()
+    
+    def _apply_odds(self, win_odds_by_race: Dict[int, Dict[int, float]]) -> int:
+        """保存済みのオッズと比較し、変化した馬のみを1回のコミットで更新"""
+        if not win_odds_by_race:
+            return 0
+        
+        horses = self.session.exec(
+            select(Horse).where(Horse.race_id.in_(list(win_odds_by_race)))
+        ).all()
+        
+        changed = []
+        for horse in horses:
+            odds = win_odds_by_race[horse.race_id].get(horse.horse_number)
+            if odds and odds != horse.odds:
+                horse.odds = odds
+                changed.append(horse)
+        
+        # オッズの推移を記録（前回と同じ内容の場合は記録されない）
+        snapshots = [
+            record_snapshot(self.session, race_id, win_odds)
+            for race_id, win_odds in win_odds_by_race.items()
+        ]
+        
+        if changed or any(snapshots):
+            self.session.add_all(changed)
+            self.session.commit()
+        else:
+            # 変更がない場合も読み取りのトランザクションを終了し、書き込み用の接続を返す
+            self.session.rollback()
+        
+        return len(changed)
+    
+    def finished_races(self, target_date: date, now: Optional[datetime] = None) -> List[Race]:
+        """指定日付の発走済みで、着順が1頭も登録されていないレース（now は日本時間）"""
+        now = now or jra_now()
+        has_results = select(Horse.race_id).where(Horse.result_order.is_not(None))
+        return read_all(
+            self.session,
+            select(Race).where(
+                Race.race_date == target_date,
+                Race.start_time <= now,
+                Race.id.not_in(has_results),
+            ).order_by(Race.start_time)
+        )
+    
+    async def refresh_results(self, races: List[Race]) -> Dict:
+        """
+        指定レースの結果ページのみを再取得し、着順・タイム・着差・通過順と払戻金を更新する
+        
+        オッズページは取得しない。結果ページの取得に失敗したレースは更新しない。
+        """
+        try:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            
+            async def fetch(race: Race) -> Optional[Dict]:
+                async with semaphore:
+                    try:
+                        return await self._fetch_race_detail(
+                            race.race_id, race.venue, race.race_number, race.race_date,
+                            revalidate=True
+                        )
+                    except httpx.HTTPError:
+                        return None
+            
+            details = await asyncio.gather(*(fetch(race) for race in races))
+            updated = await run_write(self._apply_results, {
+                race.id: detail for race, detail in zip(races, details) if detail
+            })
+            
+            return {
+                "status": "success",
+                "message": f"{len(races)}レースの結果を確認し、{updated}頭の結果を更新しました",
+                "updated": updated
+            }
+        finally:
+            await self.close()
+    
+    def _apply_results(self, details_by_race: Dict[int, Dict]) -> int:
+        """保存済みの結果と比較し、変化した馬と払戻金のみを1回のコミットで更新"""
+        if not details_by_race:
+            return 0
+        
+        results_by_race = {
+            race_id: {horse["horse_number"]: horse for horse in detail.get("horses", [])}
+            for race_id, detail in details_by_race.items()
+        }
+        horses = self.session.exec(
+            select(Horse).where(Horse.race_id.in_(list(results_by_race)))
+        ).all()
+        
+        changed = []
+        for horse in horses:
+            result = results_by_race[horse.race_id].get(horse.horse_number)
+            if not result:
+                continue
+            values = {key: result.get(key) for key in RESULT_FIELDS}
+            if any(getattr(horse, key) != value for key, value in values.items()):
+                for key, value in values.items():
+                    setattr(horse, key, value)
+                changed.append(horse)
+        
+        payouts = [
+            store_payouts(self.session, race_id, detail.get("payouts", []))
+            for race_id, detail in details_by_race.items()
+        ]
+        
+        if changed or any(payouts):
+            self.session.add_all(changed)
+            self.session.commit()
+        else:
+            # 変更がない場合も読み取りのトランザクションを終了し、書き込み用の接続を返す
+            self.session.rollback()
+        
+        return len(changed)
+    
+    async def stream_race_data(
+        self,
+        target_date: date,
+        races_list: List[Dict],
+        on_race_saved: Optional[Callable[[str], None]] = None,
+    ) -> AsyncIterator[Dict]:
+        """
+        レースごとに 取得 → パース → 保存 を段階的に処理し、保存が完了したレースから結果を返す
+        
+        取得とパースは並行して行うが、保存と結果はレース一覧の順に行う（先に完了したレースは
+        前のレースの保存まで待つ）。段の間は上限付きのキューでつなぎ、取得を始めてから保存が
+        完了していないレースを queue_size × 2 + 同時取得数 + パース並列数 件までに制限するため、
+        後段が詰まると前段の取得が止まる。
+        パースはパース用プール（parse_pool）で、保存はDB書き込み用スレッド（db_writer）で実行し、
+        イベントループを占有しない。on_race_saved も書き込み用スレッドで呼び出される。
+        前回の同期から内容が変化していないページはパース・保存を行わない。
+        """
+        fetched: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        parsed: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        pending = enumerate(races_list)
+        known = self._load_page_hashes([r["race_id"] for r in races_list])
+        fetch_workers = min(self.concurrency, len(races_list))
+        parse_workers = min(parse_concurrency(), len(races_list))
+        # 取得を始めてから保存が完了していないレースの上限
+        window = asyncio.Semaphore(self.queue_size * 2 + fetch_workers + parse_workers)
+        
+        stats = self.stats
+        
+        async def fetch_worker():
+            while True:
+                await window.acquire()
+                index, race_info = next(pending, (None, None))
+                if race_info is None:
+                    window.release()
+                    return
+                started = time.perf_counter()
+                try:
+                    pages = await self._fetch_race(race_info, target_date)
+                except Exception as e:
+                    pages = e
+                stats.fetch_seconds += time.perf_counter() - started
+                await fetched.put((index, race_info, pages))
+        
+        async def fetch_stage():
+            await asyncio.gather(*(fetch_worker() for _ in range(fetch_workers)))
+            for _ in range(parse_workers):
+                await fetched.put(_DONE)
+        
+        async def parse_worker():
+            while True:
+                item = await fetched.get()
+                if item is _DONE:
+                    return
+                index, race_info, pages = item
+                if not isinstance(pages, Exception):
+                    started = time.perf_counter()
+                    try:
+                        pages = await self._parse_changed(race_info, target_date, pages, known)
+                    except Exception as e:
+                        pages = e
+                    stats.parse_seconds += time.perf_counter() - started
+                await parsed.put((index, race_info, pages))
+        
+        async def parse_stage():
+            # パースはパース用プールで実行されるため、ワーカー数まで並行して投入する
+            await asyncio.gather(*(parse_worker() for _ in range(parse_workers)))
+            await parsed.put(_DONE)
+        
+        stages = [asyncio.create_task(fetch_stage()), asyncio.create_task(parse_stage())]
+        # パースが完了し、前のレースの保存を待っているレース（{レース一覧の位置: (レース情報, データ)}）
+        ready: Dict[int, Tuple[Dict, Any]] = {}
+        next_index = 0
+        try:
+            while True:
+                item = await parsed.get()
+                if item is _DONE:
+                    break
+                index, race_info, race_data = item
+                ready[index] = (race_info, race_data)
+                while next_index in ready:
+                    race_info, race_data = ready.pop(next_index)
+                    next_index += 1
+                    started = time.perf_counter()
+                    result = await run_write(
+                        self._persist_race, race_info["race_id"], race_data, known, on_race_saved
+                    )
+                    stats.write_seconds += time.perf_counter() - started
+                    window.release()
+                    if result["status"] == "success":
+                        stats.races_done += 1
+                    elif result["status"] == "unchanged":
+                        stats.races_unchanged += 1
+                    else:
+                        stats.races_failed += 1
+                    yield result
+        finally:
+            # 途中で打ち切られた場合も前段のタスクを残さない
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+    
+    def _persist_race(
+        self,
+        race_id: str,
+        race_data: Any,
+        known: Dict[str, Tuple[int, Dict[str, str]]],
+        on_race_saved: Optional[Callable[[str], None]] = None,
+    ) -> Dict:
+        """パース済みのレースを保存し、結果を返す"""
+        try:
+            if isinstance(race_data, Exception):
+                raise race_data
+            
+            if race_data.unchanged:
+                status = "unchanged"
+            else:
+                # ページのハッシュはレースと同じコミットで保存する（失敗時は破棄される）
+                self._record_page_hashes(race_id, race_data.digests)
+                if race_data.race_detail is not None:
+                    self._save_race_data(race_data.race_detail, race_data.odds_data)
+                else:
+                    # オッズのみ変化した場合は変化した馬のオッズだけを更新
+                    race_pk = known[race_id][0]
+                    self._apply_odds({race_pk: race_data.odds_data.get("win_odds", {})})
+                    self.session.commit()
+                status = "success"
+            
+            if on_race_saved:
+                on_race_saved(race_id)
+            
+            return {
+                "race_id": race_id,
+                "status": status
+            }
+        except Exception as e:
+            if not isinstance(race_data, Exception):
+                self.session.rollback()  # 記録途中のハッシュを破棄
+            logger.error(f"レース {race_id} 同期エラー: {str(e)}", exc_info=True)
+            return {
+                "race_id": race_id,
+                "status": "error",
+                "message": str(e)
+            }
+    
+    def _load_page_hashes(self, race_ids: List[str]) -> Dict[str, Tuple[int, Dict[str, str]]]:
+        """保存済みレースのページハッシュをまとめて取得（{レースID: (race.id, {ページ種別: ハッシュ})}）"""
+        known = {}
+        rows = read_all(
+            self.session,
+            select(RacePageHash.race_id, RacePageHash.page_type, RacePageHash.digest, Race.id)
+            .join(Race, Race.race_id == RacePageHash.race_id)
+            .where(RacePageHash.race_id.in_(race_ids))
+        )
+        for race_id, page_type, digest, race_pk in rows:
+            known.setdefault(race_id, (race_pk, {}))[1][page_type] = digest
+        return known
+    
+    async def _parse_changed(
+        self,
+        race_info: Dict,
+        target_date: date,
+        pages: Tuple[FetchedPage, Optional[FetchedPage]],
+        known: Dict[str, Tuple[int, Dict[str, str]]],
+    ) -> ParsedRace:
+        """前回の同期から変化したページのみをパース"""
+        detail_page, odds_page = pages
+        stored = known[race_info["race_id"]][1] if race_info["race_id"] in known else {}
+        
+        digests = {"result": detail_page.digest}
+        if odds_page:
+            digests["odds"] = odds_page.digest
+        changed = {
+            page_type for page_type, digest in digests.items() if stored.get(page_type) != digest
+        }
+        
+        if not changed:
+            return ParsedRace()
+        if "result" not in changed:
+            return ParsedRace(
+                odds_data=await self._parse_page(odds_page, parsers.parse_odds, self.parser_backend),
+                digests={"odds": digests["odds"]}
+            )
+        
+        race_detail, odds_data = await self._parse_race(race_info, target_date, pages)
+        return ParsedRace(race_detail, odds_data, digests)
+    
+    def _record_page_hashes(self, race_id: str, digests: Dict[str, str]):
+        """ページのハッシュを登録/更新（コミットは呼び出し側で行う）"""
+        upsert(
+            self.session,
+            RacePageHash,
+            [
+                {"race_id": race_id, "page_type": page_type, "digest": digest}
+                for page_type, digest in digests.items()
+            ],
+            ["race_id", "page_type"],
+        )
+    
+    async def _fetch_race(
+        self, race_info: Dict, target_date: date
+    ) -> Tuple[FetchedPage, Optional[FetchedPage]]:
+        """
+        1レース分の結果ページとオッズページを同時に取得（パースは行わない）
+        
+        当日以降のレースは結果が確定していないため、結果ページのキャッシュがTTL内でも再検証する
+        （発走前に取得した結果ページを強制同期で使い回さない）。
+        """
+        race_id = race_info["race_id"]
+        revalidate = target_date >= jra_now().date()
+        
+        return await asyncio.gather(
+            self._fetch_page(self._race_detail_url(race_id), "result", revalidate=revalidate),
+            self._fetch_odds_page(race_id)
+        )
+    
+    async def _parse_race(
+        self,
+        race_info: Dict,
+        target_date: date,
+        pages: Tuple[FetchedPage, Optional[FetchedPage]],
+    ) -> Tuple[Dict, Dict]:
+        """1レース分のページをパース（結果ページとオッズページは並行してパースする）"""
+        detail_page, odds_page = pages
+        
+        parse_detail = self._parse_page(
+            detail_page, parsers.parse_race_detail, race_info["race_id"], race_info["venue"],
+            race_info["race_number"], target_date, self.parser_backend
+        )
+        if not odds_page:
+            return await parse_detail, {"win_odds": {}}
+        
+        race_detail, odds_data = await asyncio.gather(
+            parse_detail, self._parse_page(odds_page, parsers.parse_odds, self.parser_backend)
+        )
+        return race_detail, odds_data
+    
+    async def _fetch_page(self, url: str, page_type: str, revalidate: bool = False) -> FetchedPage:
+        """
+        ページを取得する（パースは行わない）
+        
+        キャッシュがTTL内であれば通信せず、期限切れの場合は条件付きリクエストで再検証する。
+        revalidate=True の場合はTTL内でも必ず再検証する。
+        """
+        entry = self.cache.get(url) if self.cache else None
+        if entry and not revalidate and self.cache.is_fresh(entry):
+            return FetchedPage(url, entry.body, entry)
+        
+        headers = self.cache.conditional_headers(entry) if self.cache else {}
+        
+        # 再試行ポリシー（バックオフ・サーキットブレーカー）を介してリクエスト
+        response = await self.retry_policy.call(url, lambda: self._send(url, headers))
+        if entry and response.status_code == 304:
+            entry = await self.cache.revalidated_async(entry, response)
+            return FetchedPage(url, entry.body, entry)
+        
+        await self._archive_page(url, page_type, response.text)
+        
+        if self.cache:
+            entry = await self.cache.store_async(url, page_type, response)
+            return FetchedPage(url, entry.body, entry)
+        return FetchedPage(url, response.text)
+    
+    async def _archive_page(self, url: str, page_type: str, text: str):
+        """
+        取得したレースのページをアーカイブに保存（失敗しても同期は続行する）
+        
+        圧縮と書き込みはアーカイブ用スレッドで行い、イベントループを占有しない。
+        """
+        if not self.archive or page_type not in ARCHIVED_PAGE_TYPES:
+            return
+        race_id_match = re.search(r"race_id=([0-9]+)", url)
+        if not race_id_match:
+            return
+        try:
+            await self.archive.store_async(race_id_match.group(1), page_type, url, text)
+        except Exception as e:
+            logger.warning(f"ページのアーカイブに失敗: {url}: {str(e)}")
+    
+    async def _parse_page(self, page: FetchedPage, parser: Callable[..., Any], *args) -> Any:
+        """
+        取得済みのページをパース用プールでパース（キャッシュ済みの本文はパース結果を再利用）
+        
+        parser は parsers モジュールの関数で、本文と args を引数として呼び出す。
+        """
+        if page.entry and self.cache:
+            parsed = self.cache.parsed(page.entry)
+            if parsed is not None:
+                return parsed
+            return self.cache.remember(page.entry, await run_parser(parser, page.text, *args))
+        return await run_parser(parser, page.text, *args)
+    
+    async def _get_page(
+        self,
+        url: str,
+        page_type: str,
+        parser: Callable[..., Any],
+        *args,
+        revalidate: bool = False,
+    ) -> Any:
+        """ページを取得してパースする"""
+        page = await self._fetch_page(url, page_type, revalidate=revalidate)
+        return await self._parse_page(page, parser, *args)
+    
+    async def _send(self, url: str, headers: Dict[str, str]) -> httpx.Response:
+        """流量制御の枠内でリクエストを1回送信"""
+        async with self.limiter.request() as outcome:
+            response = await self.client.get(url, headers=headers)
+            outcome.status_code = response.status_code
+        return response
+    
     async def _fetch_races_list(self, target_date: date) -> List[Dict]:
         """指定日付のレース一覧を取得"""
         # JRAのレース一覧URLを構築
         date_str = target_date.strftime("%Y%m%d")
-        url = f"{JRA_BASE_URL}/race_list.html?kaisai_date={date_str}"
-        
-        # リトライ処理を含むHTTPリクエスト
-        for attempt in range(MAX_RETRY_COUNT):
-            try:
-                response = await self.client.get(url)
-                response.raise_for_status()
-                break
-            except httpx.HTTPError as e:
-                if attempt == MAX_RETRY_COUNT - 1:
-                    logger.error(f"レース一覧の取得に失敗: {str(e)}")
-                    raise
-                await asyncio.sleep(1)
-        
-        # HTMLパース
-        soup = BeautifulSoup(response.text, "html.parser")
-        races = []
-        
-        # レース一覧テーブルからデータ抽出
-        race_tables = soup.select(".race_table")
-        for table in race_tables:
-            venue_elem = table.select_one(".race_place")
-            if not venue_elem:
-                continue
-                
-            venue = venue_elem.text.strip()
-            
-            race_rows = table.select("tr.race_data")
-            for row in race_rows:
-                race_link = row.select_one("a")
-                if not race_link:
-                    continue
-                    
-                href = race_link.get("href", "")
-                race_id_match = re.search(r"race_id=([0-9]+)", href)
-                if not race_id_match:
-                    continue
-                    
-                race_id = race_id_match.group(1)
-                race_number_text = row.select_one(".race_num").text.strip()
-                race_number_match = re.search(r"(\d+)R", race_number_text)
-                race_number = int(race_number_match.group(1)) if race_number_match else 0
-                
-                races.append({
-                    "race_id": race_id,
-                    "venue": venue,
-                    "race_number": race_number
-                })
+        url = f"{self.base_url}/race_list.html?kaisai_date={date_str}"
         
-        return races
+        try:
+            return await self._get_page(url, "race_list", parsers.parse_races_list, self.parser_backend)
+        except httpx.HTTPError as e:
+            logger.error(f"レース一覧の取得に失敗: {str(e)}")
+            raise
     
-    async def _fetch_race_detail(self, race_id: str, venue: str, race_number: int, race_date: date) -> Dict:
+    async def _fetch_race_detail(
+        self, race_id: str, venue: str, race_number: int, race_date: date, revalidate: bool = False
+    ) -> Dict:
         """レース詳細情報を取得"""
-        # レース詳細URLを構築
-        url = f"{JRA_BASE_URL}/race/result.html?race_id={race_id}"
-        
-        # リトライ処理を含むHTTPリクエスト
-        for attempt in range(MAX_RETRY_COUNT):
-            try:
-                response = await self.client.get(url)
-                response.raise_for_status()
-                break
-            except httpx.HTTPError as e:
-                if attempt == MAX_RETRY_COUNT - 1:
-                    logger.error(f"レース詳細の取得に失敗: {str(e)}")
-                    raise
-                await asyncio.sleep(1)
-        
-        # HTMLパース
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        # レース情報抽出
-        race_name_elem = soup.select_one(".race_name")
-        race_name = race_name_elem.text.strip() if race_name_elem else f"{venue}{race_number}レース"
-        
-        # レース条件抽出
-        race_info_elem = soup.select_one(".race_condition")
-        race_info_text = race_info_elem.text.strip() if race_info_elem else ""
-        
-        # コース情報抽出
-        course_match = re.search(r"(芝|ダート)(\d+)m", race_info_text)
-        course_type = course_match.group(1) if course_match else "不明"
-        distance = int(course_match.group(2)) if course_match else 0
-        
-        # クラス情報抽出
-        class_match = re.search(r"(G\d|新馬|未勝利|\d勝クラス|オープン|\d+万下)", race_info_text)
-        race_class = class_match.group(1) if class_match else "一般"
-        
-        # 天候・馬場状態抽出
-        condition_elem = soup.select_one(".race_condition")
-        condition_text = condition_elem.text.strip() if condition_elem else ""
-        
-        weather_match = re.search(r"天候:(\w+)", condition_text)
-        weather = weather_match.group(1) if weather_match else "不明"
-        
-        track_match = re.search(r"馬場:(\w+)", condition_text)
-        track_condition = track_match.group(1) if track_match else "不明"
-        
-        # 発走時刻抽出
-        time_elem = soup.select_one(".race_time")
-        time_text = time_elem.text.strip() if time_elem else ""
-        time_match = re.search(r"(\d+):(\d+)", time_text)
-        
-        start_time = None
-        if time_match:
-            hour = int(time_match.group(1))
-            minute = int(time_match.group(2))
-            start_time = datetime.combine(race_date, datetime.strptime(f"{hour}:{minute}", "%H:%M").time())
-        
-        # 出走馬情報抽出
-        horses = []
-        horse_table = soup.select_one(".race_table_01")
-        if horse_table:
-            horse_rows = horse_table.select("tr")[1:]  # ヘッダー行をスキップ
-            for row in horse_rows:
-                cols = row.select("td")
-                if len(cols) < 4:
-                    continue
-                
-                horse_number = int(cols[1].text.strip()) if cols[1].text.strip().isdigit() else 0
-                horse_name_elem = cols[3].select_one("a")
-                horse_name = horse_name_elem.text.strip() if horse_name_elem else ""
-                horse_id_match = re.search(r"horse_id=([0-9]+)", horse_name_elem.get("href", "")) if horse_name_elem else None
-                horse_id = horse_id_match.group(1) if horse_id_match else ""
-                
-                jockey_elem = cols[6].select_one("a")
-                jockey = jockey_elem.text.strip() if jockey_elem else ""
-                
-                weight_text = cols[8].text.strip() if len(cols) > 8 else ""
-                weight_match = re.search(r"(\d+)", weight_text)
-                weight = int(weight_match.group(1)) if weight_match else 0
-                
-                trainer_elem = cols[10].select_one("a") if len(cols) > 10 else None
-                trainer = trainer_elem.text.strip() if trainer_elem else ""
-                
-                # 過去レースは別APIで取得が必要になるため、ここではダミーデータを設定
-                past_races = []
-                
-                horses.append({
-                    "horse_id": horse_id,
-                    "horse_name": horse_name,
-                    "horse_number": horse_number,
-                    "jockey": jockey,
-                    "trainer": trainer,
-                    "weight": weight,
-                    "past_races": past_races
-                })
-        
-        return {
-            "race_id": race_id,
-            "race_date": race_date,
-            "venue": venue,
-            "race_number": race_number,
-            "race_name": race_name,
-            "race_class": race_class,
-            "course_type": course_type,
-            "distance": distance,
-            "weather": weather,
-            "track_condition": track_condition,
-            "start_time": start_time,
-            "horses": horses
-        }
+        try:
+            return await self._get_page(
+                self._race_detail_url(race_id), "result", parsers.parse_race_detail,
+                race_id, venue, race_number, race_date, self.parser_backend,
+                revalidate=revalidate
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"レース詳細の取得に失敗: {str(e)}")
+            raise
+    
+    def _race_detail_url(self, race_id: str) -> str:
+        """レース詳細URLを構築"""
+        return f"{self.base_url}/race/result.html?race_id={race_id}"
     
-    async def _fetch_odds(self, race_id: str, venue: str, race_number: int) -> Dict:
+    def _odds_url(self, race_id: str) -> str:
+        """オッズ情報のURLを構築"""
+        return f"{self.base_url}/odds/index.html?race_id={race_id}"
+    
+    async def _fetch_odds(
+        self, race_id: str, venue: str, race_number: int, revalidate: bool = False
+    ) -> Dict:
         """オッズ情報を取得"""
-        # オッズ情報のURLを構築
-        url = f"{JRA_BASE_URL}/odds/index.html?race_id={race_id}"
-        
-        # リトライ処理を含むHTTPリクエスト
-        for attempt in range(MAX_RETRY_COUNT):
-            try:
-                response = await self.client.get(url)
-                response.raise_for_status()
-                break
-            except httpx.HTTPError as e:
-                if attempt == MAX_RETRY_COUNT - 1:
-                    logger.error(f"オッズ情報の取得に失敗: {str(e)}")
-                    return {"win_odds": {}}  # エラー時は空のオッズを返す
-                await asyncio.sleep(1)
-        
-        # HTMLパース
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        # 単勝オッズの抽出
-        win_odds = {}
-        odds_table = soup.select_one(".odds_table_01")
-        if odds_table:
-            odds_rows = odds_table.select("tr")[1:]  # ヘッダー行をスキップ
-            for row in odds_rows:
-                cols = row.select("td")
-                if len(cols) < 3:
-                    continue
-                
-                horse_number_text = cols[0].text.strip()
-                if not horse_number_text.isdigit():
-                    continue
-                    
-                horse_number = int(horse_number_text)
-                odds_text = cols[2].text.strip().replace(",", "")
-                
-                try:
-                    odds_value = float(odds_text)
-                    win_odds[horse_number] = odds_value
-                except ValueError:
-                    pass
+        try:
+            return await self._get_page(
+                self._odds_url(race_id), "odds", parsers.parse_odds, self.parser_backend,
+                revalidate=revalidate
+            )
+        except httpx.HTTPError as e:
+            logger.error(f"オッズ情報の取得に失敗: {str(e)}")
+            return {"win_odds": {}}  # エラー時は空のオッズを返す
+    
+    async def _fetch_odds_page(self, race_id: str) -> Optional[FetchedPage]:
+        """オッズページを取得（エラー時はNone）"""
+        try:
+            return await self._fetch_page(self._odds_url(race_id), "odds")
+        except httpx.HTTPError as e:
+            logger.error(f"オッズ情報の取得に失敗: {str(e)}")
+            return None
+    
+    async def _fetch_horse_history(self, horse_id: str) -> List[Dict]:
+        """馬の戦績を取得"""
+        # 戦績ページのURLを構築
+        url = f"{self.base_url}/horse/index.html?horse_id={horse_id}"
         
-        return {"win_odds": win_odds}
+        try:
+            return await self._get_page(url, "horse", parsers.parse_horse_history, self.parser_backend)
+        except httpx.HTTPError as e:
+            logger.error(f"戦績の取得に失敗: {str(e)}")
+            raise
     
-    def _save_race_data(self, race_detail: Dict, odds_data: Dict):
-        """レース情報をデータベースに保存"""
-        # レース情報を登録/更新
-        race_data = {k: v for k, v in race_detail.items() if k != "horses"}
-        
-        # 既存レースを検索
-        existing_race = self.session.exec(
-            select(Race).where(Race.race_id == race_data["race_id"])
-        ).first()
-        
-        if existing_race:
-            # 更新
-            for key, value in race_data.items():
-                setattr(existing_race, key, value)
-            race = existing_race
-        else:
-            # 新規作成
-            race = Race(**race_data)
-            self.session.add(race)
-        
-        self.session.commit()
-        self.session.refresh(race)
-        
-        # 馬情報を登録/更新
-        horses_data = race_detail.get("horses", [])
-        for horse_data in horses_data:
-            past_races = horse_data.pop("past_races", [])
-            horse_data["race_id"] = race.id
-            
-            # 既存の馬を検索
-            existing_horse = self.session.exec(
-                select(Horse).where(
-                    Horse.race_id == race.id,
-                    Horse.horse_id == horse_data["horse_id"]
-                )
-            ).first()
+    def _save_races(self, races: List[Tuple[Dict, Dict]], commit: bool = True):
+        """
+        複数のレースをまとめて保存（(レース詳細, オッズ) のリスト）
+
+        PostgreSQLではCOPYでステージングテーブルに投入してから本テーブルに反映し、
+        それ以外のデータベースでは _save_race_data を順に呼び出す。
+        commit=False の場合はコミットを呼び出し側に任せる。
+        """
+        try:
+            if supports_copy(self.session):
+                bulk_load_races(self.session, races)
+            else:
+                for race_detail, odds_data in races:
+                    self._save_race_data(race_detail, odds_data, commit=False)
             
-            if existing_horse:
-                # 更新
-                for key, value in horse_data.items():
-                    setattr(existing_horse, key, value)
-                horse = existing_horse
+            if commit:
+                self.session.commit()
             else:
-                # 新規作成
-                horse = Horse(**horse_data)
-                self.session.add(horse)
+                self.session.flush()
+        except Exception:
+            self.session.rollback()
+            raise
+    
+    def _save_race_data(self, race_detail: Dict, odds_data: Dict, commit: bool = True):
+        """
+        レース情報をデータベースに保存
+        
+        レースと出走馬は一意インデックス（race_id / (race_id, horse_id)）を競合対象とした
+        INSERT ... ON CONFLICT でまとめて登録/更新し、オッズ・過去レースとあわせて
+        1回のコミットで書き込む。commit=False の場合はコミットを呼び出し側に任せる。
+        """
+        race_data = {k: v for k, v in race_detail.items() if k not in ("horses", "payouts")}
+        now = datetime.now()
+        
+        try:
+            # レース情報を登録/更新し、採番済みのIDを読み直す
+            upsert(self.session, Race, [race_data], ["race_id"], now=now)
+            race = self.session.exec(
+                select(Race)
+                .where(Race.race_id == race_data["race_id"])
+                .execution_options(populate_existing=True)
+            ).one()
             
-            self.session.commit()
-            self.session.refresh(horse)
+            # 馬情報を登録/更新（オッズがない馬は既存のオッズを残す）
+            win_odds = odds_data.get("win_odds", {})
+            horse_rows = []
+            pending_past_races = {}
+            for horse_data in race_detail.get("horses", []):
+                horse_data = dict(horse_data)
+                past_races = horse_data.pop("past_races", [])
+                horse_data["race_id"] = race.id
+                horse_data["odds"] = win_odds.get(horse_data["horse_number"]) or None
+                horse_rows.append(horse_data)
+                if past_races:
+                    pending_past_races[horse_data["horse_id"]] = past_races
+            upsert(
+                self.session, Horse, horse_rows, ["race_id", "horse_id"], keep_existing=["odds"], now=now
+            )
             
-            # オッズ情報を更新
-            win_odds = odds_data.get("win_odds", {}).get(horse.horse_number)
-            if win_odds:
-                horse.odds = win_odds
-                self.session.add(horse)
+            # オッズの推移と払戻金を記録
+            record_snapshot(self.session, race.id, win_odds)
+            store_payouts(self.session, race.id, race_detail.get("payouts", []))
             
-            # 過去レース情報を登録
-            for past_race_data in past_races:
-                past_race = HorsePastRace(
-                    horse_id=horse.id,
-                    **past_race_data
-                )
-                self.session.add(past_race)
+            # 過去レース情報を登録（馬のIDは (race_id, horse_id) のインデックスで引く）
+            if pending_past_races:
+                horse_ids = dict(self.session.exec(
+                    select(Horse.horse_id, Horse.id).where(
+                        Horse.race_id == race.id, Horse.horse_id.in_(list(pending_past_races))
+                    )
+                ).all())
+                self.session.add_all([
+                    HorsePastRace(horse_id=horse_ids[horse_id], **past_race_data)
+                    for horse_id, past_races in pending_past_races.items()
+                    for past_race_data in past_races
+                ])
             
-            self.session.commit() 
\ No newline at end of file
+            if commit:
+                self.session.commit()
+            else:
+                self.session.flush()
+        except Exception:
+            self.session.rollback()
+            raise
+        
+        return race
@@ -0,0 +1,119 @@
+import logging
+from datetime import date
+import re
+from typing import Dict, List, Optional, Set
+
+from sqlmodel import Session, delete, select
+
+from app.models import BettingResult, Race, RacePayout
+from app.services.parsers import PAYOUT_BET_TYPES, REFUND_BET_TYPE, normalize_bet_numbers
+
+logger = logging.getLogger(__name__)
+
+
+def store_payouts(session: Session, race_id: int, payouts: List[Dict]) -> bool:
+    """
+    レースの払戻金を登録する（コミットは呼び出し側で行う）
+
+    払戻金がない（確定前の）場合や、登録済みの内容と同じ場合は変更しない。
+    変更した場合は True を返す。
+    """
+    if not payouts:
+        return False
+
+    existing = session.exec(
+        select(RacePayout.bet_type, RacePayout.bet_numbers, RacePayout.payout, RacePayout.popularity)
+        .where(RacePayout.race_id == race_id)
+    ).all()
+    incoming = {(p["bet_type"], p["bet_numbers"], p["payout"], p.get("popularity")) for p in payouts}
+    if set(existing) == incoming:
+        return False
+
+    session.exec(delete(RacePayout).where(RacePayout.race_id == race_id))
+    session.add_all([RacePayout(race_id=race_id, **payout) for payout in payouts])
+    return True
+
+
+def settle_tickets(session: Session, target_date: date, resettle: bool = False) -> Dict:
+    """
+    指定日付の未精算の馬券を払戻金と照合してまとめて精算する
+
+    払戻金が登録済みのレースの馬券のみを対象とし、券種と馬番の組み合わせが一致すれば的中として
+    払戻金（100円あたりの払戻金 × 購入額 / 100）を、不一致であれば 0 を記録する。
+    返還（取消・除外）の馬を含む馬券は不的中として購入額を払戻金に記録する。
+    馬券と払戻金はそれぞれ1回のクエリで取得し、更新は1回のコミットで行う。
+    resettle=True の場合は精算済みの馬券も再計算する。
+    """
+    race_ids = select(Race.id).where(Race.race_date == target_date)
+
+    payouts = {}
+    refunded: Dict[int, Set[int]] = {}
+    settled_races = set()
+    for race_id, bet_type, bet_numbers, payout in session.exec(
+        select(RacePayout.race_id, RacePayout.bet_type, RacePayout.bet_numbers, RacePayout.payout)
+        .where(RacePayout.race_id.in_(race_ids))
+    ).all():
+        settled_races.add(race_id)
+        if bet_type == REFUND_BET_TYPE:
+            refunded.setdefault(race_id, set()).add(int(bet_numbers))
+        else:
+            payouts[(race_id, bet_type, bet_numbers)] = payout
+
+    query = select(
+        BettingResult.id, BettingResult.race_id, BettingResult.bet_type,
+        BettingResult.bet_numbers, BettingResult.amount
+    ).where(BettingResult.race_id.in_(list(settled_races)))
+    if not resettle:
+        query = query.where(BettingResult.payout.is_(None))
+    tickets = session.exec(query).all()
+
+    updates = []
+    unknown = 0
+    refunds = 0
+    for ticket_id, race_id, bet_type, bet_numbers, amount in tickets:
+        bet_type = bet_type.strip()
+        if bet_type not in PAYOUT_BET_TYPES:
+            unknown += 1
+            continue
+        if refunded.get(race_id, set()) & {int(n) for n in re.findall(r"\d+", bet_numbers)}:
+            updates.append({"id": ticket_id, "is_won": False, "payout": amount})
+            refunds += 1
+            continue
+        payout = _ticket_payout(payouts, race_id, bet_type, bet_numbers, amount)
+        updates.append({"id": ticket_id, "is_won": payout > 0, "payout": payout})
+
+    if updates:
+        try:
+            session.bulk_update_mappings(BettingResult, updates)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+    else:
+        # 精算する馬券がない場合も読み取りのトランザクションを終了し、書き込み用の接続を返す
+        session.rollback()
+
+    won = sum(1 for u in updates if u["is_won"])
+    if unknown:
+        logger.warning(f"精算できない券種の馬券: {unknown}件")
+    logger.info(f"精算完了: {target_date}, {len(updates)}件（的中: {won}件, 返還: {refunds}件）")
+
+    return {
+        "status": "success",
+        "message": f"{len(updates)}件の馬券を精算しました（的中: {won}件, 返還: {refunds}件）",
+        "settled": len(updates),
+        "won": won,
+        "refunded": refunds,
+        "total_payout": sum(u["payout"] for u in updates),
+        "skipped": unknown,
+    }
+
+
+def _ticket_payout(
+    payouts: Dict, race_id: int, bet_type: str, bet_numbers: str, amount: int
+) -> int:
+    """馬券1枚の払戻金（不的中は 0）"""
+    per_100: Optional[int] = payouts.get((race_id, bet_type, normalize_bet_numbers(bet_type, bet_numbers)))
+    if not per_100:
+        return 0
+    return per_100 * amount // 100
@@ -0,0 +1,157 @@
+import logging
+import time
+from datetime import date, datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models import SyncJob
+from app.models.sync_job import ACTIVE_STATUSES
+from app.services.db_writer import run_write
+from app.services.scraper import JRAScraper, SyncStats
+
+logger = logging.getLogger(__name__)
+
+
+class SyncJobManager:
+    """同期ジョブの登録と実行
+
+    ジョブごとに専用のセッションで同期を実行し、状態・進捗・段ごとの処理時間を
+    SyncJob テーブルに記録する。同じ日付のジョブが実行中の場合は新たに登録せず、
+    実行中のジョブを返す（実行中のジョブは日付ごとの部分一意インデックスで1件に制限されるため、
+    複数のプロセスから同時に登録しても重複しない）。
+    ジョブの行への書き込みはすべてDB書き込み用スレッド（db_writer）で行い、
+    状態の取得は読み取り専用エンジンで行う（実行中の同期と書き込み用の接続を取り合わない）。
+    """
+
+    def __init__(
+        self,
+        engine: Optional[Engine] = None,
+        scraper_factory: Callable[[Session], JRAScraper] = JRAScraper,
+        read_engine: Optional[Engine] = None,
+    ):
+        if engine is None:
+            from app.db import engine, read_engine as default_read_engine
+            read_engine = read_engine or default_read_engine
+        self.engine = engine
+        self.read_engine = read_engine or engine
+        self.scraper_factory = scraper_factory
+
+    async def submit(self, target_date: date, force: bool = False) -> Tuple[SyncJob, bool]:
+        """
+        ジョブを登録する
+
+        (ジョブ, 新規登録したか) を返す。同じ日付のジョブが実行中であればそのジョブを返す。
+        """
+        return await run_write(self._submit, target_date, force)
+
+    def _submit(self, target_date: date, force: bool) -> Tuple[SyncJob, bool]:
+        with Session(self.engine) as session:
+            job = self._active_job(session, target_date)
+            if job is not None:
+                return job, False
+
+            job = SyncJob(target_date=target_date, force=force)
+            session.add(job)
+            try:
+                session.commit()
+            except IntegrityError:
+                # 他のプロセスが同じ日付のジョブを先に登録した
+                session.rollback()
+                job = self._active_job(session, target_date)
+                if job is None:
+                    raise
+                return job, False
+            session.refresh(job)
+            return job, True
+
+    def _active_job(self, session: Session, target_date: date) -> Optional[SyncJob]:
+        return session.exec(
+            select(SyncJob).where(
+                SyncJob.target_date == target_date, SyncJob.status.in_(ACTIVE_STATUSES)
+            )
+        ).first()
+
+    def get(self, job_id: int) -> Optional[SyncJob]:
+        """ジョブを取得"""
+        with Session(self.read_engine) as session:
+            return session.get(SyncJob, job_id)
+
+    async def run(self, job_id: int):
+        """ジョブを専用セッションで実行し、結果を記録する"""
+        job = await run_write(self._update, job_id, status="running", started_at=datetime.now())
+
+        scraper = None
+        started = time.perf_counter()
+
+        def on_result(result: Dict):
+            # レースごとに進捗を記録（同期処理のセッションとは別のセッションで書き込む）
+            self._update(job_id, **self._stats_values(scraper.stats))
+
+        with Session(self.engine) as session:
+            try:
+                scraper = self.scraper_factory(session)
+                result = await scraper.sync_race_data(job.target_date, job.force, on_result=on_result)
+                status, message = result["status"], result["message"]
+            except Exception as e:
+                logger.error(f"同期ジョブ {job_id} エラー: {str(e)}", exc_info=True)
+                status, message = "failed", str(e)
+
+        elapsed = time.perf_counter() - started
+        stats = self._stats_values(scraper.stats if scraper else SyncStats())
+        await run_write(
+            self._update, job_id,
+            status=status,
+            message=message,
+            finished_at=datetime.now(),
+            elapsed_seconds=round(elapsed, 3),
+            races_per_second=round(stats["races_done"] / elapsed, 3) if elapsed > 0 else None,
+            **stats
+        )
+
+    def _update(self, job_id: int, **values) -> SyncJob:
+        """ジョブの列を更新して返す（書き込み用スレッドで呼び出す）"""
+        with Session(self.engine) as session:
+            job = session.get(SyncJob, job_id)
+            for key, value in values.items():
+                setattr(job, key, value)
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+            return job
+
+    def _stats_values(self, stats: SyncStats) -> Dict:
+        return {
+            "races_total": stats.races_total,
+            "races_done": stats.races_done,
+            "races_failed": stats.races_failed,
+            "races_unchanged": stats.races_unchanged,
+            "fetch_seconds": round(stats.fetch_seconds, 3),
+            "parse_seconds": round(stats.parse_seconds, 3),
+            "write_seconds": round(stats.write_seconds, 3),
+        }
+
+    def fail_interrupted(self) -> int:
+        """前回のプロセス終了時に実行中だったジョブを失敗として記録する"""
+        with Session(self.engine) as session:
+            jobs = session.exec(select(SyncJob).where(SyncJob.status.in_(ACTIVE_STATUSES))).all()
+            for job in jobs:
+                job.status = "failed"
+                job.message = "サーバーの停止により中断されました"
+                job.finished_at = datetime.now()
+            session.add_all(jobs)
+            session.commit()
+            return len(jobs)
+
+
+_manager: Optional[SyncJobManager] = None
+
+
+def get_sync_job_manager() -> SyncJobManager:
+    """プロセス共有のジョブマネージャーを取得"""
+    global _manager
+    if _manager is None:
+        _manager = SyncJobManager()
+    return _manager
@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Type
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, SQLModel
+
+# 1文あたりのバインド変数の上限（古いSQLiteの上限999に収める）
+MAX_BIND_PARAMS = 900
+
+_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def upsert(
+    session: Session,
+    model: Type[SQLModel],
+    rows: List[Dict],
+    conflict_columns: Sequence[str],
+    keep_existing: Iterable[str] = (),
+    now: Optional[datetime] = None,
+):
+    """
+    一意インデックスを競合対象として行をまとめて登録/更新する（INSERT ... ON CONFLICT DO UPDATE）
+
+    既存行は rows に含まれる列のみを更新する。keep_existing の列は新しい値がNoneの場合に
+    既存の値を残す。created_at は登録時のみ、updated_at は登録・更新の両方で設定する。
+    ORMのオブジェクトは更新しないため、呼び出し後に参照する場合は読み直すこと。
+    """
+    if not rows:
+        return
+
+    dialect = session.get_bind().dialect.name
+    if dialect not in _INSERTS:
+        raise ValueError(f"一括登録/更新に未対応のデータベースです: {dialect}")
+
+    now = now or datetime.now()
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    values = [
+        {**{column: row.get(column) for column in columns}, "created_at": now, "updated_at": now}
+        for row in rows
+    ]
+
+    table = model.__table__
+    chunk_size = max(1, MAX_BIND_PARAMS // (len(columns) + 2))
+    for offset in range(0, len(values), chunk_size):
+        statement = _INSERTS[dialect](table).values(values[offset:offset + chunk_size])
+        updates = {
+            column: (
+                func.coalesce(statement.excluded[column], table.c[column])
+                if column in keep_existing else statement.excluded[column]
+            )
+            for column in columns
+            if column not in conflict_columns
+        }
+        updates["updated_at"] = statement.excluded.updated_at
+        session.execute(
+            statement.on_conflict_do_update(index_elements=list(conflict_columns), set_=updates)
+        )
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+"""
+API負荷テストスクリプト
+レース一覧・レース詳細・コメント一覧のGETリクエストを多数のクライアントから同時に発行し、
+async def のルート（非同期エンジン・AsyncSession）と、従来の def のルート
+（同期のSession・Starletteのスレッドプールで実行）の処理件数と応答時間を比較します。
+どちらも一時ファイル上の同じSQLiteデータベースを読み取ります。
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import logging
+import argparse
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+
+# appパッケージを読み込めるようにバックエンドディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# データベースはアプリケーションの読み込み前に一時ファイルに切り替える
+_db_dir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir.name}/load_test.db"
+os.environ.setdefault("HTTP_CACHE_ENABLED", "false")
+os.environ.setdefault("PAGE_ARCHIVE_ENABLED", "false")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from fastapi import Depends, FastAPI, HTTPException, Query  # noqa: E402
+from sqlmodel import Session, select  # noqa: E402
+
+from app.api.routes import comments, races  # noqa: E402
+from app.db import engine, get_read_session, migrate_db  # noqa: E402
+from app.models import Comment, Horse, Race  # noqa: E402
+from app.services.scraper import JRAScraper  # noqa: E402
+from save_benchmark import make_odds, make_race_detail  # noqa: E402
+from sync_benchmark import percentile  # noqa: E402
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('api_load_test')
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+
+def threadpool_app() -> FastAPI:
+    """従来の def のルート（同期のSessionをスレッドプールで使用）"""
+    app = FastAPI()
+
+    @app.get("/races/")
+    def get_races(
+        session: Session = Depends(get_read_session),
+        race_date: Optional[date] = Query(None),
+    ):
+        query = select(Race)
+        if race_date:
+            query = query.where(Race.race_date == race_date)
+        return session.exec(query.order_by(Race.race_date, Race.race_number)).all()
+
+    @app.get("/races/{race_id}")
+    def get_race_detail(race_id: int, session: Session = Depends(get_read_session)):
+        race = session.get(Race, race_id)
+        if not race:
+            raise HTTPException(status_code=404, detail="Race not found")
+        horses = session.exec(
+            select(Horse).where(Horse.race_id == race_id).order_by(Horse.horse_number)
+        ).all()
+        return {"race": race, "horses": horses}
+
+    @app.get("/comments/")
+    def get_comments(
+        session: Session = Depends(get_read_session),
+        race_id: Optional[int] = Query(None),
+    ):
+        query = select(Comment)
+        if race_id:
+            query = query.where(Comment.race_id == race_id)
+        return session.exec(query.order_by(Comment.created_at.desc())).all()
+
+    return app
+
+
+def async_app() -> FastAPI:
+    """async def のルート（本番と同じルーター）"""
+    app = FastAPI()
+    app.include_router(races.router)
+    app.include_router(comments.router)
+    return app
+
+
+def seed(race_count, horses):
+    """読み取り対象のレース・出走馬・コメントを登録"""
+    migrate_db()
+    odds = make_odds(horses)
+    with Session(engine) as session:
+        save = JRAScraper(session, fetch_past_races=False)._save_race_data
+        race_dates = set()
+        for index in range(race_count):
+            race_detail = make_race_detail(index, horses)
+            race_dates.add(race_detail["race_date"])
+            race = save(race_detail, odds)
+            horse_ids = session.exec(select(Horse.id).where(Horse.race_id == race.id)).all()
+            session.add_all([
+                Comment(race_id=race.id, horse_id=horse_id, content="負荷テスト", is_public=True)
+                for horse_id in horse_ids[:3]
+            ])
+        session.commit()
+    return sorted(race_dates)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class BackgroundServer:
+    """uvicornを別スレッドで起動する"""
+
+    def __init__(self, app: FastAPI):
+        self.port = free_port()
+        self.server = uvicorn.Server(uvicorn.Config(
+            app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="off"
+        ))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def load(base_url, paths: List[str], clients, seconds):
+    """clients 個のクライアントが seconds 秒間リクエストを発行し続ける"""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def run_client():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(random.choice(paths))
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(run_client() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'latency_p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'latency_p95_ms': round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'latency_p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='async def と def のルートのAPI負荷テスト')
+    parser.add_argument('--clients', type=int, default=200, help='同時に接続するクライアント数')
+    parser.add_argument('--seconds', type=float, default=15.0, help='構成ごとの測定時間（秒）')
+    parser.add_argument('--races', type=int, default=360, help='登録するレース数')
+    parser.add_argument('--horses', type=int, default=16, help='1レースあたりの出走頭数')
+    parser.add_argument('--output', help='結果を保存するJSONファイルのパス')
+
+    args = parser.parse_args()
+
+    race_dates = seed(args.races, args.horses)
+    paths = (
+        [f"/races/?race_date={d.isoformat()}" for d in race_dates]
+        + [f"/races/{race_id}" for race_id in range(1, args.races + 1)]
+        + [f"/comments/?race_id={race_id}" for race_id in range(1, args.races + 1)]
+    )
+    logger.info(f"{args.races}レースを登録し、{args.clients}クライアントで負荷をかけます")
+
+    report = {
+        'configuration': {
+            'clients': args.clients, 'seconds': args.seconds,
+            'races': args.races, 'horses_per_race': args.horses
+        },
+    }
+    for name, make_app in (('threadpool', threadpool_app), ('async', async_app)):
+        with BackgroundServer(make_app()) as server:
+            report[name] = asyncio.run(load(server.base_url, paths, args.clients, args.seconds))
+
+    for name in ('threadpool', 'async'):
+        result = report[name]
+        print(f"{name:<10} req/sec: {result['requests_per_second']:>8}  "
+              f"p50: {result['latency_p50_ms']}ms  p95: {result['latency_p95_ms']}ms  "
+              f"p99: {result['latency_p99_ms']}ms  errors: {result['errors']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"結果を保存しました: {args.output}")
+
+    _db_dir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+バックフィルスクリプト
+指定期間のレースデータをJRAから同期します。中断した場合は再実行すると続きから再開します。
+--workers に2以上を指定すると、日付を複数プロセスに振り分けて取得・パースします。
+"""
+
+import sys
+import json
+import asyncio
+import logging
+import argparse
+from datetime import date
+from pathlib import Path
+
+# appパッケージを読み込めるようにバックエンドディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlmodel import Session  # noqa: E402
+
+from app.db import engine, migrate_db  # noqa: E402
+from app.services.backfill import BackfillRunner  # noqa: E402
+from app.services.db_writer import shutdown_db_writer  # noqa: E402
+from app.services.parallel_sync import ParallelBackfillRunner  # noqa: E402
+from app.services.http_client import close_http_client, open_http_client  # noqa: E402
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('backfill')
+
+
+async def run_backfill(start_date, end_date, force, workers):
+    """接続プールを開いた状態でバックフィルを実行"""
+    await open_http_client()
+    try:
+        with Session(engine) as session:
+            if workers > 1:
+                runner = ParallelBackfillRunner(session, workers=workers)
+            else:
+                runner = BackfillRunner(session)
+            return await runner.run(start_date, end_date, force)
+    finally:
+        await close_http_client()
+        shutdown_db_writer()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='指定期間のレースデータを同期する')
+    parser.add_argument('start_date', type=date.fromisoformat, help='同期開始日（YYYY-MM-DD形式）')
+    parser.add_argument('end_date', type=date.fromisoformat, help='同期終了日（YYYY-MM-DD形式）')
+    parser.add_argument('--force', action='store_true', help='チェックポイントを破棄して再同期する')
+    parser.add_argument('--workers', type=int, default=1, help='取得・パースを行うプロセス数')
+    parser.add_argument('--output', help='結果を保存するJSONファイルのパス')
+
+    args = parser.parse_args()
+
+    if args.end_date < args.start_date:
+        parser.error('終了日は開始日以降を指定してください')
+
+    migrate_db()
+
+    result = asyncio.run(run_backfill(args.start_date, args.end_date, args.force, args.workers))
+
+    logger.info(result["message"])
+    if "throughput" in result:
+        logger.info(f"処理速度: {result['throughput']['races_per_second']} races/sec "
+                    f"（{result['throughput']['workers']}プロセス）")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        logger.info(f"結果を保存しました: {args.output}")
+
+    return 0 if result["status"] == "success" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
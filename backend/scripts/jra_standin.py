@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+"""
+JRAスタンドインサーバー
+記録済みのレース一覧・結果・オッズページをローカルで配信します。応答遅延とエラーを
+注入できるため、jra.go.jp にアクセスせずに同期処理の動作確認や性能測定を行えます。
+
+ページは次のいずれかで用意します。
+  - --cache: 同期時に保存されたHTTPキャッシュ（http_cache.db）
+  - --recording: save_recording() で保存したディレクトリ（manifest.json とページ本文）
+  - 指定なし: --days / --venues / --races / --horses の規模で生成したページ
+
+スクレイパーの接続先は環境変数 JRA_BASE_URL で切り替えます。
+  JRA_BASE_URL=http://127.0.0.1:8001 uvicorn app.main:app
+"""
+
+import sys
+import json
+import time
+import random
+import sqlite3
+import logging
+import argparse
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('jra_standin')
+
+RESULT_HEADER = "<tr>" + "".join(
+    f"<th>{label}</th>" for label in
+    ["着順", "馬番", "枠", "馬名", "性齢", "斤量", "騎手", "タイム", "馬体重", "着差", "調教師", "通過"]
+) + "</tr>"
+
+VENUES = ["東京", "中山", "京都", "阪神", "中京", "新潟", "福島", "小倉", "札幌", "函館"]
+
+
+def page_key(url):
+    """URLからパスとクエリ文字列を取り出す（ホストは問わない）"""
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+def load_recording_cache(cache_path):
+    """HTTPキャッシュからページを読み込む"""
+    pages = {}
+    conn = sqlite3.connect(cache_path)
+    try:
+        for url, body in conn.execute("SELECT url, body FROM http_cache"):
+            pages[page_key(url)] = body
+    finally:
+        conn.close()
+    return pages
+
+
+def load_recording_dir(recording_dir):
+    """保存済みのディレクトリからページを読み込む"""
+    recording_dir = Path(recording_dir)
+    manifest = json.loads((recording_dir / "manifest.json").read_text(encoding="utf-8"))
+    return {
+        key: (recording_dir / filename).read_text(encoding="utf-8")
+        for key, filename in manifest.items()
+    }
+
+
+def save_recording(pages, recording_dir):
+    """ページをディレクトリに保存（manifest.json にURLとファイル名の対応を記録）"""
+    recording_dir = Path(recording_dir)
+    recording_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {}
+    for index, (key, body) in enumerate(sorted(pages.items())):
+        filename = f"{index:06d}.html"
+        (recording_dir / filename).write_text(body, encoding="utf-8")
+        manifest[key] = filename
+    (recording_dir / "manifest.json").write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+
+
+def synthetic_race_list(race_date, venues, races_per_venue):
+    tables = []
+    for venue_index, venue in enumerate(venues):
+        rows = "".join(
+            f'<tr class="race_data"><td class="race_num">{number}R</td>'
+            f'<td><a href="race/result.html?race_id={race_date:%Y%m%d}{venue_index + 1:02d}{number:02d}">'
+            f'レース詳細</a></td></tr>'
+            for number in range(1, races_per_venue + 1)
+        )
+        tables.append(
+            f'<div class="race_table"><div class="race_place">{venue}</div><table>{rows}</table></div>'
+        )
+    return f"<html><body>{''.join(tables)}</body></html>"
+
+
+def synthetic_payouts(finish, rng):
+    """着順（馬番のリスト）から払戻金テーブルを生成"""
+    first, second, third = finish[:3]
+    combinations = [
+        ("単勝", [str(first)]),
+        ("複勝", [str(first), str(second), str(third)]),
+        ("馬連", [f"{min(first, second)} - {max(first, second)}"]),
+        ("ワイド", [" - ".join(str(n) for n in sorted(pair))
+                  for pair in ((first, second), (first, third), (second, third))]),
+        ("馬単", [f"{first} → {second}"]),
+        ("三連複", [" - ".join(str(n) for n in sorted((first, second, third)))]),
+        ("三連単", [f"{first} → {second} → {third}"]),
+    ]
+    rows = []
+    for bet_type, numbers_list in combinations:
+        for index, numbers in enumerate(numbers_list):
+            header = f'<th rowspan="{len(numbers_list)}">{bet_type}</th>' if index == 0 else ""
+            rows.append(
+                f"<tr>{header}<td>{numbers}</td><td>{rng.randint(11, 5000) * 10:,}円</td>"
+                f"<td>{rng.randint(1, 50)}人気</td></tr>"
+            )
+    return f'<table class="pay_table_01">{"".join(rows)}</table>'
+
+
+def synthetic_result(race_id, race_number, horses, rng):
+    rows = []
+    finish = rng.sample(range(1, horses + 1), horses)
+    for order, horse_number in enumerate(finish, start=1):
+        seconds = 94.0 + order * 0.2 + rng.random() * 0.1
+        rows.append(
+            f"<tr><td>{order}</td><td>{horse_number}</td><td>{(horse_number + 1) // 2}</td>"
+            f'<td><a href="/horse/index.html?horse_id={race_id[:4]}{race_id[-6:]}{horse_number:02d}">'
+            f"馬{race_id[-6:]}-{horse_number}</a></td>"
+            f"<td>牡3</td><td>57.0</td><td><a href=\"#\">騎手{horse_number}</a></td>"
+            f"<td>{int(seconds // 60)}:{seconds % 60:04.1f}</td>"
+            f"<td>{rng.randint(420, 540)}(+{rng.randint(0, 8)})</td>"
+            f"<td>{'' if order == 1 else rng.choice(['クビ', 'ハナ', '1/2', '1', '2'])}</td>"
+            f"<td><a href=\"#\">調教師{horse_number}</a></td>"
+            f"<td>{rng.randint(1, horses)}-{rng.randint(1, horses)}</td></tr>"
+        )
+    return (
+        f'<html><body><div class="race_name">テストレース{race_number}</div>'
+        f'<div class="race_condition">芝1600m 未勝利 天候:晴 馬場:良</div>'
+        f'<div class="race_time">{9 + race_number // 2}:{(race_number % 2) * 30:02d}</div>'
+        f'<table class="race_table_01">{RESULT_HEADER}{"".join(rows)}</table>'
+        f'{synthetic_payouts(finish, rng) if horses >= 3 else ""}</body></html>'
+    )
+
+
+def synthetic_odds(horses, rng):
+    rows = "".join(
+        f"<tr><td>{number}</td><td>馬{number}</td><td>{rng.uniform(1.5, 150):.1f}</td></tr>"
+        for number in range(1, horses + 1)
+    )
+    return f'<html><body><table class="odds_table_01"><tr><th>馬番</th></tr>{rows}</table></body></html>'
+
+
+def synthetic_recording(start_date, days, venues=3, races_per_venue=12, horses=16, seed=0):
+    """同期対象の日付ごとに、レース一覧・結果・オッズページを生成"""
+    rng = random.Random(seed)
+    pages = {}
+    for offset in range(days):
+        race_date = start_date + timedelta(days=offset)
+        day_venues = VENUES[:venues]
+        pages[f"/race_list.html?kaisai_date={race_date:%Y%m%d}"] = synthetic_race_list(
+            race_date, day_venues, races_per_venue
+        )
+        for venue_index in range(len(day_venues)):
+            for number in range(1, races_per_venue + 1):
+                race_id = f"{race_date:%Y%m%d}{venue_index + 1:02d}{number:02d}"
+                pages[f"/race/result.html?race_id={race_id}"] = synthetic_result(race_id, number, horses, rng)
+                pages[f"/odds/index.html?race_id={race_id}"] = synthetic_odds(horses, rng)
+    return pages
+
+
+class StandinServer:
+    """記録済みページを配信するHTTPサーバー（別スレッドで動作）"""
+
+    def __init__(self, pages, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 error_rate=0.0, error_status=503, seed=None):
+        """
+        :param pages: {パス?クエリ: 本文}
+        :param latency: 応答までの基準遅延（秒）
+        :param jitter: 遅延のばらつき（0〜jitter 秒を加算）
+        :param error_rate: エラー応答を返す確率
+        :param error_status: 注入するエラーのステータスコード
+        """
+        self.pages = pages
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                status, body = server.respond(self.path)
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+    def respond(self, path):
+        """遅延とエラーを注入して応答内容を決定"""
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            inject_error = self._rng.random() < self.error_rate
+            if inject_error:
+                self.errors += 1
+
+        if delay > 0:
+            time.sleep(delay)
+        if inject_error:
+            return self.error_status, "injected error"
+
+        body = self.pages.get(path)
+        if body is None:
+            return 404, "not found"
+        return 200, body
+
+    def serve_forever(self):
+        """現在のスレッドで配信を続ける"""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def start(self):
+        """別スレッドで配信を開始"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_page_source_arguments(parser):
+    """ページの読み込み元の引数（sync_benchmark.py と共通）"""
+    parser.add_argument('--cache', help='HTTPキャッシュ（http_cache.db）のパス')
+    parser.add_argument('--recording', help='保存済みページのディレクトリ')
+    parser.add_argument('--start-date', type=date.fromisoformat, default=date(2023, 5, 1),
+                        help='生成するページの開始日（YYYY-MM-DD形式）')
+    parser.add_argument('--days', type=int, default=1, help='生成するページの日数')
+    parser.add_argument('--venues', type=int, default=3, help='1日あたりの開催場数')
+    parser.add_argument('--races', type=int, default=12, help='1開催場あたりのレース数')
+    parser.add_argument('--horses', type=int, default=16, help='1レースあたりの出走頭数')
+
+
+def load_pages(args):
+    """引数に応じてページを読み込む（指定がなければ生成する）"""
+    if args.cache:
+        return load_recording_cache(args.cache)
+    if args.recording:
+        return load_recording_dir(args.recording)
+    return synthetic_recording(args.start_date, args.days, args.venues, args.races, args.horses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JRAスタンドインサーバー')
+    add_page_source_arguments(parser)
+    parser.add_argument('--host', default='127.0.0.1', help='待ち受けるアドレス')
+    parser.add_argument('--port', type=int, default=8001, help='待ち受けるポート')
+    parser.add_argument('--latency', type=float, default=0.0, help='応答の基準遅延（秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='遅延のばらつき（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='エラー応答の割合（0〜1）')
+    parser.add_argument('--error-status', type=int, default=503, help='エラー応答のステータスコード')
+    parser.add_argument('--save', help='読み込んだページを保存するディレクトリ')
+
+    args = parser.parse_args()
+    pages = load_pages(args)
+
+    if args.save:
+        save_recording(pages, args.save)
+        logger.info(f"{len(pages)}ページを保存しました: {args.save}")
+        return 0
+
+    server = StandinServer(
+        pages, args.host, args.port, args.latency, args.jitter, args.error_rate, args.error_status
+    )
+    logger.info(f"{len(pages)}ページを {server.base_url} で配信します")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+マイグレーションスクリプト
+データベースに未適用のマイグレーションを適用します（サーバーの起動時にも自動で適用されます）。
+--status を指定すると適用せずに現在のバージョンと未適用のマイグレーションを表示します。
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+# appパッケージを読み込めるようにバックエンドディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.db import engine  # noqa: E402
+from app.migrations import (  # noqa: E402
+    MigrationError, current_version, pending_migrations, run_migrations
+)
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('migrate')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='データベースのマイグレーションを適用する')
+    parser.add_argument('--status', action='store_true', help='適用せずに状態を表示する')
+    parser.add_argument('--target', type=int, help='このバージョンまで適用する')
+
+    args = parser.parse_args()
+
+    if args.status:
+        logger.info(f"現在のバージョン: {current_version(engine)}")
+        for migration in pending_migrations(engine):
+            logger.info(f"未適用: {migration.version} {migration.description}")
+        return 0
+
+    try:
+        applied = run_migrations(engine, target=args.target)
+    except MigrationError as e:
+        logger.error(str(e))
+        return 1
+
+    if applied:
+        logger.info(f"{len(applied)}件のマイグレーションを適用しました（バージョン: {applied[-1]}）")
+    else:
+        logger.info("適用するマイグレーションはありません")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+オッズポーリングスクリプト
+レース当日に発走前のレースのオッズを定期的に更新します。発走が近いレースほど短い間隔で
+取得し、すべてのレースが発走すると終了します。
+"""
+
+import sys
+import asyncio
+import logging
+import argparse
+from datetime import date
+from pathlib import Path
+
+# appパッケージを読み込めるようにバックエンドディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlmodel import Session  # noqa: E402
+
+from app.db import engine  # noqa: E402
+from app.services.db_writer import shutdown_db_writer  # noqa: E402
+from app.services.http_client import close_http_client, open_http_client  # noqa: E402
+from app.services.odds_poller import OddsPoller  # noqa: E402
+from app.services.scraper import jra_now  # noqa: E402
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('odds_poller')
+
+
+async def run_poller(target_date):
+    """接続プールを開いた状態でポーリングを実行"""
+    await open_http_client()
+    try:
+        with Session(engine) as session:
+            await OddsPoller(session).run(target_date)
+    finally:
+        await close_http_client()
+        # 投入済みの書き込みを完了させてから書き込み用スレッドを停止
+        shutdown_db_writer()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='発走前レースのオッズを定期的に更新する')
+    parser.add_argument('--date', type=date.fromisoformat, default=jra_now().date(),
+                        help='対象日（YYYY-MM-DD形式、省略時は日本時間の当日）')
+
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run_poller(args.date))
+    except KeyboardInterrupt:
+        logger.info("ポーリングを中断しました")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+HTMLパーサーベンチマークスクリプト
+保存済みのJRAページに対してパーサーバックエンドごとの処理速度（pages/sec）を測定し、
+すべてのバックエンドが同一の抽出結果を返すことを確認します。
+
+コーパスは次のいずれかで指定します。
+  - ディレクトリ: <corpus>/race_list/*.html, <corpus>/result/*.html, <corpus>/odds/*.html
+  - --cache: 同期時に保存されたHTTPキャッシュ（http_cache.db）
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import logging
+import argparse
+from datetime import date
+from pathlib import Path
+
+# appパッケージを読み込めるようにバックエンドディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services import parsers  # noqa: E402
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('parser_benchmark')
+
+PAGE_TYPES = ("race_list", "result", "odds")
+
+# 結果ページのパースに必要なレース情報（抽出結果の比較のみが目的のため固定値）
+DUMMY_RACE_ARGS = ("000000000000", "", 0, date(2000, 1, 1))
+
+
+def load_corpus_dir(corpus_dir):
+    """ディレクトリからページを読み込む"""
+    corpus = {page_type: [] for page_type in PAGE_TYPES}
+    for page_type in PAGE_TYPES:
+        for path in sorted(Path(corpus_dir, page_type).glob("*.html")):
+            corpus[page_type].append(path.read_text(encoding="utf-8"))
+    return corpus
+
+
+def load_corpus_cache(cache_path):
+    """HTTPキャッシュからページを読み込む"""
+    corpus = {page_type: [] for page_type in PAGE_TYPES}
+    conn = sqlite3.connect(cache_path)
+    try:
+        for page_type, body in conn.execute("SELECT page_type, body FROM http_cache ORDER BY url"):
+            if page_type in corpus:
+                corpus[page_type].append(body)
+    finally:
+        conn.close()
+    return corpus
+
+
+def parse_page(page_type, html, backend):
+    """ページ種別に応じたパース関数を実行"""
+    if page_type == "race_list":
+        return parsers.parse_races_list(html, backend)
+    if page_type == "result":
+        return parsers.parse_race_detail(html, *DUMMY_RACE_ARGS, backend=backend)
+    return parsers.parse_odds(html, backend)
+
+
+def run_benchmark(corpus, backends, repeat=3):
+    """バックエンドごとの処理速度と抽出結果の一致を確認"""
+    report = {'backends': {}, 'mismatches': []}
+
+    # 基準となる抽出結果（現行の html.parser）
+    reference = {
+        page_type: [parse_page(page_type, html, "html.parser") for html in pages]
+        for page_type, pages in corpus.items()
+    }
+
+    for backend in backends:
+        backend_report = {}
+        for page_type, pages in corpus.items():
+            if not pages:
+                continue
+
+            outputs = [parse_page(page_type, html, backend) for html in pages]
+            for index, (output, expected) in enumerate(zip(outputs, reference[page_type])):
+                if output != expected:
+                    report['mismatches'].append({
+                        'backend': backend, 'page_type': page_type, 'index': index
+                    })
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for html in pages:
+                    parse_page(page_type, html, backend)
+            elapsed = time.perf_counter() - start
+
+            backend_report[page_type] = {
+                'pages': len(pages),
+                'pages_per_second': round(len(pages) * repeat / elapsed, 1) if elapsed > 0 else None
+            }
+
+        report['backends'][backend] = backend_report
+
+    return report
+
+
+def print_report(report):
+    """結果を表形式で表示"""
+    print(f"{'backend':<12} {'page_type':<10} {'pages':>6} {'pages/sec':>10}")
+    for backend, results in report['backends'].items():
+        for page_type, result in results.items():
+            print(f"{backend:<12} {page_type:<10} {result['pages']:>6} {result['pages_per_second']:>10}")
+
+    if report['mismatches']:
+        print(f"\n抽出結果の不一致: {len(report['mismatches'])}件")
+        for mismatch in report['mismatches']:
+            print(f"  {mismatch['backend']} {mismatch['page_type']} #{mismatch['index']}")
+    else:
+        print("\nすべてのバックエンドで抽出結果が一致しました")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTMLパーサーバックエンドのベンチマーク')
+    parser.add_argument('corpus', nargs='?', help='保存済みページのディレクトリ')
+    parser.add_argument('--cache', help='HTTPキャッシュ（http_cache.db）のパス')
+    parser.add_argument('--backend', action='append', help='測定するバックエンド（複数指定可）')
+    parser.add_argument('--repeat', type=int, default=3, help='各ページのパース回数')
+    parser.add_argument('--output', help='結果を保存するJSONファイルのパス')
+
+    args = parser.parse_args()
+
+    if not args.corpus and not args.cache:
+        parser.error('コーパスディレクトリまたは --cache を指定してください')
+
+    corpus = load_corpus_cache(args.cache) if args.cache else load_corpus_dir(args.corpus)
+    total = sum(len(pages) for pages in corpus.values())
+    if total == 0:
+        logger.error('ページが見つかりませんでした')
+        return 1
+
+    backends = args.backend or parsers.available_backends()
+    logger.info(f"{total}ページで{', '.join(backends)}を測定します")
+
+    report = run_benchmark(corpus, backends, args.repeat)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"結果を保存しました: {args.output}")
+
+    return 1 if report['mismatches'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+読み取りレイテンシベンチマークスクリプト
+同期処理と同じ保存処理（JRAScraper._save_race_data）でレースを書き込み続けながら、
+複数スレッドからGETリクエストと同じ読み取りクエリを発行し、その応答時間を測定します。
+従来の構成（SQLiteの既定の設定・読み書き共通のエンジン）と、WALの構成
+（調整済みのPRAGMA・読み取り専用の接続プールと書き込み用のエンジン）を比較します。
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+# appパッケージを読み込めるようにバックエンドディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# 通信は行わないためHTTPキャッシュとページアーカイブは使用しない
+os.environ.setdefault("HTTP_CACHE_ENABLED", "false")
+os.environ.setdefault("PAGE_ARCHIVE_ENABLED", "false")
+
+from sqlmodel import Session, SQLModel, create_engine, select  # noqa: E402
+
+from app.db import create_db_engine  # noqa: E402
+from app.models import Horse, Race  # noqa: E402
+from app.services.scraper import JRAScraper  # noqa: E402
+from save_benchmark import make_odds, make_race_detail  # noqa: E402
+from sync_benchmark import percentile  # noqa: E402
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('read_latency_benchmark')
+
+
+def create_engines(url, setup):
+    """構成ごとの (書き込み用, 読み取り用) エンジン"""
+    if setup == "before":
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        return engine, engine
+    return create_db_engine(url, profile="wal"), create_db_engine(url, profile="wal", readonly=True)
+
+
+def read_race(session, race_dates, race_count):
+    """GET /races と GET /races/{race_id} と同じクエリを発行"""
+    session.exec(select(Race).where(Race.race_date == random.choice(race_dates))
+                 .order_by(Race.race_date, Race.race_number)).all()
+    race_id = random.randint(1, race_count)
+    session.get(Race, race_id)
+    session.exec(select(Horse).where(Horse.race_id == race_id).order_by(Horse.horse_number)).all()
+
+
+def measure(setup, args, db_dir):
+    """書き込みを続けながら読み取りの応答時間を測定"""
+    writer, reader = create_engines(f"sqlite:///{db_dir}/{setup}.db", setup)
+    SQLModel.metadata.create_all(writer)
+    odds = make_odds(args.horses)
+
+    # 読み取り対象のレースを先に登録しておく
+    with Session(writer) as session:
+        save = JRAScraper(session, fetch_past_races=False)._save_race_data
+        seeded = [make_race_detail(i, args.horses) for i in range(args.seed_races)]
+        for race_detail in seeded:
+            save(race_detail, odds)
+    race_dates = sorted({r["race_date"] for r in seeded})
+
+    stop = threading.Event()
+    latencies = []
+    latency_lock = threading.Lock()
+    written = [0]
+
+    def write_loop():
+        with Session(writer) as session:
+            save = JRAScraper(session, fetch_past_races=False)._save_race_data
+            index = args.seed_races
+            while not stop.is_set():
+                save(make_race_detail(index, args.horses), odds)
+                written[0] += 1
+                index += 1
+
+    def read_loop():
+        local = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            with Session(reader) as session:
+                read_race(session, race_dates, args.seed_races)
+            local.append(time.perf_counter() - started)
+        with latency_lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=write_loop)] if args.sync else []
+    threads += [threading.Thread(target=read_loop) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    writer.dispose()
+    reader.dispose()
+    return {
+        'reads': len(latencies),
+        'reads_per_second': round(len(latencies) / args.seconds, 1),
+        'races_written': written[0],
+        'read_latency_p50_ms': round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'read_latency_p95_ms': round(percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'read_latency_p99_ms': round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        'read_latency_max_ms': round(max(latencies) * 1000, 2) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='同期中の読み取りレイテンシのベンチマーク')
+    parser.add_argument('--seconds', type=float, default=10.0, help='構成ごとの測定時間（秒）')
+    parser.add_argument('--readers', type=int, default=8, help='読み取りを行うスレッド数')
+    parser.add_argument('--seed-races', type=int, default=360, help='事前に登録するレース数')
+    parser.add_argument('--horses', type=int, default=16, help='1レースあたりの出走頭数')
+    parser.add_argument('--no-sync', dest='sync', action='store_false', help='書き込みを行わずに測定する')
+    parser.add_argument('--output', help='結果を保存するJSONファイルのパス')
+
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        report = {
+            'configuration': {
+                'seconds': args.seconds, 'readers': args.readers, 'seed_races': args.seed_races,
+                'horses_per_race': args.horses, 'sync': args.sync
+            },
+            'before': measure('before', args, db_dir),
+            'after': measure('after', args, db_dir),
+        }
+
+    for setup in ('before', 'after'):
+        result = report[setup]
+        print(f"{setup:<6} reads/sec: {result['reads_per_second']:>8}  "
+              f"p50: {result['read_latency_p50_ms']}ms  p95: {result['read_latency_p95_ms']}ms  "
+              f"p99: {result['read_latency_p99_ms']}ms  max: {result['read_latency_max_ms']}ms  "
+              f"races written: {result['races_written']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"結果を保存しました: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
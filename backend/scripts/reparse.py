@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+"""
+再パーススクリプト
+アーカイブ済みの結果ページを現在のパーサーで再パースし、保存済みのレースと出走馬を更新します。
+JRAには接続しません。期間を省略するとアーカイブにあるすべてのレースが対象です。
+"""
+
+import sys
+import json
+import logging
+import argparse
+from datetime import date
+from pathlib import Path
+
+# appパッケージを読み込めるようにバックエンドディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlmodel import Session  # noqa: E402
+
+from app.config import PAGE_ARCHIVE_PATH, PARSE_WORKERS  # noqa: E402
+from app.db import engine, migrate_db  # noqa: E402
+from app.services.page_archive import PageArchive  # noqa: E402
+from app.services.reparse import Reparser  # noqa: E402
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('reparse')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='アーカイブ済みのページからレースデータを再パースする')
+    parser.add_argument('--start-date', type=date.fromisoformat, help='対象開始日（YYYY-MM-DD形式）')
+    parser.add_argument('--end-date', type=date.fromisoformat, help='対象終了日（YYYY-MM-DD形式）')
+    parser.add_argument('--archive', default=str(PAGE_ARCHIVE_PATH), help='ページアーカイブのパス')
+    parser.add_argument('--workers', type=int, default=PARSE_WORKERS, help='パースを行うプロセス数')
+    parser.add_argument('--output', help='結果を保存するJSONファイルのパス')
+
+    args = parser.parse_args()
+
+    if args.start_date and args.end_date and args.end_date < args.start_date:
+        parser.error('終了日は開始日以降を指定してください')
+    if not Path(args.archive).exists():
+        parser.error(f'ページアーカイブが見つかりません: {args.archive}')
+
+    migrate_db()
+
+    archive = PageArchive(Path(args.archive))
+    try:
+        with Session(engine) as session:
+            executor_kind = "process" if args.workers > 1 else "inline"
+            reparser = Reparser(session, archive, workers=args.workers, executor_kind=executor_kind)
+            result = reparser.run(args.start_date, args.end_date)
+    finally:
+        archive.close()
+
+    logger.info(result["message"])
+    logger.info(f"処理速度: {result['races_per_second']} races/sec（アーカイブなし: {result['missing']}レース）")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        logger.info(f"結果を保存しました: {args.output}")
+
+    return 0 if result["status"] == "success" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
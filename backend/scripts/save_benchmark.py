@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""
+レース保存ベンチマークスクリプト
+JRAScraper._save_race_data の一括書き込みと、従来の1行ごとにコミットする方式の
+書き込み速度（rows/sec）をファイル上のSQLiteデータベースで比較します。
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# appパッケージを読み込めるようにバックエンドディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# 通信は行わないためHTTPキャッシュとページアーカイブは使用しない
+os.environ.setdefault("HTTP_CACHE_ENABLED", "false")
+os.environ.setdefault("PAGE_ARCHIVE_ENABLED", "false")
+
+from sqlmodel import Session, SQLModel, create_engine, select  # noqa: E402
+
+from app.models import Horse, HorsePastRace, Race  # noqa: E402
+from app.services.scraper import JRAScraper  # noqa: E402
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('save_benchmark')
+
+
+def make_race_detail(index, horses_per_race):
+    """ベンチマーク用のレースデータを生成"""
+    race_date = date(2023, 1, 1) + timedelta(days=index // 36)
+    return {
+        "race_id": f"{race_date:%Y%m%d}{index:04d}",
+        "race_date": race_date,
+        "venue": "東京",
+        "race_number": index % 12 + 1,
+        "race_name": f"ベンチマーク{index}",
+        "race_class": "未勝利",
+        "course_type": "芝",
+        "distance": 1600,
+        "weather": "晴",
+        "track_condition": "良",
+        "start_time": datetime.combine(race_date, datetime.min.time()),
+        "horses": [
+            {
+                "horse_id": f"{index:06d}{number:04d}",
+                "horse_name": f"馬{index}-{number}",
+                "horse_number": number,
+                "jockey": "騎手",
+                "trainer": "調教師",
+                "weight": 480,
+                "past_races": [],
+            }
+            for number in range(1, horses_per_race + 1)
+        ],
+    }
+
+
+def make_odds(horses_per_race):
+    return {"win_odds": {number: 1.5 + number for number in range(1, horses_per_race + 1)}}
+
+
+def legacy_save_race_data(session, race_detail, odds_data):
+    """従来の保存処理（レースと馬ごとにSELECT・コミットする）"""
+    race_data = {k: v for k, v in race_detail.items() if k != "horses"}
+    race = session.exec(select(Race).where(Race.race_id == race_data["race_id"])).first()
+    if race:
+        for key, value in race_data.items():
+            setattr(race, key, value)
+    else:
+        race = Race(**race_data)
+        session.add(race)
+    session.commit()
+    session.refresh(race)
+
+    for horse_data in race_detail.get("horses", []):
+        horse_data = dict(horse_data)
+        past_races = horse_data.pop("past_races", [])
+        horse_data["race_id"] = race.id
+        horse = session.exec(
+            select(Horse).where(Horse.race_id == race.id, Horse.horse_id == horse_data["horse_id"])
+        ).first()
+        if horse:
+            for key, value in horse_data.items():
+                setattr(horse, key, value)
+        else:
+            horse = Horse(**horse_data)
+            session.add(horse)
+        session.commit()
+        session.refresh(horse)
+
+        win_odds = odds_data.get("win_odds", {}).get(horse.horse_number)
+        if win_odds:
+            horse.odds = win_odds
+            session.add(horse)
+        for past_race_data in past_races:
+            session.add(HorsePastRace(horse_id=horse.id, **past_race_data))
+        session.commit()
+
+
+def legacy_saver(session):
+    return lambda race_detail, odds_data: legacy_save_race_data(session, race_detail, odds_data)
+
+
+def bulk_saver(session):
+    """一括書き込みによる保存処理"""
+    return JRAScraper(session)._save_race_data
+
+
+def measure(name, make_saver, races, odds, db_dir):
+    """新規登録と再保存（更新）の速度を測定"""
+    engine = create_engine(f"sqlite:///{db_dir}/{name}.db")
+    SQLModel.metadata.create_all(engine)
+    rows = sum(1 + len(r["horses"]) for r in races)
+    result = {}
+
+    with Session(engine) as session:
+        save = make_saver(session)
+        for phase in ("insert", "update"):
+            start = time.perf_counter()
+            for race_detail in races:
+                save(race_detail, odds)
+            elapsed = time.perf_counter() - start
+            result[phase] = {
+                'rows': rows,
+                'seconds': round(elapsed, 3),
+                'rows_per_second': round(rows / elapsed, 1)
+            }
+
+    engine.dispose()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='レース保存処理のベンチマーク')
+    parser.add_argument('--races', type=int, default=36, help='保存するレース数')
+    parser.add_argument('--horses', type=int, default=18, help='1レースあたりの出走頭数')
+    parser.add_argument('--output', help='結果を保存するJSONファイルのパス')
+
+    args = parser.parse_args()
+
+    races = [make_race_detail(i, args.horses) for i in range(args.races)]
+    odds = make_odds(args.horses)
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        report = {
+            'races': args.races,
+            'horses_per_race': args.horses,
+            'legacy': measure('legacy', legacy_saver, races, odds, db_dir),
+            'bulk': measure('bulk', bulk_saver, races, odds, db_dir),
+        }
+
+    for phase in ("insert", "update"):
+        legacy = report['legacy'][phase]['rows_per_second']
+        bulk = report['bulk'][phase]['rows_per_second']
+        print(f"{phase:<7} legacy: {legacy:>10} rows/sec  bulk: {bulk:>10} rows/sec  "
+              f"({bulk / legacy:.1f}x)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"結果を保存しました: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
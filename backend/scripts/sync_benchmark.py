@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+"""
+同期ベンチマークスクリプト
+JRAスタンドインサーバー（jra_standin.py）を起動し、JRAScraper.sync_race_data を
+ファイル上のSQLiteデータベースに対してエンドツーエンドで実行します。
+処理速度（races/sec）、レースごとの所要時間（取得開始から保存完了まで）のp50/p95、
+段ごとの処理時間を報告します。
+--workers に2以上を指定すると ParallelBackfillRunner で複数プロセスに振り分けて同期し、
+プロセス数に対する処理速度の伸びを測定できます（この場合レースごとの所要時間は報告しません）。
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import tempfile
+import statistics
+from datetime import timedelta
+from pathlib import Path
+
+# appパッケージを読み込めるようにバックエンドディレクトリをパスに追加
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# 毎回通信して測定するためHTTPキャッシュとページアーカイブは使用せず、戦績ページも取得しない
+os.environ.setdefault("HTTP_CACHE_ENABLED", "false")
+os.environ.setdefault("PAGE_ARCHIVE_ENABLED", "false")
+os.environ.setdefault("PAST_RACES_ENABLED", "false")
+
+from sqlmodel import Session, SQLModel, create_engine  # noqa: E402
+
+from app.config import SYNC_CONCURRENCY  # noqa: E402
+from app.services.rate_limit import AdaptiveLimiter  # noqa: E402
+from app.services.retry import RetryPolicy  # noqa: E402
+from app.services.parallel_sync import ParallelBackfillRunner, WorkerOptions  # noqa: E402
+from app.services.scraper import JRAScraper  # noqa: E402
+from jra_standin import StandinServer, add_page_source_arguments, load_pages  # noqa: E402
+
+# ロギング設定
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('sync_benchmark')
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+
+def percentile(values, p):
+    """p パーセンタイル（線形補間）"""
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[p - 1]
+
+
+async def run_sync(engine, dates, base_url, args):
+    """指定日付を順に同期し、レースごとの所要時間と段ごとの処理時間を集計"""
+    limiter = AdaptiveLimiter(
+        rate=args.rate, max_rate=args.rate, burst=args.concurrency * 2,
+        concurrency=args.concurrency, max_concurrency=args.concurrency
+    )
+    retry_policy = RetryPolicy(base_delay=0.05, max_delay=1.0)
+    latencies = []
+    totals = {'races': 0, 'saved': 0, 'failed': 0, 'unchanged': 0,
+              'fetch_seconds': 0.0, 'parse_seconds': 0.0, 'write_seconds': 0.0}
+
+    with Session(engine) as session:
+        for target_date in dates:
+            scraper = JRAScraper(
+                session, concurrency=args.concurrency, cache=None, parser_backend=args.parser,
+                limiter=limiter, retry_policy=retry_policy, base_url=base_url
+            )
+
+            # 取得開始時刻を記録するため _fetch_race を包む
+            fetch_started = {}
+            fetch_race = scraper._fetch_race
+
+            async def timed_fetch_race(race_info, race_date, fetch_race=fetch_race, started=fetch_started):
+                started[race_info["race_id"]] = time.perf_counter()
+                return await fetch_race(race_info, race_date)
+
+            def on_result(result, started=fetch_started):
+                latencies.append(time.perf_counter() - started[result["race_id"]])
+
+            scraper._fetch_race = timed_fetch_race
+            await scraper.sync_race_data(target_date, force=True, on_result=on_result)
+
+            stats = scraper.stats
+            totals['races'] += stats.races_total
+            totals['saved'] += stats.races_done
+            totals['failed'] += stats.races_failed
+            totals['unchanged'] += stats.races_unchanged
+            totals['fetch_seconds'] += stats.fetch_seconds
+            totals['parse_seconds'] += stats.parse_seconds
+            totals['write_seconds'] += stats.write_seconds
+
+    return latencies, totals
+
+
+async def run_parallel_sync(engine, dates, base_url, args):
+    """指定日付を複数プロセスで同期し、段ごとの処理時間を集計（レースごとの所要時間は計測しない）"""
+    options = WorkerOptions(
+        base_url=base_url, rate=args.rate, max_rate=args.rate,
+        concurrency=args.concurrency, parser_backend=args.parser
+    )
+    with Session(engine) as session:
+        runner = ParallelBackfillRunner(session, workers=args.workers, options=options)
+        await runner.run(dates[0], dates[-1], force=True)
+
+    throughput = runner.throughput
+    totals = {
+        'races': throughput['races_saved'] + throughput['races_failed'],
+        'saved': throughput['races_saved'],
+        'failed': throughput['races_failed'],
+        'unchanged': 0,
+        'fetch_seconds': throughput['fetch_seconds'],
+        'parse_seconds': throughput['parse_seconds'],
+        'write_seconds': throughput['write_seconds'],
+    }
+    return [], totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='スタンドインサーバーに対する同期処理のベンチマーク')
+    add_page_source_arguments(parser)
+    parser.add_argument('--latency', type=float, default=0.02, help='応答の基準遅延（秒）')
+    parser.add_argument('--jitter', type=float, default=0.02, help='遅延のばらつき（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='エラー応答の割合（0〜1）')
+    parser.add_argument('--concurrency', type=int, default=SYNC_CONCURRENCY, help='同時に取得するレース数')
+    parser.add_argument('--rate', type=float, default=1000.0, help='リクエストレートの上限（リクエスト/秒）')
+    parser.add_argument('--parser', default='lxml', help='HTMLパーサーバックエンド')
+    parser.add_argument('--workers', type=int, default=1, help='取得・パースを行うプロセス数')
+    parser.add_argument('--output', help='結果を保存するJSONファイルのパス')
+
+    args = parser.parse_args()
+
+    pages = load_pages(args)
+    dates = [args.start_date + timedelta(days=offset) for offset in range(args.days)]
+
+    with tempfile.TemporaryDirectory() as db_dir, StandinServer(
+        pages, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=0
+    ) as server:
+        engine = create_engine(f"sqlite:///{db_dir}/benchmark.db")
+        SQLModel.metadata.create_all(engine)
+
+        logger.info(f"{server.base_url} で{len(pages)}ページを配信し、{len(dates)}日分を同期します")
+        start = time.perf_counter()
+        sync = run_parallel_sync if args.workers > 1 else run_sync
+        latencies, totals = asyncio.run(sync(engine, dates, server.base_url, args))
+        elapsed = time.perf_counter() - start
+        engine.dispose()
+
+        report = {
+            'configuration': {
+                'days': len(dates), 'latency': args.latency, 'jitter': args.jitter,
+                'error_rate': args.error_rate, 'concurrency': args.concurrency,
+                'rate': args.rate, 'parser': args.parser, 'workers': args.workers
+            },
+            'races': totals['races'],
+            'saved': totals['saved'],
+            'failed': totals['failed'],
+            'unchanged': totals['unchanged'],
+            'seconds': round(elapsed, 3),
+            'races_per_second': round(totals['races'] / elapsed, 2) if elapsed > 0 else None,
+            'race_latency_p50': round(percentile(latencies, 50), 4) if latencies else None,
+            'race_latency_p95': round(percentile(latencies, 95), 4) if latencies else None,
+            'fetch_seconds': round(totals['fetch_seconds'], 3),
+            'parse_seconds': round(totals['parse_seconds'], 3),
+            'write_seconds': round(totals['write_seconds'], 3),
+            'requests': server.requests,
+            'injected_errors': server.errors,
+        }
+
+    print(f"races: {report['races']} (saved {report['saved']}, failed {report['failed']})")
+    print(f"races/sec: {report['races_per_second']}  elapsed: {report['seconds']}s")
+    # 複数プロセスの同期ではレースごとの所要時間を計測しない
+    if report['race_latency_p50'] is not None:
+        print(f"per-race latency p50: {report['race_latency_p50']}s  "
+              f"p95: {report['race_latency_p95']}s")
+    print(f"stage time fetch: {report['fetch_seconds']}s  parse: {report['parse_seconds']}s  "
+          f"db write: {report['write_seconds']}s")
+    print(f"requests: {report['requests']}  injected errors: {report['injected_errors']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"結果を保存しました: {args.output}")
+
+    return 1 if report['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,24 +1,44 @@
 import os
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import SQLModel, Session, create_engine
-from sqlmodel.pool import StaticPool
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.main import app
-from app.db import get_session
+# テストではディスク上のHTTPキャッシュとページアーカイブを使用せず、同期時の戦績取得も行わない
+# HTMLのパースはプロセスプールを起動せずにテストプロセス内で実行する
+os.environ.setdefault("HTTP_CACHE_ENABLED", "false")
+os.environ.setdefault("PAGE_ARCHIVE_ENABLED", "false")
+os.environ.setdefault("PAST_RACES_ENABLED", "false")
+os.environ.setdefault("PARSE_EXECUTOR", "inline")
 
+from app.main import app  # noqa: E402
+from app.db import (  # noqa: E402
+    create_db_engine, get_async_read_session, get_read_session, get_session
+)
 
-# テスト用インメモリデータベース
+
+# テスト用データベース（同期と非同期のエンジンから同じデータを参照できるよう一時ファイルに作成）
 @pytest.fixture(name="engine")
-def engine_fixture():
-    """テスト用のインメモリSQLiteエンジンを作成"""
+def engine_fixture(tmp_path):
+    """テスト用のSQLiteエンジンを作成"""
     engine = create_engine(
-        "sqlite:///:memory:",
+        f"sqlite:///{tmp_path}/test.db",
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
     )
     SQLModel.metadata.create_all(engine)
-    return engine
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(name="writer_engine")
+def writer_engine_fixture(tmp_path):
+    """本番と同じ書き込み用エンジン（ファイル上のSQLite・接続は1本のみ）"""
+    engine = create_db_engine(f"sqlite:///{tmp_path}/writer.db")
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
 
 
 @pytest.fixture(name="session")
@@ -29,12 +49,23 @@ def session_fixture(engine):
 
 
 @pytest.fixture(name="client")
-def client_fixture(session):
+def client_fixture(engine, session):
     """テスト用のFastAPIクライアントを作成"""
+    # TestClientはリクエストを別のイベントループで処理するため、接続をプールに保持しない
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{engine.url.database}", poolclass=NullPool
+    )
+
     def get_session_override():
         return session
 
+    async def get_async_read_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as async_session:
+            yield async_session
+
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_session_override
+    app.dependency_overrides[get_async_read_session] = get_async_read_session_override
     client = TestClient(app)
     yield client
-    app.dependency_overrides.clear() 
\ No newline at end of file
+    app.dependency_overrides.clear()
@@ -1,3 +1,5 @@
+import threading
+
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -45,4 +47,20 @@ def test_sync_endpoint_error(client):
         data = response.json()
         assert "success" in data
         assert data["success"] is False
-        assert "error" in data 
\ No newline at end of file
+        assert "error" in data 
+
+
+def test_settlement_endpoint_runs_on_db_writer(client):
+    """馬券の精算がDB書き込み用スレッドで実行されるテスト"""
+    threads = []
+
+    def fake_settle(session, target_date, resettle=False):
+        threads.append(threading.current_thread().name)
+        return {"status": "success", "settled": 0}
+
+    with patch("app.api.routes.sync.settle_tickets", side_effect=fake_settle):
+        response = client.post("/sync/settlement", params={"target_date": "2023-05-01"})
+
+    assert response.status_code == 200
+    assert response.json()["settled"] == 0
+    assert threads[0].startswith("db-writer")
@@ -0,0 +1,107 @@
+import os
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import text
+from sqlmodel import Session, create_engine, select
+
+from app.migrations import run_migrations
+from app.models import Horse, Race
+from app.services.bulk_load import bulk_load_races, encode_csv, supports_copy
+from app.services.scraper import JRAScraper
+
+# PostgreSQLを使うテストはこの環境変数に接続URLを設定した場合のみ実行する
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+TEST_SCHEMA = "bulk_load_test"
+
+
+def make_race(race_id, horse_name="テスト馬", result_order=None):
+    return {
+        "race_id": race_id,
+        "race_date": date(2023, 5, 1),
+        "venue": "東京",
+        "race_number": int(race_id[-2:]),
+        "race_name": "テストレース",
+        "race_class": "未勝利",
+        "course_type": "芝",
+        "distance": 1600,
+        "weather": "晴",
+        "track_condition": "良",
+        "start_time": datetime(2023, 5, 1, 10, 0),
+        "horses": [
+            {
+                "horse_id": "2020100001",
+                "horse_name": horse_name,
+                "horse_number": 1,
+                "jockey": "騎手",
+                "trainer": "調教師",
+                "result_order": result_order,
+                "past_races": [],
+            }
+        ],
+    }
+
+
+def test_encode_csv():
+    """NULL・空文字列・日付をCOPYで読み込める形式に変換するテスト"""
+    buffer = encode_csv([
+        ("202305010101", None, "", date(2023, 5, 1), datetime(2023, 5, 1, 10, 0), 'a,"b"'),
+    ])
+    assert buffer.read() == '202305010101,\\N,,2023-05-01,2023-05-01T10:00:00,"a,""b"""\n'
+
+
+def test_supports_copy_sqlite(session):
+    """SQLiteではCOPYを使わないテスト"""
+    assert not supports_copy(session)
+
+
+def test_save_races_sqlite(session):
+    """COPYに対応しないデータベースでは1レースずつ保存するテスト"""
+    scraper = JRAScraper(session)
+    scraper._save_races([
+        (make_race("202305010101"), {"win_odds": {1: 2.5}}),
+        (make_race("202305010102"), {}),
+    ])
+
+    races = session.exec(select(Race).order_by(Race.race_id)).all()
+    assert [race.race_id for race in races] == ["202305010101", "202305010102"]
+    horses = session.exec(select(Horse).order_by(Horse.race_id)).all()
+    assert [horse.odds for horse in horses] == [2.5, None]
+
+
+@pytest.fixture
+def postgres_session():
+    """テスト用のスキーマを作成したPostgreSQLのセッション"""
+    if not TEST_POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL が設定されていません")
+
+    admin = create_engine(TEST_POSTGRES_URL, isolation_level="AUTOCOMMIT")
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {TEST_SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {TEST_SCHEMA}"))
+    engine = create_engine(TEST_POSTGRES_URL, connect_args={"options": f"-csearch_path={TEST_SCHEMA}"})
+    run_migrations(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+    with admin.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {TEST_SCHEMA} CASCADE"))
+    admin.dispose()
+
+
+def test_bulk_load_races_postgres(postgres_session):
+    """COPYで登録したレースと出走馬を再取り込みで更新し、オッズは残すテスト"""
+    race_pks = bulk_load_races(postgres_session, [(make_race("202305010101"), {"win_odds": {1: 2.5}})])
+    postgres_session.commit()
+    assert set(race_pks) == {"202305010101"}
+
+    # 結果のみの再取り込みではオッズが空でも既存のオッズを上書きしない
+    bulk_load_races(postgres_session, [(make_race("202305010101", "改名馬", result_order=1), {})])
+    postgres_session.commit()
+
+    horses = postgres_session.exec(select(Horse)).all()
+    assert len(horses) == 1
+    assert horses[0].race_id == race_pks["202305010101"]
+    assert horses[0].horse_name == "改名馬"
+    assert horses[0].result_order == 1
+    assert horses[0].odds == 2.5
@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from sqlalchemy import text
+
+from app.db import (
+    async_url, create_async_db_engine, create_db_engine, is_sqlite_file, sqlite_pragmas
+)
+
+
+def test_is_sqlite_file():
+    """インメモリのSQLiteは読み取り用と書き込み用に分けないテスト"""
+    assert is_sqlite_file("sqlite:////tmp/horse_racing.db")
+    assert not is_sqlite_file("sqlite://")
+    assert not is_sqlite_file("sqlite:///:memory:")
+    assert not is_sqlite_file("postgresql://localhost/horse_racing")
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        sqlite_pragmas("fast")
+
+
+def test_wal_profile(tmp_path):
+    """WALと調整済みのPRAGMAが接続ごとに設定され、読み取り専用の接続では書き込めないテスト"""
+    url = f"sqlite:///{tmp_path}/test.db"
+    writer = create_db_engine(url, profile="wal")
+    reader = create_db_engine(url, profile="wal", readonly=True)
+
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("INSERT INTO item (id) VALUES (1)"))
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+
+    with reader.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM item")).scalar() == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO item (id) VALUES (2)"))
+
+    writer.dispose()
+    reader.dispose()
+
+
+def test_single_writer_connection(tmp_path):
+    """書き込み用の接続は1本のみで、使用中は追加の接続を開かないテスト"""
+    writer = create_db_engine(f"sqlite:///{tmp_path}/test.db", profile="wal")
+    assert writer.pool.size() == 1
+    assert writer.pool._max_overflow == 0
+    writer.dispose()
+
+
+def test_default_profile(tmp_path):
+    """default プロファイルではSQLiteの既定の設定のままにするテスト"""
+    engine = create_db_engine(f"sqlite:///{tmp_path}/test.db", profile="default")
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+    engine.dispose()
+
+
+def test_async_url():
+    """非同期ドライバーのURLへの変換のテスト"""
+    assert async_url("sqlite:////tmp/test.db") == "sqlite+aiosqlite:////tmp/test.db"
+    assert async_url("postgresql://user@localhost/db") == "postgresql+asyncpg://user@localhost/db"
+    assert async_url("postgresql+psycopg2://user@localhost/db") == "postgresql+asyncpg://user@localhost/db"
+    assert async_url("sqlite+aiosqlite:////tmp/test.db") == "sqlite+aiosqlite:////tmp/test.db"
+
+
+async def test_async_wal_profile(tmp_path):
+    """非同期エンジンにも同じPRAGMAが設定され、読み取り専用の接続では書き込めないテスト"""
+    url = f"sqlite:///{tmp_path}/test.db"
+    writer = create_async_db_engine(url, profile="wal")
+    reader = create_async_db_engine(url, profile="wal", readonly=True)
+
+    async with writer.begin() as conn:
+        await conn.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY)"))
+        await conn.execute(text("INSERT INTO item (id) VALUES (1)"))
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+
+    async with reader.connect() as conn:
+        assert (await conn.execute(text("SELECT COUNT(*) FROM item"))).scalar() == 1
+        with pytest.raises(OperationalError):
+            await conn.execute(text("INSERT INTO item (id) VALUES (2)"))
+
+    await writer.dispose()
+    await reader.dispose()
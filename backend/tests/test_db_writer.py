@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlmodel import Session, select
+
+from app.models import Race
+from app.services.db_writer import read_all, run_write
+
+
+@pytest.mark.asyncio
+async def test_writes_run_serially_off_event_loop():
+    """書き込みが1つのスレッドで順に実行され、その間もイベントループが動作するテスト"""
+    loop_thread = threading.get_ident()
+    threads = []
+    in_flight = 0
+    max_in_flight = 0
+    ticks = 0
+
+    def write(value):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        threads.append(threading.get_ident())
+        time.sleep(0.02)  # コミットの待ち時間を模擬
+        in_flight -= 1
+        return value
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        results = await asyncio.gather(*(run_write(write, i) for i in range(5)))
+    finally:
+        task.cancel()
+
+    assert results == [0, 1, 2, 3, 4]
+    assert max_in_flight == 1
+    assert len(set(threads)) == 1 and threads[0] != loop_thread
+    assert ticks > 5
+
+
+def test_read_all_releases_connection(engine):
+    """読み取りの後にセッションが接続を保持しないテスト"""
+    with Session(engine) as session:
+        assert read_all(session, select(Race.id)) == []
+        assert session.in_transaction() is False
@@ -0,0 +1,131 @@
+import sqlite3
+import threading
+
+import pytest
+import httpx
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services import parsers
+from app.services.http_cache import HTTPCache
+from app.services.scraper import JRAScraper
+
+
+ODDS_HTML = """
+<table class="odds_table_01">
+    <tr><th>馬番</th><th>馬名</th><th>オッズ</th></tr>
+    <tr><td>1</td><td>テスト馬1</td><td>2.5</td></tr>
+    <tr><td>2</td><td>テスト馬2</td><td>10.1</td></tr>
+</table>
+"""
+
+
+def make_response(status_code=200, text="", headers=None):
+    request = httpx.Request("GET", "https://www.jra.go.jp/")
+    return httpx.Response(status_code, text=text, headers=headers or {}, request=request)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HTTPCache(tmp_path / "http_cache.db", ttls={"odds": 60, "result": 60})
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def scraper(session, cache):
+    scraper = JRAScraper(session, cache=cache)
+    scraper.client = AsyncMock()
+    return scraper
+
+
+@pytest.mark.asyncio
+async def test_cache_hit_skips_request_and_parse(scraper):
+    """TTL内のキャッシュヒットでは通信もパースも行わないテスト"""
+    scraper.client.get.return_value = make_response(text=ODDS_HTML)
+
+    with patch("app.services.parsers.parse_odds", wraps=parsers.parse_odds) as parser:
+        first = await scraper._fetch_odds("202305010101", "東京", 1)
+        second = await scraper._fetch_odds("202305010101", "東京", 1)
+
+    assert first == second == {"win_odds": {1: 2.5, 2: 10.1}}
+    assert scraper.client.get.call_count == 1
+    assert parser.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_revalidated(scraper, cache):
+    """TTL切れのキャッシュが条件付きリクエストで再検証されるテスト"""
+    cache.ttls["odds"] = 0
+    scraper.client.get.return_value = make_response(
+        text=ODDS_HTML,
+        headers={"ETag": '"abc"', "Last-Modified": "Mon, 01 May 2023 00:00:00 GMT"}
+    )
+    await scraper._fetch_odds("202305010101", "東京", 1)
+
+    scraper.client.get.return_value = make_response(status_code=304)
+    result = await scraper._fetch_odds("202305010101", "東京", 1)
+
+    assert result == {"win_odds": {1: 2.5, 2: 10.1}}
+    _, kwargs = scraper.client.get.call_args
+    assert kwargs["headers"] == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 01 May 2023 00:00:00 GMT"
+    }
+
+
+def test_lru_eviction(tmp_path):
+    """サイズ上限を超えた場合に最終アクセスの古いエントリから削除されるテスト"""
+    cache = HTTPCache(tmp_path / "http_cache.db", max_bytes=250, ttls={"odds": 60})
+    cache.store("https://example.com/a", "odds", make_response(text="a" * 100))
+    cache.store("https://example.com/b", "odds", make_response(text="b" * 100))
+    cache.get("https://example.com/a")
+    cache.store("https://example.com/c", "odds", make_response(text="c" * 100))
+
+    assert cache.get("https://example.com/a") is not None
+    assert cache.get("https://example.com/b") is None
+    assert cache.get("https://example.com/c") is not None
+    cache.close()
+
+
+def test_get_does_not_write(cache):
+    """キャッシュヒットでは書き込まず、最終アクセス日時は次の保存時に書き込むテスト"""
+    cache.store("https://example.com/a", "odds", make_response(text="a"))
+    changes = cache._conn.total_changes
+
+    assert cache.get("https://example.com/a") is not None
+    assert cache._conn.total_changes == changes
+
+    cache.store("https://example.com/b", "odds", make_response(text="b"))
+    assert cache._conn.total_changes == changes + 2
+
+
+def test_get_does_not_wait_for_writes(cache):
+    """キャッシュの参照は保存（コミット）の完了を待たないテスト"""
+    cache.store("https://example.com/a", "odds", make_response(text="a"))
+    results = []
+
+    with cache._lock:  # キャッシュ用スレッドで保存中
+        reader = threading.Thread(target=lambda: results.append(cache.get("https://example.com/a")))
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+
+    assert results[0].body == "a"
+
+
+@pytest.mark.asyncio
+async def test_database_errors_are_cache_misses(scraper, cache):
+    """キャッシュのデータベースエラーはキャッシュミスとして扱い、取得を続行するテスト"""
+    conn, reader = cache._conn, cache._reader
+    cache._conn, cache._reader = MagicMock(), MagicMock()
+    cache._conn.execute.side_effect = sqlite3.OperationalError("database is locked")
+    cache._reader.execute.side_effect = sqlite3.OperationalError("database is locked")
+    scraper.client.get.return_value = make_response(text=ODDS_HTML)
+
+    try:
+        result = await scraper._fetch_odds("202305010101", "東京", 1)
+    finally:
+        cache._conn, cache._reader = conn, reader
+
+    assert result == {"win_odds": {1: 2.5, 2: 10.1}}
+    assert scraper.client.get.call_count == 1
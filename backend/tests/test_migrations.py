@@ -0,0 +1,137 @@
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import create_engine
+
+from app.migrations import MIGRATIONS, MigrationError, current_version, run_migrations
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """複合インデックスと一意インデックスを追加する前のスキーマのデータベース"""
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE race (id INTEGER PRIMARY KEY, race_id VARCHAR NOT NULL, "
+            "race_date DATE NOT NULL, venue VARCHAR NOT NULL, race_number INTEGER NOT NULL, race_name VARCHAR NOT NULL, "
+            "race_class VARCHAR NOT NULL, course_type VARCHAR NOT NULL, distance INTEGER NOT NULL, "
+            "weather VARCHAR, track_condition VARCHAR, start_time DATETIME, "
+            "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+        ))
+        conn.execute(text("CREATE INDEX ix_race_race_id ON race (race_id)"))
+        conn.execute(text(
+            "INSERT INTO race (race_id, race_date, venue, race_number, race_name, race_class, "
+            "course_type, distance, created_at, updated_at) VALUES "
+            "('202305010101', '2023-05-01', '東京', 1, 'テスト', '未勝利', '芝', 1600, "
+            "'2023-05-01 00:00:00', '2023-05-01 00:00:00')"
+        ))
+    yield engine
+    engine.dispose()
+
+
+def test_migrates_legacy_database(legacy_engine):
+    """既存のデータベースに不足しているテーブルとインデックスを追加するテスト"""
+    assert run_migrations(legacy_engine) == [m.version for m in MIGRATIONS]
+    assert current_version(legacy_engine) == MIGRATIONS[-1].version
+
+    inspector = inspect(legacy_engine)
+    race_indexes = {index["name"]: index for index in inspector.get_indexes("race")}
+    horse_indexes = {index["name"]: index for index in inspector.get_indexes("horse")}
+    assert race_indexes["ix_race_race_id"]["unique"]
+    assert race_indexes["ix_race_race_date_venue_race_number"]["column_names"] == [
+        "race_date", "venue", "race_number"
+    ]
+    assert horse_indexes["ix_horse_race_id_horse_id"]["unique"]
+    assert "ix_horse_race_id_horse_number" in horse_indexes
+    assert "ix_comment_race_id_created_at" in {i["name"] for i in inspector.get_indexes("comment")}
+
+    # 保存済みのデータは残り、再実行しても何も適用しない
+    with legacy_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM race")).scalar() == 1
+    assert run_migrations(legacy_engine) == []
+
+
+def test_duplicate_race_ids_block_unique_index(legacy_engine):
+    """重複したレースIDがある場合は一意インデックスを作成せずに中止するテスト"""
+    with legacy_engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO race (race_id, race_date, venue, race_number, race_name, race_class, "
+            "course_type, distance, created_at, updated_at) SELECT race_id, race_date, venue, "
+            "race_number, race_name, race_class, course_type, distance, created_at, updated_at "
+            "FROM race"
+        ))
+
+    with pytest.raises(MigrationError):
+        run_migrations(legacy_engine)
+    assert current_version(legacy_engine) == 1
+
+
+def test_drops_checkpoint_completed_at(legacy_engine):
+    """チェックポイントの completed_at 列を削除し、既存の行を残すテスト"""
+    with legacy_engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE backfillcheckpoint (id INTEGER PRIMARY KEY, target_date DATE NOT NULL, "
+            "race_id VARCHAR, completed_at DATETIME NOT NULL, created_at DATETIME NOT NULL, "
+            "updated_at DATETIME NOT NULL)"
+        ))
+        conn.execute(text(
+            "INSERT INTO backfillcheckpoint (target_date, completed_at, created_at, updated_at) VALUES "
+            "('2023-05-01', '2023-05-02 00:00:00', '2023-05-02 00:00:00', '2023-05-02 00:00:00')"
+        ))
+
+    run_migrations(legacy_engine)
+
+    columns = {column["name"] for column in inspect(legacy_engine).get_columns("backfillcheckpoint")}
+    assert "completed_at" not in columns
+    with legacy_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM backfillcheckpoint")).scalar() == 1
+
+
+def test_adds_sync_job_active_index(legacy_engine):
+    """同じ日付の実行中のジョブの重複を解消し、部分一意インデックスを追加するテスト"""
+    with legacy_engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE syncjob (id INTEGER PRIMARY KEY, target_date DATE NOT NULL, "
+            "status VARCHAR NOT NULL, message VARCHAR)"
+        ))
+        conn.execute(text(
+            "INSERT INTO syncjob (target_date, status) VALUES "
+            "('2023-05-01', 'running'), ('2023-05-01', 'pending'), ('2023-05-01', 'success'), "
+            "('2023-05-02', 'running')"
+        ))
+
+    run_migrations(legacy_engine)
+
+    with legacy_engine.connect() as conn:
+        statuses = conn.execute(text("SELECT id, status FROM syncjob ORDER BY id")).all()
+        assert [status for _, status in statuses] == ["failed", "pending", "success", "running"]
+        with pytest.raises(IntegrityError):
+            conn.execute(text("INSERT INTO syncjob (target_date, status) VALUES ('2023-05-02', 'pending')"))
+        conn.execute(text("INSERT INTO syncjob (target_date, status) VALUES ('2023-05-02', 'success')"))
+
+
+def test_makes_page_hash_index_unique(legacy_engine):
+    """ページのハッシュの重複を解消し、一意インデックスに作り直すテスト"""
+    with legacy_engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE racepagehash (id INTEGER PRIMARY KEY, race_id VARCHAR NOT NULL, "
+            "page_type VARCHAR NOT NULL, digest VARCHAR NOT NULL, created_at DATETIME NOT NULL, "
+            "updated_at DATETIME NOT NULL)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX ix_racepagehash_race_id_page_type ON racepagehash (race_id, page_type)"
+        ))
+        conn.execute(text(
+            "INSERT INTO racepagehash (race_id, page_type, digest, created_at, updated_at) VALUES "
+            "('202305010101', 'result', 'old', '2023-05-01 00:00:00', '2023-05-01 00:00:00'), "
+            "('202305010101', 'result', 'new', '2023-05-02 00:00:00', '2023-05-02 00:00:00'), "
+            "('202305010101', 'odds', 'odds', '2023-05-01 00:00:00', '2023-05-01 00:00:00')"
+        ))
+
+    run_migrations(legacy_engine)
+
+    indexes = {index["name"]: index for index in inspect(legacy_engine).get_indexes("racepagehash")}
+    assert indexes["ix_racepagehash_race_id_page_type"]["unique"]
+    with legacy_engine.connect() as conn:
+        digests = conn.execute(text("SELECT page_type, digest FROM racepagehash ORDER BY page_type")).all()
+        assert [tuple(row) for row in digests] == [("odds", "odds"), ("result", "new")]
@@ -0,0 +1,80 @@
+from datetime import date, datetime
+
+import numpy as np
+import pytest
+from sqlmodel import select
+
+from app.models import OddsSnapshot, Race
+from app.services.odds_history import (
+    decode_odds, encode_odds, load_odds_curve, record_snapshot
+)
+
+
+@pytest.fixture
+def race(session):
+    race = Race(
+        race_id="202305010101", race_date=date(2023, 5, 1), venue="東京", race_number=1,
+        race_name="テスト", race_class="未勝利", course_type="芝", distance=1600
+    )
+    session.add(race)
+    session.commit()
+    return race
+
+
+def test_encode_decode_odds():
+    """馬番順のfloat32配列へのエンコードテスト"""
+    blob = encode_odds({1: 2.5, 3: 10.2})
+
+    assert len(blob) == 12
+    values = decode_odds(blob)
+    assert values.dtype == np.float32
+    assert values[0] == pytest.approx(2.5)
+    assert np.isnan(values[1])
+    assert values[2] == pytest.approx(10.2)
+
+
+def test_record_snapshot_skips_unchanged(session, race):
+    """直前と同じオッズは記録しないテスト"""
+    assert record_snapshot(session, race.id, {1: 2.5, 2: 4.0}, datetime(2023, 5, 1, 10, 0))
+    session.commit()
+    assert record_snapshot(session, race.id, {1: 2.5, 2: 4.0}, datetime(2023, 5, 1, 10, 1)) is None
+    assert record_snapshot(session, race.id, {}, datetime(2023, 5, 1, 10, 1)) is None
+    assert record_snapshot(session, race.id, {1: 2.4, 2: 4.2}, datetime(2023, 5, 1, 10, 2))
+    session.commit()
+
+    assert len(session.exec(select(OddsSnapshot)).all()) == 2
+
+
+def test_load_odds_curve(session, race):
+    """オッズ推移をNumPy配列で取得するテスト"""
+    record_snapshot(session, race.id, {1: 2.5, 2: 4.0}, datetime(2023, 5, 1, 10, 0))
+    record_snapshot(session, race.id, {1: 2.2, 2: 4.5, 3: 30.0}, datetime(2023, 5, 1, 10, 5))
+    session.commit()
+
+    timestamps, curve = load_odds_curve(session, race.id)
+
+    assert timestamps.tolist() == [datetime(2023, 5, 1, 10, 0), datetime(2023, 5, 1, 10, 5)]
+    assert curve.shape == (2, 3)
+    assert np.isnan(curve[0, 2])
+    np.testing.assert_allclose(curve[:, 0], [2.5, 2.2])
+
+    timestamps, curve = load_odds_curve(session, race.id, start=datetime(2023, 5, 1, 10, 1))
+    assert curve.shape == (1, 3)
+
+
+def test_get_odds_curve_endpoint(client, session, race):
+    """オッズ推移取得APIのテスト"""
+    record_snapshot(session, race.id, {1: 2.5, 3: 4.0}, datetime(2023, 5, 1, 10, 0))
+    session.commit()
+
+    response = client.get(f"/races/{race.id}/odds")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["horse_numbers"] == [1, 2, 3]
+    assert data["snapshots"] == [{"captured_at": "2023-05-01T10:00:00", "odds": [2.5, None, 4.0]}]
+
+    response = client.get(f"/races/{race.id}/odds/3")
+    assert response.json()["odds"] == [4.0]
+
+    assert client.get(f"/races/{race.id}/odds/4").status_code == 404
+    assert client.get("/races/999/odds").status_code == 404
@@ -0,0 +1,126 @@
+import pytest
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+from sqlmodel import Session, select
+
+from app.models import Horse, Race
+from app.services.odds_poller import OddsPoller, poll_interval
+from app.services.scraper import JRAScraper, jra_now
+
+
+NOW = datetime(2023, 5, 1, 12, 0)
+
+
+@pytest.fixture
+def races(session):
+    """発走済み・発走直前・発走2時間前のレース"""
+    races = []
+    for number, minutes in ((1, -30), (2, 4), (3, 120)):
+        race = Race(
+            race_id=f"2023050101{number:02d}", race_date=date(2023, 5, 1), venue="東京",
+            race_number=number, race_name=f"テスト{number}", race_class="未勝利",
+            course_type="芝", distance=1600, start_time=NOW + timedelta(minutes=minutes)
+        )
+        session.add(race)
+        session.flush()
+        for horse_number in (1, 2):
+            session.add(Horse(
+                race_id=race.id, horse_id=f"{number}{horse_number}", horse_name="テスト馬",
+                horse_number=horse_number, jockey="騎手", trainer="調教師", odds=5.0
+            ))
+        races.append(race)
+    session.commit()
+    return races
+
+
+def test_poll_interval():
+    """発走が近いほどポーリング間隔が短くなるテスト"""
+    assert poll_interval(60) < poll_interval(10 * 60) < poll_interval(30 * 60)
+    assert poll_interval(2 * 60 * 60) < poll_interval(5 * 60 * 60)
+
+
+@pytest.mark.asyncio
+async def test_poll_once_updates_changed_odds(session, races):
+    """発走前のレースのみ取得し、変化したオッズだけを更新するテスト"""
+    def scraper_factory(session):
+        scraper = JRAScraper(session)
+        scraper._fetch_odds = AsyncMock(return_value={"win_odds": {1: 5.0, 2: 7.5}})
+        scraper._fetch_race_detail = AsyncMock()
+        scrapers.append(scraper)
+        return scraper
+
+    scrapers = []
+    poller = OddsPoller(session, scraper_factory=scraper_factory)
+    result = await poller.poll_once(date(2023, 5, 1), now=NOW)
+
+    assert result["upcoming"] == 2
+    assert result["polled"] == 2
+    assert result["updated"] == 2
+    fetched = [call.args[0] for call in scrapers[0]._fetch_odds.call_args_list]
+    assert sorted(fetched) == ["202305010102", "202305010103"]
+    scrapers[0]._fetch_race_detail.assert_not_called()
+
+    odds = session.exec(select(Horse.odds).where(Horse.race_id == races[0].id)).all()
+    assert odds == [5.0, 5.0]
+
+    # 発走直前のレースは短い間隔で再取得される
+    assert poller.next_poll_at[races[1].id] == NOW + timedelta(seconds=15)
+    assert result["next_poll_at"] == NOW + timedelta(seconds=15)
+
+    result = await poller.poll_once(date(2023, 5, 1), now=NOW + timedelta(seconds=20))
+    assert result["polled"] == 1
+    assert result["updated"] == 0
+
+
+@pytest.mark.asyncio
+async def test_poll_once_uses_japan_time(session, races, monkeypatch):
+    """サーバーのタイムゾーンによらず日本時間で発走前のレースを判定するテスト"""
+    # UTCのサーバーでは日本時間の12:00は03:00になる
+    monkeypatch.setattr("app.services.odds_poller.jra_now", lambda: NOW)
+
+    def scraper_factory(session):
+        scraper = JRAScraper(session)
+        scraper._fetch_odds = AsyncMock(return_value={"win_odds": {}})
+        return scraper
+
+    result = await OddsPoller(session, scraper_factory=scraper_factory).poll_once(date(2023, 5, 1))
+    assert result["upcoming"] == 2
+
+
+def test_jra_now_is_japan_time():
+    """jra_now が日本時間（タイムゾーンなし）を返すテスト"""
+    utc_now = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert abs((jra_now() - utc_now) - timedelta(hours=9)) < timedelta(seconds=5)
+
+
+@pytest.mark.asyncio
+async def test_poll_once_releases_writer_connection(writer_engine):
+    """オッズが変化しない場合も書き込み用の接続を返し、同じセッションで繰り返しポーリングできるテスト"""
+    with Session(writer_engine) as seed:
+        race = Race(
+            race_id="202305010101", race_date=date(2023, 5, 1), venue="東京", race_number=1,
+            race_name="テスト", race_class="未勝利", course_type="芝", distance=1600,
+            start_time=NOW + timedelta(hours=3)
+        )
+        seed.add(race)
+        seed.flush()
+        seed.add(Horse(
+            race_id=race.id, horse_id="11", horse_name="テスト馬", horse_number=1,
+            jockey="騎手", trainer="調教師", odds=5.0
+        ))
+        seed.commit()
+
+    def scraper_factory(session):
+        scraper = JRAScraper(session)
+        scraper._fetch_odds = AsyncMock(return_value={"win_odds": {1: 5.0}})
+        return scraper
+
+    with Session(writer_engine) as session:
+        poller = OddsPoller(session, scraper_factory=scraper_factory)
+        for _ in range(3):
+            poller.next_poll_at.clear()
+            result = await poller.poll_once(date(2023, 5, 1), now=NOW)
+            assert result["polled"] == 1
+            assert result["updated"] == 0
+            assert writer_engine.pool.checkedout() == 0
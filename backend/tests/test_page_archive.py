@@ -0,0 +1,118 @@
+from datetime import date
+
+import pytest
+from sqlmodel import select
+
+from app.models import Horse, Race, RacePayout
+from app.services import page_archive
+from app.services.page_archive import PageArchive
+from app.services.reparse import Reparser
+from tests.test_parsers import PAYOUT_HTML, RESULT_HTML
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """一時ディレクトリのページアーカイブ"""
+    archive = PageArchive(tmp_path / "pages.db", level=3, dict_size=4096, train_samples=8)
+    yield archive
+    archive.close()
+
+
+def test_store_and_latest(archive):
+    """保存したページを展開して取り出せること、同じ本文は重複して保存しないテスト"""
+    url = "https://example.com/race/result.html?race_id=202305010111"
+    assert archive.store("202305010111", "result", url, "<html>1</html>") is True
+    assert archive.store("202305010111", "result", url, "<html>1</html>") is False
+    assert archive.store("202305010111", "result", url, "<html>2</html>") is True
+    assert archive.store("202305010112", "result", url, "<html>3</html>") is True
+
+    pages = list(archive.latest("result"))
+    assert [(p.race_id, p.body) for p in pages] == [
+        ("202305010111", "<html>2</html>"), ("202305010112", "<html>3</html>")
+    ]
+    assert [p.race_id for p in archive.latest("result", ["202305010112"])] == ["202305010112"]
+    assert list(archive.latest("odds")) == []
+    assert archive.stats()["result"]["pages"] == 3
+
+
+def test_zlib_fallback_warns(tmp_path, monkeypatch, caplog):
+    """zstandard がない環境ではzlibで圧縮し、警告を記録するテスト"""
+    monkeypatch.setattr(page_archive, "zstandard", None)
+    archive = PageArchive(tmp_path / "pages.db")
+    try:
+        assert "zlib" in caplog.text
+        url = "https://example.com/race/result.html?race_id=202305010111"
+        assert archive.store("202305010111", "result", url, "<html>1</html>") is True
+        assert [p.body for p in archive.latest("result")] == ["<html>1</html>"]
+    finally:
+        archive.close()
+
+
+def test_dictionary_training(archive):
+    """一定数たまったページから辞書を学習し、以降のページを辞書で圧縮するテスト"""
+    pytest.importorskip("zstandard")
+
+    def store(number):
+        race_id = f"20230501{number:04d}"
+        body = RESULT_HTML.replace("テスト記念", f"テスト記念{number}") * 4
+        archive.store(race_id, "result", f"https://example.com/{race_id}", body)
+
+    # 辞書は別スレッドで学習し、学習が終わるまでのページは辞書なしで圧縮する
+    for number in range(1, 21):
+        store(number)
+    archive.wait_for_training()
+    for number in range(21, 41):
+        store(number)
+
+    stats = archive.stats()["result"]
+    assert stats["pages"] == 40
+    assert stats["with_dictionary"] > 0
+
+    # 辞書で圧縮したページと辞書なしのページのどちらも展開できる
+    bodies = {p.race_id: p.body for p in archive.latest("result")}
+    assert bodies["202305010001"].startswith(RESULT_HTML.replace("テスト記念", "テスト記念1"))
+    assert "テスト記念40" in bodies["202305010040"]
+
+
+@pytest.mark.asyncio
+async def test_store_async(archive):
+    """アーカイブ用スレッドで保存できるテスト"""
+    url = "https://example.com/race/result.html?race_id=202305010111"
+    assert await archive.store_async("202305010111", "result", url, "<html>1</html>") is True
+    assert await archive.store_async("202305010111", "result", url, "<html>1</html>") is False
+    assert [p.body for p in archive.latest("result")] == ["<html>1</html>"]
+
+
+def test_reparse_updates_results(session, archive):
+    """アーカイブの結果ページから着順と払戻金を更新するテスト"""
+    race = Race(
+        race_id="202305010111", race_date=date(2023, 5, 1), venue="東京", race_number=11,
+        race_name="テスト記念", race_class="G1", course_type="芝", distance=1600
+    )
+    session.add(race)
+    session.flush()
+    session.add(Horse(
+        race_id=race.id, horse_id="2019100001", horse_name="テスト馬&1", horse_number=3,
+        jockey="騎手A", trainer="調教師A"
+    ))
+    session.commit()
+
+    html = RESULT_HTML.replace("</body>", PAYOUT_HTML + "</body>")
+    archive.store("202305010111", "result", "https://example.com/result", html)
+
+    result = Reparser(session, archive, executor_kind="inline").run()
+
+    assert result["races"] == 1
+    assert result["updated_races"] == 1
+    assert result["updated_horses"] == 3
+    horses = session.exec(select(Horse).order_by(Horse.horse_number)).all()
+    assert [(h.horse_id, h.result_order) for h in horses] == [
+        ("2019100001", 1), ("2019100002", 2), ("2019100003", None)
+    ]
+    assert horses[0].result_time == 92.5
+    assert session.exec(select(RacePayout)).all()
+
+    # 内容が変わらなければ更新しない
+    again = Reparser(session, archive, executor_kind="inline").run(date(2023, 5, 1), date(2023, 5, 1))
+    assert again["updated_races"] == 0
+    assert again["updated_horses"] == 0
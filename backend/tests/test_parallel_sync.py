@@ -0,0 +1,95 @@
+import sys
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from sqlmodel import select
+
+from app.models import BackfillCheckpoint, Race
+from app.services.parallel_sync import ParallelBackfillRunner, WorkerOptions, partition
+from app.services.scraper import JRAScraper
+
+# スタンドインサーバーは scripts/jra_standin.py のものを使用する
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from jra_standin import StandinServer, synthetic_recording  # noqa: E402
+
+
+def race_detail(race_id):
+    return {
+        "race_id": race_id, "race_date": date(2023, 5, 1), "venue": "東京", "race_number": 1,
+        "race_name": "テストレース", "race_class": "未勝利", "course_type": "芝",
+        "distance": 1600, "weather": "晴", "track_condition": "良", "start_time": None,
+        "horses": []
+    }
+
+
+def test_partition_round_robin():
+    """日付が各プロセスに交互に振り分けられるテスト"""
+    work = [(date(2023, 5, day), set()) for day in range(1, 6)]
+
+    parts = partition(work, 2)
+    assert [[d.day for d, _ in part] for part in parts] == [[1, 3, 5], [2, 4]]
+    assert len(partition(work[:1], 4)) == 1
+
+
+def test_worker_options_split_rate(session):
+    """全体の流量を超えないようにレートをプロセス数で等分するテスト"""
+    runner = ParallelBackfillRunner(session, workers=4, options=WorkerOptions(rate=8, max_rate=20))
+    options = runner.worker_options(4)
+
+    assert options.rate == 2
+    assert options.max_rate == 5
+
+
+def test_save_batch_and_finish_date(session):
+    """まとめて保存したレースと日付の完了がチェックポイントに記録されるテスト"""
+    runner = ParallelBackfillRunner(session, workers=2)
+    scraper = JRAScraper(session, fetch_past_races=False)
+    failures = Counter()
+    batch = [
+        (date(2023, 5, 1), race_id, race_detail(race_id), {"win_odds": {}})
+        for race_id in ("202305010101", "202305010102")
+    ]
+    runner.throughput = {"races_saved": 0}
+
+    runner._save_batch(scraper, batch, failures)
+    result = runner._finish_date(date(2023, 5, 1), "done", "", failures[date(2023, 5, 1)])
+
+    assert runner.throughput["races_saved"] == 2
+    assert result["status"] == "success"
+    assert len(session.exec(select(Race)).all()) == 2
+    assert runner.backfill.completed_race_ids(date(2023, 5, 1)) == {"202305010101", "202305010102"}
+    assert runner.backfill.completed_dates(date(2023, 5, 1), date(2023, 5, 1)) == {date(2023, 5, 1)}
+
+    # 失敗したレースがある日付は完了として記録しない
+    partial = runner._finish_date(date(2023, 5, 2), "done", "", 1)
+    assert partial["status"] == "partial_failure"
+    assert session.exec(
+        select(BackfillCheckpoint).where(BackfillCheckpoint.target_date == date(2023, 5, 2))
+    ).all() == []
+
+
+@pytest.mark.asyncio
+async def test_run_with_spawned_workers(session, tmp_path, monkeypatch):
+    """既定の設定で起動した取得・パース用プロセスからレースを保存できるテスト"""
+    # 取得・パース用プロセスは起動時に環境変数から設定を読み込む
+    monkeypatch.setenv("PARSE_EXECUTOR", "process")
+    monkeypatch.setenv("HTTP_CACHE_ENABLED", "true")
+    monkeypatch.setenv("HTTP_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("PAGE_ARCHIVE_ENABLED", "true")
+    monkeypatch.setenv("PAGE_ARCHIVE_PATH", str(tmp_path / "archive" / "pages.db"))
+    start_date = date(2023, 5, 1)
+    pages = synthetic_recording(start_date, days=2, venues=1, races_per_venue=2, horses=4)
+
+    with StandinServer(pages) as server:
+        options = WorkerOptions(base_url=server.base_url, rate=100, max_rate=100)
+        runner = ParallelBackfillRunner(session, workers=2, options=options)
+        result = await runner.run(start_date, start_date + timedelta(days=1))
+
+    assert result["status"] == "success"
+    assert runner.throughput["races_saved"] == 4
+    assert len(session.exec(select(Race)).all()) == 4
+    # 取得・パース用プロセスはHTTPキャッシュとページアーカイブのファイルを開かない
+    assert not (tmp_path / "cache").exists()
+    assert not (tmp_path / "archive").exists()
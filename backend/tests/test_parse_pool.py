@@ -0,0 +1,39 @@
+import pytest
+from unittest.mock import patch
+
+from app.services import parse_pool, parsers
+from app.services.parse_pool import create_parse_executor, run_parser
+
+ODDS_HTML = """
+<table class="odds_table_01">
+  <tr><th>馬番</th><th>馬名</th><th>単勝</th></tr>
+  <tr><td>1</td><td>テスト馬1</td><td>2.5</td></tr>
+  <tr><td>2</td><td>テスト馬2</td><td>10.1</td></tr>
+</table>
+"""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["thread", "process"])
+async def test_run_parser_in_pool(kind):
+    """プール上でのパース結果がイベントループ上のパース結果と一致するテスト"""
+    executor = create_parse_executor(kind, workers=2)
+    try:
+        with patch.object(parse_pool, "_executor", executor):
+            result = await run_parser(parsers.parse_odds, ODDS_HTML, "lxml")
+    finally:
+        executor.shutdown(wait=True)
+
+    assert result == parsers.parse_odds(ODDS_HTML, "lxml")
+    assert result == {"win_odds": {1: 2.5, 2: 10.1}}
+
+
+def test_inline_executor_is_none():
+    """inline ではプールを作成しないテスト"""
+    assert create_parse_executor("inline") is None
+
+
+def test_unknown_executor_kind():
+    """不明な実行方式はエラーになるテスト"""
+    with pytest.raises(ValueError):
+        create_parse_executor("gpu")
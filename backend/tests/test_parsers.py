@@ -0,0 +1,187 @@
+import pytest
+from datetime import date, datetime
+
+from app.services import parsers
+
+
+RACE_LIST_HTML = """
+<div class="race_table">
+    <div class="race_place">東京</div>
+    <table>
+        <tr class="race_data">
+            <td class="race_num">1R</td>
+            <td><a href="race/result.html?race_id=202305010101">レース詳細</a></td>
+        </tr>
+        <tr class="race_data">
+            <td class="race_num">11R</td>
+            <td><a href="race/result.html?race_id=202305010111">レース詳細</a></td>
+        </tr>
+    </table>
+</div>
+"""
+
+RESULT_HTML = """
+<html><body>
+<h1 class="race_name">テスト記念</h1>
+<div class="race_condition">芝1600m G1 天候:晴 馬場:良</div>
+<div class="race_time">15:40発走</div>
+<table class="race_table_01">
+    <tr><th>着順</th><th>馬番</th><th>枠</th><th>馬名</th><th>性齢</th><th>斤量</th><th>騎手</th>
+        <th>タイム</th><th>馬体重</th><th>着差</th><th>調教師</th><th>通過</th></tr>
+    <tr><td>1</td><td>3</td><td>2</td><td><a href="/horse/?horse_id=2019100001">テスト馬&amp;1</a></td>
+        <td>牡4</td><td>57</td><td><a href="#">騎手A</a></td><td>1:32.5</td>
+        <td>480(+2)</td><td></td><td><a href="#">調教師A</a></td><td>2-2-1</td></tr>
+    <tr><td>2</td><td>7</td><td>4</td><td><a href="/horse/?horse_id=2019100002">テスト馬2</a></td>
+        <td>牝4</td><td>55</td><td><a href="#">騎手B</a></td><td>1:32.7</td>
+        <td>452(-4)</td><td>1 1/4</td><td><a href="#">調教師B</a></td><td>5-4-3</td></tr>
+    <tr><td>取消</td><td>9</td><td>5</td><td><a href="/horse/?horse_id=2019100003">テスト馬3</a></td>
+        <td>牡4</td><td>57</td><td><a href="#">騎手C</a></td><td></td>
+        <td></td><td></td><td><a href="#">調教師C</a></td><td></td></tr>
+</table>
+</body></html>
+"""
+
+PAYOUT_HTML = """
+<table class="pay_table_01">
+    <tr><th>単勝</th><td>3</td><td>250円</td><td>1人気</td></tr>
+    <tr><th rowspan="2">複勝</th><td>3</td><td>110円</td><td>1人気</td></tr>
+    <tr><td>7</td><td>320円</td><td>5人気</td></tr>
+    <tr><th>馬連</th><td>7 - 3</td><td>1,230円</td><td>4人気</td></tr>
+    <tr><th>枠連</th><td>2 - 4</td><td>980円</td><td>3人気</td></tr>
+    <tr><th>三連単</th><td>7 → 3 → 12</td><td>123,450円</td><td>301人気</td></tr>
+</table>
+"""
+
+ODDS_HTML = """
+<table class="odds_table_01">
+    <tr><th>馬番</th><th>馬名</th><th>オッズ</th></tr>
+    <tr><td>3</td><td>テスト馬1</td><td>2.5</td></tr>
+    <tr><td>7</td><td>テスト馬2</td><td>1,234.5</td></tr>
+    <tr><td>-</td><td>取消</td><td>---</td></tr>
+</table>
+"""
+
+
+@pytest.mark.parametrize("backend", parsers.available_backends())
+def test_backends_extract_identical_output(backend):
+    """すべてのバックエンドが html.parser と同じ結果を返すテスト"""
+    args = ("202305010111", "東京", 11, date(2023, 5, 1))
+
+    assert parsers.parse_races_list(RACE_LIST_HTML, backend) == \
+        parsers.parse_races_list(RACE_LIST_HTML, "html.parser")
+    assert parsers.parse_race_detail(RESULT_HTML, *args, backend=backend) == \
+        parsers.parse_race_detail(RESULT_HTML, *args, backend="html.parser")
+    assert parsers.parse_odds(ODDS_HTML, backend) == parsers.parse_odds(ODDS_HTML, "html.parser")
+
+
+def test_parse_race_detail():
+    """レース結果ページのパーステスト"""
+    result = parsers.parse_race_detail(RESULT_HTML, "202305010111", "東京", 11, date(2023, 5, 1))
+
+    assert result["race_name"] == "テスト記念"
+    assert result["course_type"] == "芝"
+    assert result["distance"] == 1600
+    assert result["race_class"] == "G1"
+    assert result["weather"] == "晴"
+    assert result["track_condition"] == "良"
+    assert result["start_time"] == datetime(2023, 5, 1, 15, 40)
+    assert [h["horse_id"] for h in result["horses"]] == ["2019100001", "2019100002", "2019100003"]
+    assert result["horses"][0]["horse_name"] == "テスト馬&1"
+    assert result["horses"][0]["weight"] == 480
+
+
+def test_parse_race_detail_results():
+    """レース結果ページから着順・タイム・着差・通過順を抽出するテスト"""
+    result = parsers.parse_race_detail(RESULT_HTML, "202305010111", "東京", 11, date(2023, 5, 1))
+    first, second, scratched = result["horses"]
+
+    assert first["result_order"] == 1
+    assert first["result_time"] == 92.5
+    assert first["result_margin"] is None
+    assert first["result_corner_position"] == "2-2-1"
+    assert second["result_order"] == 2
+    assert second["result_margin"] == "1 1/4"
+    assert scratched["result_order"] is None
+    assert scratched["result_time"] is None
+
+
+def test_parse_race_detail_before_race():
+    """結果列のない発走前のページでは結果が None になるテスト"""
+    html = RESULT_HTML.replace("<th>着順</th>", "<th>枠番</th>").replace("<th>タイム</th>", "<th>-</th>")
+    html = html.replace("<th>着差</th>", "<th>-</th>").replace("<th>通過</th>", "<th>-</th>")
+    result = parsers.parse_race_detail(html, "202305010111", "東京", 11, date(2023, 5, 1))
+
+    assert all(h["result_order"] is None and h["result_time"] is None for h in result["horses"])
+
+
+def test_parse_result_time():
+    """走破タイムを秒に変換するテスト"""
+    assert parsers.parse_result_time("1:32.5") == 92.5
+    assert parsers.parse_result_time("58.9") == 58.9
+    assert parsers.parse_result_time("") is None
+
+
+def test_parse_payouts():
+    """払戻金テーブルのパーステスト（対象外の券種は除外）"""
+    payouts = parsers.parse_payouts(PAYOUT_HTML)
+
+    assert [(p["bet_type"], p["bet_numbers"], p["payout"]) for p in payouts] == [
+        ("単勝", "3", 250),
+        ("複勝", "3", 110),
+        ("複勝", "7", 320),
+        ("馬連", "3-7", 1230),
+        ("三連単", "7-3-12", 123450),
+    ]
+    assert payouts[-1]["popularity"] == 301
+
+    # 結果ページでは取消の馬（9番）の返還を払戻金に加える
+    html = RESULT_HTML.replace("</body>", PAYOUT_HTML + "</body>")
+    assert parsers.parse_race_detail(html, "202305010111", "東京", 11, date(2023, 5, 1))["payouts"] == \
+        payouts + [{"bet_type": "返還", "bet_numbers": "9", "payout": 100, "popularity": None}]
+
+
+def test_parse_payouts_refunds_and_tables():
+    """返還の行を馬番ごとに抽出し、券種の見出しを表をまたいで引き継がないテスト"""
+    html = """
+    <table class="pay_table_01">
+        <tr><th>返還</th><td>5, 9</td></tr>
+    </table>
+    <table class="pay_table_01">
+        <tr><td>3</td><td>250円</td><td>1人気</td></tr>
+        <tr><th>単勝</th><td>3</td><td>250円</td><td>1人気</td></tr>
+    </table>
+    """
+    payouts = parsers.parse_payouts(html)
+
+    assert [(p["bet_type"], p["bet_numbers"], p["payout"]) for p in payouts] == [
+        ("返還", "5", 100), ("返還", "9", 100), ("単勝", "3", 250)
+    ]
+
+
+def test_parse_race_detail_no_refunds_before_payouts():
+    """払戻金の確定前は取消の馬があっても返還を加えないテスト"""
+    result = parsers.parse_race_detail(RESULT_HTML, "202305010111", "東京", 11, date(2023, 5, 1))
+    assert result["payouts"] == []
+
+
+def test_normalize_bet_numbers():
+    """順不同の券種のみ馬番を昇順に並べるテスト"""
+    assert parsers.normalize_bet_numbers("ワイド", "12,03") == "3-12"
+    assert parsers.normalize_bet_numbers("馬単", "12→3") == "12-3"
+
+
+def test_parse_odds():
+    """オッズページのパーステスト"""
+    assert parsers.parse_odds(ODDS_HTML) == {"win_odds": {3: 2.5, 7: 1234.5}}
+
+
+def test_parse_document_falls_back_on_empty_html():
+    """lxmlで解析できない文書は html.parser にフォールバックするテスト"""
+    assert parsers.parse_races_list("") == []
+    assert parsers.parse_odds("", "lxml") == {"win_odds": {}}
+
+
+def test_parse_document_unknown_backend():
+    """不明なバックエンド指定のテスト"""
+    with pytest.raises(ValueError):
+        parsers.parse_document("<html></html>", "unknown")
@@ -0,0 +1,140 @@
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock
+
+from sqlmodel import Session, select
+
+from app.models import Horse, HorsePastRace, Race
+from app.services import parsers
+from app.services.past_races import PastRaceCrawler, reset_fetched
+from app.services.scraper import JRAScraper
+
+
+HISTORY_HTML = """
+<table class="horse_race_history">
+  <tr><th>日付</th><th>開催</th><th>レース名</th><th>頭数</th><th>着順</th><th>騎手</th><th>距離</th><th>馬場</th><th>馬体重</th></tr>
+  <tr><td>2023/04/30</td><td>2回東京4日</td><td>青葉賞</td><td>16</td><td>1</td><td>騎手A</td><td>芝2400</td><td>良</td><td>478</td></tr>
+  <tr><td>2023/03/05</td><td>2回中山4日</td><td>弥生賞</td><td>12</td><td>3</td><td>騎手B</td><td>芝2000</td><td>稍重</td><td>480</td></tr>
+</table>
+"""
+
+
+@pytest.fixture(autouse=True)
+def reset_crawler():
+    reset_fetched()
+    yield
+    reset_fetched()
+
+
+def add_entry(session, race_id, race_date, horse_id):
+    race = Race(race_id=race_id, race_date=race_date, venue="東京", race_number=1,
+                race_name="テスト", race_class="未勝利", course_type="芝", distance=1600)
+    session.add(race)
+    session.flush()
+    horse = Horse(race_id=race.id, horse_id=horse_id, horse_name="テスト馬", horse_number=1,
+                  jockey="騎手", trainer="調教師")
+    session.add(horse)
+    session.commit()
+    return horse
+
+
+def history():
+    return parsers.parse_horse_history(HISTORY_HTML, "html.parser")
+
+
+def test_parse_horse_history():
+    """戦績ページのパーステスト"""
+    rows = history()
+    assert [r["race_date"] for r in rows] == ["2023-04-30", "2023-03-05"]
+    assert rows[0]["venue"] == "東京"
+    assert rows[0]["race_name"] == "青葉賞"
+    assert rows[0]["result_order"] == 1
+    assert rows[1]["course_condition"] == "稍重"
+
+
+@pytest.mark.asyncio
+async def test_crawl_fetches_each_horse_once_per_day(session):
+    """同じ馬の戦績を1日1回のみ取得するテスト"""
+    add_entry(session, "202305280101", date(2023, 5, 28), "2020100001")
+    add_entry(session, "202306040101", date(2023, 6, 4), "2020100001")
+    scraper = JRAScraper(session)
+    scraper._fetch_horse_history = AsyncMock(return_value=history())
+    crawler = PastRaceCrawler(scraper)
+
+    result = await crawler.crawl(["2020100001", "2020100001"], today=date(2023, 6, 4))
+    assert result == {"fetched": 1, "added": 4, "errors": 0}
+
+    result = await crawler.crawl(["2020100001"], today=date(2023, 6, 4))
+    assert result == {"fetched": 0, "added": 0, "errors": 0}
+    assert scraper._fetch_horse_history.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_crawl_appends_only_new_races(session):
+    """保存済みより新しく、出走日より前の戦績のみ追加されるテスト"""
+    horse = add_entry(session, "202305070101", date(2023, 5, 7), "2020100002")
+    session.add(HorsePastRace(horse_id=horse.id, race_date="2023-03-05", venue="中山",
+                                race_name="弥生賞", jockey="騎手B"))
+    session.commit()
+
+    scraper = JRAScraper(session)
+    newer = {**history()[0], "race_date": "2023-05-28", "race_name": "日本ダービー"}
+    scraper._fetch_horse_history = AsyncMock(return_value=[newer] + history())
+
+    result = await PastRaceCrawler(scraper).crawl(["2020100002"], today=date(2023, 6, 4))
+
+    assert result["added"] == 1
+    past_races = session.exec(
+        select(HorsePastRace).where(HorsePastRace.horse_id == horse.id).order_by(HorsePastRace.race_date)
+    ).all()
+    assert [p.race_name for p in past_races] == ["弥生賞", "青葉賞"]
+
+
+@pytest.mark.asyncio
+async def test_crawl_failed_horse_is_retried(session):
+    """取得に失敗した馬は取得済みとして記録されないテスト"""
+    add_entry(session, "202305280101", date(2023, 5, 28), "2020100003")
+    scraper = JRAScraper(session)
+    scraper._fetch_horse_history = AsyncMock(side_effect=[Exception("取得エラー"), history()])
+    crawler = PastRaceCrawler(scraper)
+
+    result = await crawler.crawl(["2020100003"], today=date(2023, 6, 4))
+    assert result == {"fetched": 0, "added": 0, "errors": 1}
+
+    result = await crawler.crawl(["2020100003"], today=date(2023, 6, 4))
+    assert result == {"fetched": 1, "added": 2, "errors": 0}
+
+
+@pytest.mark.asyncio
+async def test_crawl_applies_fetched_history_to_new_entries(session):
+    """取得済みの馬でも、取得後に登録された出走には記録済みの戦績を追加するテスト"""
+    add_entry(session, "202305280101", date(2023, 5, 28), "2020100004")
+    scraper = JRAScraper(session)
+    scraper._fetch_horse_history = AsyncMock(return_value=history())
+    crawler = PastRaceCrawler(scraper)
+
+    result = await crawler.crawl(["2020100004"], today=date(2023, 6, 4))
+    assert result == {"fetched": 1, "added": 2, "errors": 0}
+
+    # 同じ日のうちに別の日付を同期して出走が登録された場合
+    horse = add_entry(session, "202306040101", date(2023, 6, 4), "2020100004")
+    result = await crawler.crawl(["2020100004"], today=date(2023, 6, 4))
+
+    assert result == {"fetched": 0, "added": 2, "errors": 0}
+    assert scraper._fetch_horse_history.await_count == 1
+    assert len(session.exec(select(HorsePastRace).where(HorsePastRace.horse_id == horse.id)).all()) == 2
+
+
+def test_save_histories_releases_writer_connection(writer_engine):
+    """追加する戦績がない場合も書き込み用の接続を返すテスト"""
+    with Session(writer_engine) as session:
+        add_entry(session, "202303010101", date(2023, 3, 1), "2020100009")
+        crawler = PastRaceCrawler(JRAScraper(session))
+
+        # 出走日より前の戦績がない
+        assert crawler.save_histories({"2020100009": history()}) == 0
+        assert writer_engine.pool.checkedout() == 0
+
+        # 出走が登録されていない
+        assert crawler.save_histories({"2020100010": history()}) == 0
+        assert writer_engine.pool.checkedout() == 0
@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+
+from app.services.rate_limit import AdaptiveLimiter
+
+
+def make_limiter(**kwargs):
+    params = dict(
+        rate=100, burst=100, min_rate=1, max_rate=200, concurrency=4,
+        min_concurrency=1, max_concurrency=8, latency_threshold=1.0, cooldown=0
+    )
+    params.update(kwargs)
+    return AdaptiveLimiter(**params)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    """同時実行数が上限を超えないテスト"""
+    limiter = make_limiter(concurrency=2, max_concurrency=2)
+    max_in_flight = 0
+
+    async def request():
+        nonlocal max_in_flight
+        async with limiter.request() as outcome:
+            max_in_flight = max(max_in_flight, limiter.in_flight)
+            await asyncio.sleep(0.02)
+            outcome.status_code = 200
+
+    await asyncio.gather(*(request() for _ in range(6)))
+
+    assert max_in_flight == 2
+    assert limiter.in_flight == 0
+    assert limiter.throttled_seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_throttles():
+    """トークンを使い切るとレートに応じて待機するテスト"""
+    limiter = make_limiter(rate=50, burst=1, max_rate=50)
+
+    for _ in range(3):
+        async with limiter.request() as outcome:
+            outcome.status_code = 200
+
+    assert limiter.snapshot()["throttled_seconds"] >= 0.03
+
+
+@pytest.mark.asyncio
+async def test_aimd_adjustment():
+    """429応答で縮小し、正常応答で回復するテスト"""
+    limiter = make_limiter(concurrency=8)
+
+    async with limiter.request() as outcome:
+        outcome.status_code = 429
+    assert limiter.snapshot()["concurrency_limit"] == 4
+    assert limiter.rate == 50
+
+    with pytest.raises(ConnectionError):
+        async with limiter.request():
+            raise ConnectionError()
+    assert limiter.snapshot()["concurrency_limit"] == 2
+
+    for _ in range(10):
+        async with limiter.request() as outcome:
+            outcome.status_code = 200
+    assert limiter.snapshot()["concurrency_limit"] > 2
+    assert limiter.rate > 25
@@ -0,0 +1,97 @@
+import pytest
+import httpx
+from unittest.mock import AsyncMock, patch
+
+from app.services.retry import CircuitOpenError, RetryPolicy, parse_retry_after
+
+URL = "https://www.jra.go.jp/race/result.html?race_id=202305010101"
+
+
+def make_response(status_code, headers=None):
+    return httpx.Response(status_code, headers=headers or {}, request=httpx.Request("GET", URL))
+
+
+@pytest.fixture
+def no_sleep():
+    with patch("app.services.retry.asyncio.sleep", new=AsyncMock()) as mock_sleep:
+        yield mock_sleep
+
+
+@pytest.mark.asyncio
+async def test_retries_server_error(no_sleep):
+    """5xx応答を再試行して成功するテスト"""
+    policy = RetryPolicy(max_attempts=3, base_delay=0.5)
+    send = AsyncMock(side_effect=[make_response(503), make_response(200)])
+
+    response = await policy.call(URL, send)
+
+    assert response.status_code == 200
+    assert send.call_count == 2
+    delay = no_sleep.call_args.args[0]
+    assert 0 <= delay <= 0.5
+
+
+@pytest.mark.asyncio
+async def test_honours_retry_after(no_sleep):
+    """Retry-Afterヘッダーの秒数だけ待機するテスト"""
+    policy = RetryPolicy(max_attempts=2, max_delay=30)
+    send = AsyncMock(side_effect=[
+        make_response(429, {"Retry-After": "7"}), make_response(200)
+    ])
+
+    await policy.call(URL, send)
+
+    no_sleep.assert_awaited_once_with(7.0)
+
+
+@pytest.mark.asyncio
+async def test_client_error_is_not_retried(no_sleep):
+    """404は再試行しないテスト"""
+    policy = RetryPolicy(max_attempts=3)
+    send = AsyncMock(return_value=make_response(404))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await policy.call(URL, send)
+
+    assert send.call_count == 1
+    assert policy.breaker("www.jra.go.jp").state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_fails_fast(no_sleep):
+    """連続失敗でブレーカーが開き、以降は送信せずに失敗するテスト"""
+    policy = RetryPolicy(max_attempts=3, failure_threshold=3, reset_timeout=60)
+    send = AsyncMock(side_effect=httpx.ConnectTimeout("timeout"))
+
+    with pytest.raises(httpx.ConnectTimeout):
+        await policy.call(URL, send)
+    assert send.call_count == 3
+
+    with pytest.raises(CircuitOpenError):
+        await policy.call(URL, send)
+    assert send.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_half_open_probe(no_sleep):
+    """停止時間の経過後に1件試行し、成功すれば閉じるテスト"""
+    policy = RetryPolicy(max_attempts=1, failure_threshold=1, reset_timeout=0)
+    await_fail = AsyncMock(side_effect=httpx.ConnectError("error"))
+
+    with pytest.raises(httpx.ConnectError):
+        await policy.call(URL, await_fail)
+
+    breaker = policy.breaker("www.jra.go.jp")
+    assert breaker.state == "half_open"
+
+    response = await policy.call(URL, AsyncMock(return_value=make_response(200)))
+    assert response.status_code == 200
+    assert breaker.state == "closed"
+
+
+def test_parse_retry_after():
+    """Retry-Afterの解析テスト"""
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("invalid") is None
+    assert parse_retry_after(None) is None
@@ -1,10 +1,11 @@
+import asyncio
 import pytest
 from datetime import date
 from unittest.mock import patch, MagicMock, AsyncMock
 
 from sqlmodel import Session
 
-from app.services.scraper import JRAScraper
+from app.services.scraper import FetchedPage, JRAScraper
 
 
 @pytest.fixture
@@ -84,8 +85,8 @@ class TestJRAScraper:
         scraper._fetch_races_list = AsyncMock(return_value=[
             {"race_id": "202305010101", "venue": "東京", "race_number": 1}
         ])
-        scraper._fetch_race_detail = AsyncMock(return_value={})
-        scraper._fetch_odds = AsyncMock(return_value={})
+        scraper._fetch_race = AsyncMock(return_value=(FetchedPage("詳細", "詳細ページ"), None))
+        scraper._parse_race = AsyncMock(return_value=({}, {}))
         scraper._save_race_data = MagicMock()
         scraper.close = AsyncMock()
         
@@ -98,8 +99,8 @@ class TestJRAScraper:
             
             # 結果の検証
             assert result["status"] == "success"
-            scraper._fetch_race_detail.assert_called_once()
-            scraper._fetch_odds.assert_called_once()
+            scraper._fetch_race.assert_called_once()
+            scraper._parse_race.assert_called_once()
             scraper._save_race_data.assert_called_once()
     
     @pytest.mark.asyncio
@@ -130,4 +131,291 @@ class TestJRAScraper:
         with pytest.raises(Exception) as exc_info:
             await scraper.sync_race_data(date(2023, 5, 1))
         
-        assert "テストエラー" in str(exc_info.value) 
\ No newline at end of file
+        assert "テストエラー" in str(exc_info.value)
+    
+    @pytest.mark.asyncio
+    async def test_sync_race_data_concurrent_fetch(self, mock_scraper):
+        """並行取得時の同時実行数制限と、取得の完了順によらずレース一覧の順に保存されるテスト"""
+        scraper, _ = mock_scraper
+        scraper.concurrency = 2
+        
+        races = [
+            {"race_id": f"20230501010{i}", "venue": "東京", "race_number": i}
+            for i in range(1, 6)
+        ]
+        # 取得の完了順は 2, 3, 1, 5, 4 となる
+        delays = {1: 0.05, 2: 0.02, 3: 0.01, 4: 0.05, 5: 0.01}
+        in_flight = 0
+        max_in_flight = 0
+        
+        async def fake_fetch(race_info, target_date):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(delays[race_info["race_number"]])
+            in_flight -= 1
+            if race_info["race_number"] == 3:
+                raise ValueError("取得エラー")
+            return FetchedPage(race_info["race_id"], race_info["race_id"]), None
+        
+        saved = []
+        scraper._fetch_races_list = AsyncMock(return_value=races)
+        scraper._fetch_race = fake_fetch
+        scraper._parse_race = AsyncMock(
+            side_effect=lambda race_info, target_date, pages: ({"race_id": pages[0].text}, {})
+        )
+        scraper._save_race_data = lambda detail, odds: saved.append(detail["race_id"])
+        scraper.close = AsyncMock()
+        
+        result = await scraper.sync_race_data(date(2023, 5, 1), force=True)
+        
+        assert max_in_flight <= 2
+        assert saved == ["202305010101", "202305010102", "202305010104", "202305010105"]
+        assert [r["race_id"] for r in result["details"]] == [r["race_id"] for r in races]
+        assert result["details"][2] == {
+            "race_id": "202305010103", "status": "error", "message": "取得エラー"
+        }
+    
+    @pytest.mark.asyncio
+    async def test_stream_race_data_backpressure(self, mock_scraper):
+        """保存が遅い場合に取得が上限付きキューで抑えられるテスト"""
+        scraper, _ = mock_scraper
+        scraper.concurrency = 2
+        scraper.queue_size = 1
+        
+        races = [
+            {"race_id": f"2023050101{i:02d}", "venue": "東京", "race_number": i}
+            for i in range(1, 13)
+        ]
+        fetched = []
+        
+        async def fake_fetch(race_info, target_date):
+            fetched.append(race_info["race_id"])
+            return FetchedPage(race_info["race_id"], race_info["race_id"]), None
+        
+        scraper._fetch_race = fake_fetch
+        scraper._parse_race = AsyncMock(
+            side_effect=lambda race_info, target_date, pages: ({"race_id": pages[0].text}, {})
+        )
+        scraper._save_race_data = MagicMock()
+        
+        stream = scraper.stream_race_data(date(2023, 5, 1), races)
+        first = await stream.__anext__()
+        await asyncio.sleep(0.01)
+        
+        # 各キュー1件・パース中1件・取得ワーカー2件を超えて先読みしない
+        assert first["status"] == "success"
+        assert len(fetched) <= 6
+        
+        results = [first] + [result async for result in stream]
+        assert len(results) == 12
+        assert len(fetched) == 12
+    
+    def test_save_race_data_bulk_upsert(self, session):
+        """レース保存が1回のコミットで登録・更新されるテスト"""
+        from app.models import Horse, HorsePastRace, Race
+        from sqlmodel import select
+        
+        scraper = JRAScraper(session)
+        race_detail = {
+            "race_id": "202305010101",
+            "race_date": date(2023, 5, 1),
+            "venue": "東京",
+            "race_number": 1,
+            "race_name": "テストレース",
+            "race_class": "未勝利",
+            "course_type": "芝",
+            "distance": 1600,
+            "weather": "晴",
+            "track_condition": "良",
+            "start_time": None,
+            "horses": [
+                {
+                    "horse_id": f"20190000{i}", "horse_name": f"テスト馬{i}", "horse_number": i,
+                    "jockey": "騎手", "trainer": "調教師", "weight": 480,
+                    "past_races": [{
+                        "race_date": "2023-04-01", "venue": "中山", "race_name": "前走",
+                        "jockey": "騎手", "result_order": i
+                    }] if i == 1 else []
+                }
+                for i in range(1, 4)
+            ]
+        }
+        
+        with patch.object(session, "commit", wraps=session.commit) as mock_commit:
+            scraper._save_race_data(race_detail, {"win_odds": {1: 2.5, 2: 4.0}})
+            assert mock_commit.call_count == 1
+        
+        # 再保存時は既存行を更新する
+        race_detail["race_name"] = "テストレース（更新）"
+        scraper._save_race_data(race_detail, {"win_odds": {1: 3.1}})
+        
+        races = session.exec(select(Race)).all()
+        horses = session.exec(select(Horse).order_by(Horse.horse_number)).all()
+        assert len(races) == 1
+        assert races[0].race_name == "テストレース（更新）"
+        assert [h.odds for h in horses] == [3.1, 4.0, None]
+        assert len(session.exec(select(HorsePastRace)).all()) == 2
+        assert race_detail["horses"][0]["past_races"]  # 入力データは変更しない
+    
+    @pytest.mark.asyncio
+    async def test_sync_race_data_skips_unchanged_pages(self, session):
+        """内容が変化していないページのパース・保存を省略するテスト"""
+        from app.models import Horse
+        from sqlmodel import select
+        
+        race_detail = {
+            "race_id": "202305010101", "race_date": date(2023, 5, 1), "venue": "東京",
+            "race_number": 1, "race_name": "テストレース", "race_class": "未勝利",
+            "course_type": "芝", "distance": 1600, "weather": "晴", "track_condition": "良",
+            "start_time": None,
+            "horses": [{
+                "horse_id": "2019000001", "horse_name": "テスト馬", "horse_number": 1,
+                "jockey": "騎手", "trainer": "調教師", "weight": 480
+            }]
+        }
+        
+        async def sync(odds_text):
+            scraper = JRAScraper(session)
+            scraper._fetch_races_list = AsyncMock(return_value=[
+                {"race_id": "202305010101", "venue": "東京", "race_number": 1}
+            ])
+            odds_html = (
+                '<table class="odds_table_01"><tr><th>馬番</th></tr>'
+                f'<tr><td>1</td><td>テスト馬</td><td>{odds_text}</td></tr></table>'
+            )
+            scraper._fetch_race = AsyncMock(return_value=(
+                FetchedPage("result", "結果ページ"), FetchedPage("odds", odds_html)
+            ))
+            scraper._parse_race = AsyncMock(return_value=(race_detail, {"win_odds": {1: float(odds_text)}}))
+            scraper.close = AsyncMock()
+            with patch.object(scraper, "_save_race_data", wraps=scraper._save_race_data) as save:
+                result = await scraper.sync_race_data(date(2023, 5, 1), force=True)
+            return result, scraper._parse_race, save
+        
+        result, parse, save = await sync("2.5")
+        assert result["details"][0]["status"] == "success"
+        assert save.call_count == 1
+        
+        # 同じ内容であればパース・保存しない
+        result, parse, save = await sync("2.5")
+        assert result["status"] == "success"
+        assert result["unchanged"] == 1
+        assert result["details"][0]["status"] == "unchanged"
+        parse.assert_not_called()
+        save.assert_not_called()
+        
+        # オッズのみ変化した場合はオッズだけを更新する
+        result, parse, save = await sync("3.1")
+        assert result["details"][0]["status"] == "success"
+        parse.assert_not_called()
+        save.assert_not_called()
+        assert session.exec(select(Horse)).one().odds == 3.1
+        
+        # ハッシュは1レース・1ページ種別あたり1行のまま更新される
+        from app.models import RacePageHash
+        hashes = session.exec(select(RacePageHash).order_by(RacePageHash.page_type)).all()
+        assert [h.page_type for h in hashes] == ["odds", "result"]
+    
+    @pytest.mark.asyncio
+    async def test_refresh_results_updates_finished_races(self, session):
+        """発走済みで結果未登録のレースのみ結果ページを取得し、着順等を更新するテスト"""
+        from datetime import datetime, timedelta
+        from app.models import Horse, Race, RacePayout
+        from sqlmodel import select
+        
+        now = datetime(2023, 5, 1, 12, 0)
+        for number, minutes in ((1, -30), (2, 30)):
+            race = Race(
+                race_id=f"2023050101{number:02d}", race_date=date(2023, 5, 1), venue="東京",
+                race_number=number, race_name=f"テスト{number}", race_class="未勝利",
+                course_type="芝", distance=1600, start_time=now + timedelta(minutes=minutes)
+            )
+            session.add(race)
+            session.flush()
+            for horse_number in (1, 2):
+                session.add(Horse(
+                    race_id=race.id, horse_id=f"{number}{horse_number}", horse_name="テスト馬",
+                    horse_number=horse_number, jockey="騎手", trainer="調教師"
+                ))
+        session.commit()
+        
+        scraper = JRAScraper(session)
+        scraper._fetch_race_detail = AsyncMock(return_value={"horses": [
+            {"horse_number": 1, "result_order": 2, "result_time": 94.5,
+             "result_margin": "クビ", "result_corner_position": "3-3"},
+            {"horse_number": 2, "result_order": 1, "result_time": 94.4,
+             "result_margin": None, "result_corner_position": "1-1"},
+        ], "payouts": [
+            {"bet_type": "単勝", "bet_numbers": "2", "payout": 350, "popularity": 1},
+        ]})
+        scraper.close = AsyncMock()
+        
+        races = scraper.finished_races(date(2023, 5, 1), now=now)
+        assert [race.race_id for race in races] == ["202305010101"]
+        
+        result = await scraper.refresh_results(races)
+        assert result["updated"] == 2
+        scraper._fetch_race_detail.assert_called_once()
+        
+        horses = session.exec(select(Horse).order_by(Horse.race_id, Horse.horse_number)).all()
+        assert [h.result_order for h in horses] == [2, 1, None, None]
+        assert horses[0].result_time == 94.5
+        assert horses[1].result_corner_position == "1-1"
+        assert session.exec(select(RacePayout.payout)).all() == [350]
+        
+        # 結果登録済みのレースは対象外
+        assert scraper.finished_races(date(2023, 5, 1), now=now) == []
+    
+    @pytest.mark.asyncio
+    async def test_fetch_race_revalidates_result_on_race_day(self, session):
+        """当日のレースの結果ページはキャッシュがTTL内でも再検証するテスト"""
+        from datetime import datetime
+        
+        scraper = JRAScraper(session)
+        scraper._fetch_page = AsyncMock(return_value=FetchedPage("url", "本文"))
+        scraper._fetch_odds_page = AsyncMock(return_value=None)
+        race_info = {"race_id": "202305010101", "venue": "東京", "race_number": 1}
+        
+        with patch("app.services.scraper.jra_now", return_value=datetime(2023, 5, 1, 16, 0)):
+            await scraper._fetch_race(race_info, date(2023, 5, 1))
+            assert scraper._fetch_page.call_args.kwargs["revalidate"] is True
+            
+            await scraper._fetch_race(race_info, date(2023, 4, 30))
+            assert scraper._fetch_page.call_args.kwargs["revalidate"] is False
+    
+    def test_finished_races_uses_japan_time(self, session):
+        """サーバーのタイムゾーンによらず日本時間で発走済みのレースを判定するテスト"""
+        from datetime import datetime
+        from app.models import Race
+        
+        session.add(Race(
+            race_id="202305010101", race_date=date(2023, 5, 1), venue="東京", race_number=1,
+            race_name="テスト", race_class="未勝利", course_type="芝", distance=1600,
+            start_time=datetime(2023, 5, 1, 11, 30)
+        ))
+        session.commit()
+        scraper = JRAScraper(session)
+        
+        # 日本時間の12:00（UTCでは03:00）には発走済み
+        with patch("app.services.scraper.jra_now", return_value=datetime(2023, 5, 1, 12, 0)):
+            assert [race.race_id for race in scraper.finished_races(date(2023, 5, 1))] == ["202305010101"]
+        with patch("app.services.scraper.jra_now", return_value=datetime(2023, 5, 1, 11, 0)):
+            assert scraper.finished_races(date(2023, 5, 1)) == []
+    
+    @pytest.mark.asyncio
+    async def test_shared_http_client_is_borrowed(self, session):
+        """共有HTTPクライアントを借用し、同期終了時に閉じないテスト"""
+        from app.services import http_client
+        
+        client = await http_client.open_http_client()
+        try:
+            scraper = JRAScraper(session)
+            assert scraper.client is client
+            await scraper.close()
+            assert not client.is_closed
+        finally:
+            await http_client.close_http_client()
+        
+        assert client.is_closed
+        assert http_client.get_http_client() is None
@@ -0,0 +1,96 @@
+from datetime import date
+
+import pytest
+from unittest.mock import patch
+from sqlmodel import select
+
+from app.models import BettingResult, Race, RacePayout
+from app.services.settlement import settle_tickets, store_payouts
+
+PAYOUTS = [
+    {"bet_type": "単勝", "bet_numbers": "3", "payout": 250, "popularity": 1},
+    {"bet_type": "複勝", "bet_numbers": "3", "payout": 110, "popularity": 1},
+    {"bet_type": "複勝", "bet_numbers": "7", "payout": 320, "popularity": 5},
+    {"bet_type": "馬連", "bet_numbers": "3-7", "payout": 1230, "popularity": 4},
+    {"bet_type": "三連単", "bet_numbers": "7-3-12", "payout": 123450, "popularity": 301},
+]
+
+
+@pytest.fixture
+def races(session):
+    """払戻金が確定したレースと未確定のレース"""
+    races = []
+    for number in (1, 2):
+        race = Race(
+            race_id=f"2023050101{number:02d}", race_date=date(2023, 5, 1), venue="東京",
+            race_number=number, race_name=f"テスト{number}", race_class="未勝利",
+            course_type="芝", distance=1600
+        )
+        session.add(race)
+        races.append(race)
+    session.flush()
+    store_payouts(session, races[0].id, PAYOUTS)
+    session.commit()
+    return races
+
+
+def test_store_payouts_skips_unchanged(session, races):
+    """同じ内容の払戻金は再登録しないテスト"""
+    assert store_payouts(session, races[0].id, PAYOUTS) is False
+    assert store_payouts(session, races[0].id, []) is False
+    assert store_payouts(session, races[0].id, PAYOUTS[:1]) is True
+    session.commit()
+
+    assert session.exec(select(RacePayout.bet_type)).all() == ["単勝"]
+
+
+def test_settle_tickets(session, races):
+    """券種と馬番の組み合わせで的中を判定し、1回のコミットで精算するテスト"""
+    tickets = [
+        BettingResult(race_id=races[0].id, bet_type="単勝", bet_numbers="3", amount=1000),
+        BettingResult(race_id=races[0].id, bet_type="馬連", bet_numbers="7-3", amount=200),
+        BettingResult(race_id=races[0].id, bet_type="三連単", bet_numbers="3→7→12", amount=100),
+        BettingResult(race_id=races[0].id, bet_type="複勝", bet_numbers="7", amount=500),
+        # 払戻金が未確定のレースは精算しない
+        BettingResult(race_id=races[1].id, bet_type="単勝", bet_numbers="1", amount=100),
+    ]
+    session.add_all(tickets)
+    session.commit()
+
+    with patch.object(session, "commit", wraps=session.commit) as mock_commit:
+        result = settle_tickets(session, date(2023, 5, 1))
+        assert mock_commit.call_count == 1
+
+    assert result["settled"] == 4
+    assert result["won"] == 3
+    assert result["total_payout"] == 2500 + 2460 + 1600
+
+    rows = session.exec(select(BettingResult).order_by(BettingResult.id)).all()
+    assert [(r.is_won, r.payout) for r in rows] == [
+        (True, 2500), (True, 2460), (False, 0), (True, 1600), (False, None)
+    ]
+
+    # 精算済みの馬券は再精算しない
+    assert settle_tickets(session, date(2023, 5, 1))["settled"] == 0
+    assert settle_tickets(session, date(2023, 5, 1), resettle=True)["settled"] == 4
+
+
+def test_settle_refunded_tickets(session, races):
+    """取消・除外の馬を含む馬券は不的中として購入額を返還するテスト"""
+    store_payouts(session, races[0].id, PAYOUTS + [
+        {"bet_type": "返還", "bet_numbers": "9", "payout": 100, "popularity": None},
+    ])
+    session.add_all([
+        BettingResult(race_id=races[0].id, bet_type="単勝", bet_numbers="9", amount=500),
+        BettingResult(race_id=races[0].id, bet_type="馬連", bet_numbers="3-9", amount=200),
+        BettingResult(race_id=races[0].id, bet_type="単勝", bet_numbers="3", amount=100),
+    ])
+    session.commit()
+
+    result = settle_tickets(session, date(2023, 5, 1))
+
+    assert result["settled"] == 3
+    assert result["won"] == 1
+    assert result["refunded"] == 2
+    rows = session.exec(select(BettingResult).order_by(BettingResult.id)).all()
+    assert [(r.is_won, r.payout) for r in rows] == [(False, 500), (False, 200), (True, 250)]
@@ -0,0 +1,158 @@
+import asyncio
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+from sqlmodel import Session, create_engine
+
+from app.main import app
+from app.services.scraper import SyncStats
+from app.services.sync_jobs import SyncJobManager, get_sync_job_manager
+
+
+class FakeScraper:
+    """同期ジョブ検証用のスクレイパー"""
+
+    release = None
+    fail = False
+
+    def __init__(self, session):
+        self.session = session
+        self.stats = SyncStats()
+
+    async def sync_race_data(self, target_date, force=False, on_result=None):
+        self.stats.races_total = 3
+        for i in range(1, 4):
+            if FakeScraper.release:
+                await FakeScraper.release.wait()
+            if FakeScraper.fail:
+                raise RuntimeError("同期エラー")
+            self.stats.races_done += 1
+            self.stats.fetch_seconds += 0.5
+            self.stats.write_seconds += 0.1
+            on_result({"race_id": f"2023050101{i:02d}", "status": "success"})
+        return {"status": "success", "message": "3/3レースのデータを同期しました"}
+
+
+@pytest.fixture(autouse=True)
+def reset_fake_scraper():
+    FakeScraper.release = None
+    FakeScraper.fail = False
+
+
+@pytest.fixture
+def manager(engine):
+    return SyncJobManager(engine=engine, scraper_factory=FakeScraper)
+
+
+@pytest.mark.asyncio
+async def test_run_records_status_and_timings(manager):
+    """ジョブの結果と段ごとの処理時間が記録されるテスト"""
+    job, created = await manager.submit(date(2023, 5, 1))
+    assert created
+    assert job.status == "pending"
+
+    await manager.run(job.id)
+
+    job = manager.get(job.id)
+    assert job.status == "success"
+    assert job.races_total == 3
+    assert job.races_done == 3
+    assert job.fetch_seconds == 1.5
+    assert job.write_seconds == pytest.approx(0.3)
+    assert job.finished_at is not None
+    assert job.races_per_second > 0
+
+
+@pytest.mark.asyncio
+async def test_submit_deduplicates_running_date(manager):
+    """同じ日付の実行中ジョブに集約されるテスト"""
+    FakeScraper.release = asyncio.Event()
+    job, _ = await manager.submit(date(2023, 5, 1))
+    task = asyncio.create_task(manager.run(job.id))
+    await asyncio.sleep(0)
+
+    same, created = await manager.submit(date(2023, 5, 1), force=True)
+    assert not created
+    assert same.id == job.id
+    assert manager.get(job.id).status == "running"
+
+    other, created = await manager.submit(date(2023, 5, 2))
+    assert created
+    assert other.id != job.id
+
+    FakeScraper.release.set()
+    await task
+
+    # 完了後は新しいジョブとして登録される
+    rerun, created = await manager.submit(date(2023, 5, 1))
+    assert created
+    assert rerun.id != job.id
+
+
+@pytest.mark.asyncio
+async def test_submit_deduplicates_across_managers(engine):
+    """別プロセスのマネージャーからの登録もDB上の実行中ジョブに集約されるテスト"""
+    first = SyncJobManager(engine=engine, scraper_factory=FakeScraper)
+    second = SyncJobManager(engine=engine, scraper_factory=FakeScraper)
+
+    job, created = await first.submit(date(2023, 5, 1))
+    assert created
+
+    same, created = await second.submit(date(2023, 5, 1))
+    assert not created
+    assert same.id == job.id
+
+
+@pytest.mark.asyncio
+async def test_get_reads_through_read_engine(engine):
+    """ジョブの取得は読み取り用エンジンで行うテスト"""
+    read_engine = create_engine(engine.url)
+    manager = SyncJobManager(engine=engine, scraper_factory=FakeScraper, read_engine=read_engine)
+    job, _ = await manager.submit(date(2023, 5, 1))
+
+    with patch("app.services.sync_jobs.Session", wraps=Session) as session_class:
+        assert manager.get(job.id).id == job.id
+    session_class.assert_called_once_with(read_engine)
+    read_engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_run_records_failure(manager):
+    """同期の失敗が記録されるテスト"""
+    FakeScraper.fail = True
+    job, _ = await manager.submit(date(2023, 5, 1))
+
+    await manager.run(job.id)
+
+    job = manager.get(job.id)
+    assert job.status == "failed"
+    assert job.message == "同期エラー"
+    assert job.finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_fail_interrupted(manager):
+    """実行中のまま残ったジョブが中断として記録されるテスト"""
+    job, _ = await manager.submit(date(2023, 5, 1))
+
+    assert manager.fail_interrupted() == 1
+    assert manager.get(job.id).status == "failed"
+
+
+def test_sync_job_endpoints(client, manager):
+    """同期の開始とジョブ取得のエンドポイントのテスト"""
+    app.dependency_overrides[get_sync_job_manager] = lambda: manager
+
+    response = client.post("/sync", params={"target_date": "2023-05-01"})
+    assert response.status_code == 200
+    job_id = response.json()["job"]["id"]
+
+    response = client.get(f"/sync/jobs/{job_id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "success"
+    assert data["races_done"] == 3
+
+    response = client.get("/sync/jobs/999")
+    assert response.status_code == 404